@@ -1,7 +1,9 @@
 import json
+import os
 import boto3
 import requests
 from botocore.exceptions import ClientError
+from publish_encoding import choose_encoding, encode_payload
 
 # Initialize AWS clients
 dynamodb = boto3.resource('dynamodb')
@@ -13,6 +15,9 @@ TABLE_NAME = 'MarketData'
 # Public API URL
 API_URL = 'https://api.example.com/marketdata'
 
+# Encoding for scheduled runs; 'zlib' moves payloads to "market/data/zlib"
+PAYLOAD_ENCODING = os.environ.get('PAYLOAD_ENCODING', 'json')
+
 def normalize_data(data):
     # Example normalization: Convert temperature to Fahrenheit if present
     if 'temperature' in data:
@@ -41,10 +46,11 @@ def lambda_handler(event, context):
         table.put_item(Item=formatted_data)
 
         # Send data to AWS IoT Core
+        topic, payload = encode_payload('market/data', formatted_data, choose_encoding(event, PAYLOAD_ENCODING))
         iot_client.publish(
-            topic='market/data',
+            topic=topic,
             qos=1,
-            payload=json.dumps(formatted_data)
+            payload=payload
         )
 
         return {
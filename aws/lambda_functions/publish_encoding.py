@@ -0,0 +1,28 @@
+import json
+import zlib
+
+# Encodings the Pi can decode, marked by a topic suffix ("<topic>/zlib").
+# Plain JSON has no suffix, so subscribers of the bare topic keep working.
+SUPPORTED_ENCODINGS = ('zlib', 'json')
+
+def choose_encoding(event, default='json'):
+    """Pick the first encoding the Pi accepts, or the default when it did not say
+
+    Refresh requests from the Pi list its encodings in 'accept'; scheduled
+    runs carry no list and publish with the default (PAYLOAD_ENCODING).
+    """
+    accepted = event.get('accept') if isinstance(event, dict) else None
+    for encoding in accepted or [default]:
+        if encoding in SUPPORTED_ENCODINGS:
+            return encoding
+    return 'json'
+
+def encode_payload(topic, data, encoding):
+    """Return (topic, payload bytes) for an encoding"""
+    body = json.dumps(data, separators=(',', ':'), default=str).encode()
+    if encoding == 'zlib':
+        compressed = zlib.compress(body, 9)
+        # Tiny payloads can grow when compressed; send those as plain JSON
+        if len(compressed) < len(body):
+            return f"{topic}/zlib", compressed
+    return topic, body
@@ -1,13 +1,18 @@
 import json
+import os
 import boto3
 import requests
 from botocore.exceptions import ClientError
+from publish_encoding import choose_encoding, encode_payload
 
 # Initialize AWS clients
 iot_client = boto3.client('iot-data')
 dynamodb = boto3.resource('dynamodb')
 table = dynamodb.Table('SecurityAlerts')
 
+# Encoding for scheduled runs; 'zlib' moves payloads to "security/alerts/zlib"
+PAYLOAD_ENCODING = os.environ.get('PAYLOAD_ENCODING', 'json')
+
 def normalize_data(alert):
     # Example normalization: Convert temperature to Fahrenheit if it's in Celsius
     if 'temperature' in alert:
@@ -24,11 +29,12 @@ def lambda_handler(event, context):
         alerts = response.json()
 
         # Process and send data to AWS IoT Core
+        encoding = choose_encoding(event, PAYLOAD_ENCODING)
         for alert in alerts:
             normalized_alert = normalize_data(alert)
-            payload = json.dumps(normalized_alert)
+            topic, payload = encode_payload('security/alerts', normalized_alert, encoding)
             iot_client.publish(
-                topic='security/alerts',
+                topic=topic,
                 qos=1,
                 payload=payload
             )
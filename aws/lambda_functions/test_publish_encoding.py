@@ -0,0 +1,41 @@
+import json
+import unittest
+import zlib
+from publish_encoding import choose_encoding, encode_payload
+
+class TestChooseEncoding(unittest.TestCase):
+
+    def test_scheduled_runs_use_the_default(self):
+        self.assertEqual(choose_encoding({}), 'json')
+        self.assertEqual(choose_encoding({}, 'zlib'), 'zlib')
+        self.assertEqual(choose_encoding(None), 'json')
+
+    def test_refresh_requests_pick_the_first_supported_encoding(self):
+        self.assertEqual(choose_encoding({'accept': ['msgpack', 'zlib', 'json']}), 'zlib')
+        self.assertEqual(choose_encoding({'accept': ['json']}, 'zlib'), 'json')
+
+    def test_unknown_encodings_fall_back_to_json(self):
+        self.assertEqual(choose_encoding({'accept': ['cbor']}), 'json')
+        self.assertEqual(choose_encoding({}, 'brotli'), 'json')
+
+class TestEncodePayload(unittest.TestCase):
+
+    def test_json_uses_the_bare_topic(self):
+        topic, payload = encode_payload('market/data', {'id': 'DJI', 'price': 1.5}, 'json')
+        self.assertEqual(topic, 'market/data')
+        self.assertEqual(json.loads(payload), {'id': 'DJI', 'price': 1.5})
+
+    def test_zlib_adds_the_topic_suffix(self):
+        data = {'history': [[1728379800 + i * 60, 28500.5] for i in range(100)]}
+        topic, payload = encode_payload('market/data', data, 'zlib')
+        self.assertEqual(topic, 'market/data/zlib')
+        self.assertEqual(json.loads(zlib.decompress(payload)), data)
+
+    def test_payloads_that_grow_when_compressed_stay_plain_json(self):
+        data = {'id': 'X'}
+        topic, payload = encode_payload('market/data', data, 'zlib')
+        self.assertEqual(topic, 'market/data')
+        self.assertEqual(json.loads(payload), data)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -28,6 +28,22 @@ class TestLambdaHandler(unittest.TestCase):
         mock_publish.assert_called_once()
         mock_put_item.assert_called_once()
 
+    @patch('aws.lambda_functions.security_alert_lambda.requests.get')
+    @patch('aws.lambda_functions.security_alert_lambda.iot_client.publish')
+    @patch('aws.lambda_functions.security_alert_lambda.table.put_item')
+    def test_lambda_handler_encoding(self, mock_put_item, mock_publish, mock_get):
+        alerts = [{'alert': 'Intrusion detected ' * 20, 'severity': 'high'}]
+        mock_get.return_value.json.return_value = alerts
+
+        # Scheduled runs publish plain JSON on the bare topic
+        lambda_handler({}, MagicMock())
+        self.assertEqual(mock_publish.call_args.kwargs['topic'], 'security/alerts')
+        self.assertEqual(json.loads(mock_publish.call_args.kwargs['payload']), alerts[0])
+
+        # Refresh requests get the first encoding the Pi accepts
+        lambda_handler({'accept': ['msgpack', 'zlib', 'json']}, MagicMock())
+        self.assertEqual(mock_publish.call_args.kwargs['topic'], 'security/alerts/zlib')
+
     @patch('aws.lambda_functions.security_alert_lambda.requests.get')
     def test_lambda_handler_api_failure(self, mock_get):
         # Mock the API response to raise an exception
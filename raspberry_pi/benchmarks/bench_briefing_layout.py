@@ -0,0 +1,51 @@
+"""Estimate how long the briefing layout takes to render and to print.
+
+Usage: python3 benchmarks/bench_briefing_layout.py
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from data_aggregator import BriefingFormatter
+from escp import EscpRenderer
+from escp_emulator import benchmark_layout
+
+SAMPLE_DATA = {
+    'location': 'Plano, TX',
+    'sentiment': 'CAUTIOUS, ELEVATED RISKS.',
+    'weather_impact': 'Weather affecting transportation.',
+    'security_level': 'Moderate security alerts in Europe.',
+    'market_data': {
+        'dow_value': '28,500', 'dow_change': '+0.5%',
+        'sp_value': '3,500', 'sp_change': '+0.3%',
+        'nasdaq_value': '10,500', 'nasdaq_change': '-0.2%',
+        'gold_price': '1,800', 'gold_trend': 70, 'gold_direction': 'Rising',
+        'oil_price': '40', 'oil_trend': 50, 'oil_direction': 'Stable',
+    },
+    'supply_chain': ['Port Congestion: LOW, container costs easing.',
+                     'Semiconductor Shortages: PERSISTING.'],
+    'military': ['Lockheed awarded $5B defense contract.',
+                 'China increases naval production.'],
+    'headlines': ['Middle East: Ceasefire reached.',
+                  'UN Climate Summit: Agreement on emission reduction.'],
+    'recommendations': ['Hold energy stocks; volatility expected.',
+                        'Avoid travel to Russia-Ukraine border region.'],
+}
+
+
+def main():
+    formatter = BriefingFormatter()
+    renderer = EscpRenderer()
+    report = benchmark_layout(lambda: renderer.render_job(formatter.format_briefing(SAMPLE_DATA)),
+                              layout=renderer.layout)
+
+    print(f"render: {report['render_ms']:.2f} ms")
+    print(f"print:  {report['estimated_seconds']:.1f} s "
+          f"({report['chars']} chars, {report['lines']} lines, {report['form_feeds']} form feeds)")
+    if report['overflow_lines']:
+        print(f"warning: {report['overflow_lines']} line(s) wider than the page")
+
+
+if __name__ == "__main__":
+    main()
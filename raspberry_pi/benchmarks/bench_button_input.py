@@ -0,0 +1,91 @@
+"""Compare press latency and idle CPU of edge-triggered and polled button input.
+
+Runs off-device against the simulated GPIO backend.
+
+Usage: python3 benchmarks/bench_button_input.py [presses]
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from gpio_input import ButtonInput, SimulatedGPIO, LOW
+
+PIN = 17
+IDLE_SECONDS = 2.0
+TAP_SECONDS = 0.12  # A typical quick press
+
+
+def polled_press(gpio: SimulatedGPIO, timeout: float, debounce: float = 0.2,
+                 interval: float = 0.01) -> Optional[float]:
+    """The previous approach: poll every 10 ms, then sleep 200 ms to debounce"""
+    give_up = time.monotonic() + timeout
+    while time.monotonic() < give_up:
+        if gpio.read(PIN) == LOW:
+            time.sleep(debounce)
+            if gpio.read(PIN) == LOW:
+                return time.monotonic()
+        time.sleep(interval)
+    return None
+
+
+def measure_latency(wait, presses: int) -> Tuple[Optional[float], int]:
+    """Mean seconds from the first edge of a tap to it being recognised, and missed taps"""
+    latencies = []
+    for _ in range(presses):
+        gpio = SimulatedGPIO()
+        recognise = wait(gpio)
+        time.sleep(0.005)
+        pressed_at = time.monotonic()
+        threading.Thread(target=gpio.press, args=(PIN, TAP_SECONDS, 3), daemon=True).start()
+        recognised_at = recognise(1.0)
+        if recognised_at is not None:
+            latencies.append(recognised_at - pressed_at)
+    mean = sum(latencies) / len(latencies) if latencies else None
+    return mean, presses - len(latencies)
+
+
+def edge_waiter(gpio: SimulatedGPIO, long_press=1.5):
+    button = ButtonInput(gpio, PIN, debounce=0.05, long_press=long_press)
+    return lambda timeout=None: time.monotonic() if button.wait_for_press(timeout) else None
+
+
+def press_edge_waiter(gpio: SimulatedGPIO):
+    return edge_waiter(gpio, long_press=None)
+
+
+def polled_waiter(gpio: SimulatedGPIO):
+    gpio.setup_input(PIN)
+    return lambda timeout=3600.0: polled_press(gpio, timeout)
+
+
+def idle_cpu(wait) -> float:
+    """CPU seconds used per wall second while waiting with no presses"""
+    gpio = SimulatedGPIO()
+    recognise = wait(gpio)
+    threading.Thread(target=recognise, daemon=True).start()
+    started = time.process_time()
+    time.sleep(IDLE_SECONDS)
+    return (time.process_time() - started) / IDLE_SECONDS
+
+
+def main():
+    presses = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    # With long presses enabled a tap is recognised on release, so it includes the hold
+    waiters = [
+        ("edge, press only", press_edge_waiter),
+        ("edge, short/long", edge_waiter),
+        ("polled (old)", polled_waiter),
+    ]
+    for name, waiter in waiters:
+        latency, missed = measure_latency(waiter, presses)
+        latency = "   n/a" if latency is None else f"{latency * 1000:6.1f}"
+        print(f"{name:17} {latency} ms to recognise a {TAP_SECONDS * 1000:.0f} ms tap "
+              f"({missed}/{presses} missed), {idle_cpu(waiter):.2%} CPU idle")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,29 @@
+"""Time the series chart renderers on long price histories.
+
+Usage: python3 benchmarks/bench_charts.py
+"""
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from charts import CHARTS
+
+
+def main():
+    rng = np.random.default_rng(0)
+    for points in (1_000, 10_000, 100_000):
+        prices = 1800 + np.cumsum(rng.normal(size=points))
+        timings = []
+        for kind, chart in CHARTS.items():
+            runs = 20
+            seconds = timeit.timeit(lambda: chart(prices, 48, 3), number=runs)
+            timings.append(f"{kind} {seconds / runs * 1000:6.2f} ms")
+        print(f"{points:7d} points: " + ", ".join(timings))
+
+
+if __name__ == "__main__":
+    main()
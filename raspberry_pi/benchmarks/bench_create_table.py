@@ -0,0 +1,36 @@
+"""Time BriefingFormatter.create_table on large tables (hundreds of alert rows).
+
+Usage: python3 benchmarks/bench_create_table.py
+"""
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from data_aggregator import BriefingFormatter
+
+HEADERS = ["Time", "Severity", "Source", "Alert"]
+
+
+def make_alert_rows(count: int):
+    return [
+        [f"{hour % 24:02d}:{hour % 60:02d}", ["LOW", "MODERATE", "HIGH"][hour % 3],
+         f"feed-{hour % 7}", f"Phishing campaign targeting region {hour} with spoofed invoices"]
+        for hour in range(count)
+    ]
+
+
+def main():
+    formatter = BriefingFormatter()
+    for rows in (10, 100, 500, 2000):
+        data = make_alert_rows(rows)
+        runs = max(1, 2000 // rows)
+        fixed = timeit.timeit(lambda: formatter.create_table(HEADERS, data, [6, 9, 7, 24]), number=runs)
+        fitted = timeit.timeit(lambda: formatter.create_table(HEADERS, data, max_width=80), number=runs)
+        print(f"{rows:5d} rows: fixed widths {fixed / runs * 1000:7.2f} ms, "
+              f"auto-fit {fitted / runs * 1000:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
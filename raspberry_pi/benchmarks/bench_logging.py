@@ -0,0 +1,66 @@
+"""Compare log call latency and file writes: synchronous FileHandler vs setup_logging.
+
+Usage: python3 benchmarks/bench_logging.py [count] [directory]
+
+Point directory at the SD card on the Pi; it defaults to a temporary
+directory. Writes are counted as write() calls reaching the log file.
+"""
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from log_setup import setup_logging, shutdown_logging
+
+
+class CountingFileHandler(logging.FileHandler):
+    """The old setup: one write (and flush) per record"""
+
+    writes = 0
+
+    def flush(self):
+        CountingFileHandler.writes += 1
+        super().flush()
+
+
+def time_calls(logger: logging.Logger, count: int):
+    latencies = []
+    for i in range(count):
+        started = time.perf_counter()
+        logger.info("Button pressed, queued print job %d", i)
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    return latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)]
+
+
+def report(name, median, p99, writes, count):
+    print(f"{name:12} median {median * 1e6:6.1f} us  p99 {p99 * 1e6:7.1f} us"
+          f"  file writes {writes:6} for {count} records")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    with tempfile.TemporaryDirectory(dir=sys.argv[2] if len(sys.argv) > 2 else None) as directory:
+        sync_logger = logging.getLogger('bench_sync')
+        sync_logger.propagate = False
+        sync_logger.setLevel(logging.INFO)
+        handler = CountingFileHandler(Path(directory) / 'sync.log')
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+        sync_logger.addHandler(handler)
+        median, p99 = time_calls(sync_logger, count)
+        handler.close()
+        report("synchronous", median, p99, CountingFileHandler.writes, count)
+
+        buffered_logger = logging.getLogger('bench_buffered')
+        buffered_logger.propagate = False
+        setup = setup_logging(Path(directory) / 'buffered.log', name='bench_buffered', console=False)
+        median, p99 = time_calls(buffered_logger, count)
+        shutdown_logging()
+        report("buffered", median, p99, setup.stats['flushes'], count)
+
+
+if __name__ == '__main__':
+    main()
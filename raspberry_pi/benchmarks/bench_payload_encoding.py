@@ -0,0 +1,41 @@
+"""Compare payload size and decode time for each payload encoding.
+
+Usage: python3 benchmarks/bench_payload_encoding.py [count]
+
+MessagePack and CBOR are only measured when msgpack / cbor2 are installed.
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from payload_encoding import JSON, available_encodings, dumps, loads
+from bench_briefing_layout import SAMPLE_DATA
+
+SAMPLE_PAYLOADS = {
+    'market': {'id': 'DJI', 'price': 28500.12, 'timestamp': '2024-10-08T09:30:00Z'},
+    'alert': {'alert': 'Intrusion detected', 'severity': 'high', 'region': 'EU',
+              'timestamp': '2024-10-08T09:30:00Z'},
+    'briefing': SAMPLE_DATA,
+    'history': {'id': 'DJI', 'price_history': [[1728379800 + i * 60, 28500 + (i % 37) * 1.5]
+                                               for i in range(500)]},
+}
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    for name, payload in SAMPLE_PAYLOADS.items():
+        json_size = len(dumps(payload, JSON))
+        for encoding in [JSON] + [e for e in available_encodings() if e != JSON]:
+            raw = dumps(payload, encoding)
+            started = time.perf_counter()
+            for _ in range(count):
+                loads(raw, encoding)
+            elapsed = (time.perf_counter() - started) / count
+            print(f"{name:9} {encoding:8} {len(raw):7} B ({len(raw) / json_size:4.0%})"
+                  f"  decode {elapsed * 1e6:8.1f} us")
+
+
+if __name__ == '__main__':
+    main()
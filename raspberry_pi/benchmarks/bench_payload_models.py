@@ -0,0 +1,50 @@
+"""Compare decoding MQTT payloads into dicts and into typed payload models.
+
+Usage: python3 benchmarks/bench_payload_models.py [count]
+"""
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from payload_models import decode_payload
+
+SAMPLE_PAYLOADS = {
+    'weather': {'location': 'Plano, TX', 'temperature': 71.6, 'unit': 'F', 'conditions': 'Clear',
+                'humidity': 40, 'wind_speed': 8.5, 'timestamp': '2024-10-08T09:30:00Z'},
+    'market': {'id': 'DJI', 'price': '28500.12', 'change': '0.5', 'timestamp': '2024-10-08T09:30:00Z'},
+    'security': {'alert': 'Intrusion detected', 'severity': 'high', 'region': 'EU',
+                 'timestamp': '2024-10-08T09:30:00Z'},
+}
+
+
+def measure(decode, raw, count):
+    """Seconds per decode and bytes retained by count decoded payloads"""
+    started = time.perf_counter()
+    for _ in range(count):
+        decode(raw)
+    elapsed = (time.perf_counter() - started) / count
+
+    tracemalloc.start()
+    kept = [decode(raw) for _ in range(count)]
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return elapsed, retained / count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    for category, payload in SAMPLE_PAYLOADS.items():
+        raw = json.dumps(payload).encode()
+        dict_time, dict_bytes = measure(json.loads, raw, count)
+        model_time, model_bytes = measure(lambda data: decode_payload(category, data), raw, count)
+        print(f"{category:9} dict:  {dict_time * 1e6:6.1f} us  {dict_bytes:6.0f} B/payload")
+        print(f"{'':9} model: {model_time * 1e6:6.1f} us  {model_bytes:6.0f} B/payload")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,306 @@
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from layout import wrap_item, wrap_line
+from payload_models import PayloadModel
+
+DEFAULT_TEMPLATE = Path(__file__).resolve().parent.parent / 'shared' / 'templates' / 'briefing_template.txt'
+
+_EXPRESSION_RE = re.compile(r"\{\{(.*?)\}\}")
+_MISSING = object()
+
+# Render plan node kinds
+TEXT = 'text'
+LINE = 'line'
+SECTION = 'section'
+RULE = 'rule'
+FIELD = 'field'
+BAR = 'bar'
+NOW = 'now'
+TABLE = 'table'
+IF = 'if'
+LIST = 'list'
+CHART = 'chart'
+
+CHART_KINDS = ('spark', 'hist', 'band')
+
+
+class TemplateError(ValueError):
+    """Raised when a briefing template cannot be compiled"""
+    pass
+
+
+def lookup(data: Dict[str, Any], path: Tuple[str, ...]) -> Any:
+    """Follow a dotted path through nested dicts and payload models, returning _MISSING if absent"""
+    value = data
+    for key in path:
+        if isinstance(value, (dict, PayloadModel)):
+            value = value.get(key, _MISSING)
+        else:
+            return _MISSING
+        if value is _MISSING:
+            return _MISSING
+    return value
+
+
+class BriefingTemplate:
+    """A briefing template compiled once into a reusable render plan.
+
+    The plan is a list of nodes: literal text, field lookups, bar charts,
+    series charts, tables, conditional blocks and lists. Static parts such as headers and
+    rules are rendered at compile time. Lines longer than the width wrap with
+    a hanging indent; static lines are wrapped once at compile time.
+
+    A '% section' runs up to and including the next '% rule', which lets
+    render_sections() split a briefing into named parts for diffing. The template file is recompiled only
+    when its modification time changes.
+    """
+
+    def __init__(self, formatter, path: Path = DEFAULT_TEMPLATE, width: int = 50,
+                 check_interval: float = 1.0):
+        self.formatter = formatter  # BriefingFormatter providing headers, tables and charts
+        self.path = Path(path)
+        self.width = width
+        self.check_interval = check_interval  # seconds between mtime checks
+        self.compile_count = 0
+        self._plan: Optional[List[tuple]] = None
+        self._mtime: Optional[int] = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def plan(self) -> List[tuple]:
+        """Return the compiled plan, recompiling if the template file changed"""
+        now = time.monotonic()
+        if self._plan is not None and now - self._last_check < self.check_interval:
+            return self._plan
+
+        with self._lock:
+            self._last_check = now
+            mtime = os.stat(self.path).st_mtime_ns
+            if self._plan is None or mtime != self._mtime:
+                self._plan = self.compile(self.path.read_text(encoding='utf-8'))
+                self._mtime = mtime
+                self.compile_count += 1
+            return self._plan
+
+    def render(self, data: Dict[str, Any]) -> str:
+        """Render the briefing for one set of data"""
+        parts: List[str] = []
+        self._render_nodes(self.plan(), data, datetime.now(), parts)
+        return "".join(parts).rstrip("\n")
+
+    def render_sections(self, data: Dict[str, Any]) -> List[Tuple[Optional[str], str]]:
+        """Render the briefing as (section name, text) parts in print order
+
+        Text outside any section (the header and footer) has the name None.
+        Joining the texts gives the same output as render().
+        """
+        parts: List[str] = []
+        boundaries: List[Tuple[Optional[str], int]] = [(None, 0)]
+        self._render_nodes(self.plan(), data, datetime.now(), parts, boundaries)
+        boundaries.append((None, len(parts)))
+
+        sections = []
+        for (name, start), (_, end) in zip(boundaries, boundaries[1:]):
+            text = "".join(parts[start:end])
+            if text:
+                sections.append((name, text))
+        if sections:
+            name, text = sections[-1]
+            sections[-1] = (name, text.rstrip("\n"))
+        return sections
+
+    def compile(self, source: str) -> List[tuple]:
+        """Compile template source into a render plan"""
+        lines = source.splitlines()
+        nodes, _ = self._compile_block(lines, 0, top_level=True)
+        return self._merge_text(nodes)
+
+    def _compile_block(self, lines: List[str], index: int, top_level: bool) -> Tuple[List[tuple], int]:
+        """Compile lines until the matching '% end' (or end of file at top level)"""
+        nodes: List[tuple] = []
+        while index < len(lines):
+            line = lines[index]
+            lineno = index + 1
+            index += 1
+
+            if line.startswith('%#'):
+                continue
+            if not line.startswith('%'):
+                nodes.append(self._compile_text_line(line, lineno))
+                continue
+
+            directive, _, argument = line[1:].strip().partition(' ')
+            argument = argument.strip()
+            if directive == 'end':
+                if top_level:
+                    raise TemplateError(f"line {lineno}: '% end' without an open block")
+                return nodes, index
+            elif directive == 'header':
+                nodes.append((TEXT, self.formatter.create_header(argument, self.width) + "\n"))
+            elif directive == 'section':
+                nodes.append((SECTION, argument,
+                              self.formatter.create_section_header(argument, self.width) + "\n"))
+            elif directive == 'rule':
+                nodes.append((RULE, (argument or '=') * self.width + "\n"))
+            elif directive == 'if':
+                children, index = self._compile_block(lines, index, top_level=False)
+                nodes.append((IF, self._path(argument, lineno), self._merge_text(children)))
+            elif directive == 'list':
+                nodes.append((LIST, self._path(argument, lineno)))
+            elif directive == 'chart':
+                nodes.append(self._compile_chart(argument, lineno))
+            elif directive == 'table':
+                table, index = self._compile_table(lines, index, argument, lineno)
+                nodes.append(table)
+            else:
+                raise TemplateError(f"line {lineno}: unknown directive '% {directive}'")
+
+        if not top_level:
+            raise TemplateError("template ended inside a block; missing '% end'")
+        return nodes, index
+
+    def _compile_table(self, lines: List[str], index: int, argument: str,
+                       lineno: int) -> Tuple[tuple, int]:
+        """Compile a '% table' block: widths, a header row and data rows"""
+        try:
+            widths = [int(width) for width in argument.split(',')]
+        except ValueError:
+            raise TemplateError(f"line {lineno}: table widths must be integers, got '{argument}'")
+
+        rows = []
+        while index < len(lines) and lines[index].strip() != '% end':
+            row_lineno = index + 1
+            rows.append([self._merge_text(self._compile_line(cell.strip(), row_lineno))
+                         for cell in lines[index].split('|')])
+            index += 1
+        if index == len(lines):
+            raise TemplateError(f"line {lineno}: table is missing '% end'")
+        if not rows:
+            raise TemplateError(f"line {lineno}: table needs a header row")
+
+        if any(node[0] != TEXT for cell in rows[0] for node in cell):
+            raise TemplateError(f"line {lineno + 1}: table headers must be plain text")
+        headers = ["".join(node[1] for node in cell) for cell in rows[0]]
+        return (TABLE, widths, headers, rows[1:]), index + 1
+
+    def _compile_chart(self, argument: str, lineno: int) -> tuple:
+        """Compile a '% chart KIND path width height' directive"""
+        words = argument.split()
+        if len(words) != 4 or words[0] not in CHART_KINDS:
+            raise TemplateError(f"line {lineno}: expected '% chart {'|'.join(CHART_KINDS)} path width height'")
+        try:
+            return (CHART, words[0], self._path(words[1], lineno), int(words[2]), int(words[3]))
+        except ValueError:
+            raise TemplateError(f"line {lineno}: chart width and height must be integers")
+
+    def _compile_line(self, line: str, lineno: int) -> List[tuple]:
+        """Split a line into literal text and expression nodes"""
+        nodes: List[tuple] = []
+        position = 0
+        for match in _EXPRESSION_RE.finditer(line):
+            if match.start() > position:
+                nodes.append((TEXT, line[position:match.start()]))
+            nodes.append(self._compile_expression(match.group(1).strip(), lineno))
+            position = match.end()
+        if position < len(line):
+            nodes.append((TEXT, line[position:]))
+        return nodes
+
+    def _compile_text_line(self, line: str, lineno: int) -> tuple:
+        """Compile a plain template line, wrapping it now if it has no expressions"""
+        nodes = self._compile_line(line, lineno)
+        if all(node[0] == TEXT for node in nodes):
+            return (TEXT, wrap_line(line, self.width) + "\n")
+        return (LINE, self._merge_text(nodes))
+
+    def _compile_expression(self, expression: str, lineno: int) -> tuple:
+        """Compile the contents of a {{ }} expression"""
+        words = expression.split()
+        if words and words[0] == 'bar':
+            if len(words) != 4:
+                raise TemplateError(f"line {lineno}: expected '{{{{bar path max width}}}}'")
+            try:
+                return (BAR, self._path(words[1], lineno), float(words[2]), int(words[3]))
+            except ValueError:
+                raise TemplateError(f"line {lineno}: bar max and width must be numbers")
+        if words and words[0] == 'now':
+            return (NOW, expression[3:].strip() or '%Y-%m-%d %H:%M:%S')
+
+        path, has_default, default = expression.partition('|')
+        return (FIELD, self._path(path.strip(), lineno), default if has_default else 'N/A')
+
+    @staticmethod
+    def _path(text: str, lineno: int) -> Tuple[str, ...]:
+        """Parse a dotted data path"""
+        if not text:
+            raise TemplateError(f"line {lineno}: missing data path")
+        return tuple(text.split('.'))
+
+    @staticmethod
+    def _merge_text(nodes: List[tuple]) -> List[tuple]:
+        """Join adjacent literal nodes so rendering appends fewer strings"""
+        merged: List[tuple] = []
+        for node in nodes:
+            if node[0] == TEXT and merged and merged[-1][0] == TEXT:
+                merged[-1] = (TEXT, merged[-1][1] + node[1])
+            else:
+                merged.append(node)
+        return merged
+
+    def _render_inline(self, nodes: List[tuple], data: Dict[str, Any], now: datetime) -> str:
+        """Render a list of inline nodes to a single string"""
+        parts: List[str] = []
+        self._render_nodes(nodes, data, now, parts)
+        return "".join(parts)
+
+    def _render_nodes(self, nodes: List[tuple], data: Dict[str, Any], now: datetime, parts: List[str],
+                      boundaries: Optional[List[Tuple[Optional[str], int]]] = None):
+        """Walk a render plan, appending output strings to parts
+
+        When boundaries is given, (section name, index into parts) is recorded
+        where each section starts, and (None, index) where it ends.
+        """
+        for node in nodes:
+            kind = node[0]
+            if kind == TEXT:
+                parts.append(node[1])
+            elif kind == SECTION:
+                if boundaries is not None:
+                    boundaries.append((node[1], len(parts)))
+                parts.append(node[2])
+            elif kind == RULE:
+                parts.append(node[1])
+                if boundaries is not None and boundaries[-1][0] is not None:
+                    boundaries.append((None, len(parts)))
+            elif kind == LINE:
+                parts.append(wrap_line(self._render_inline(node[1], data, now), self.width) + "\n")
+            elif kind == FIELD:
+                value = lookup(data, node[1])
+                parts.append(node[2] if value is _MISSING else str(value))
+            elif kind == BAR:
+                value = lookup(data, node[1])
+                value = 0 if value is _MISSING else value
+                parts.append(self.formatter.create_bar_chart(float(value), node[2], node[3]))
+            elif kind == NOW:
+                parts.append(now.strftime(node[1]))
+            elif kind == IF:
+                if lookup(data, node[1]) is not _MISSING:
+                    self._render_nodes(node[2], data, now, parts, boundaries)
+            elif kind == LIST:
+                items = lookup(data, node[1])
+                if items is not _MISSING:
+                    parts.extend(wrap_item(str(item), self.width) + "\n" for item in items)
+            elif kind == CHART:
+                series = lookup(data, node[2])
+                if series is not _MISSING and len(series) > 0:
+                    parts.append(self.formatter.create_series_chart(node[1], series, node[3], node[4]) + "\n")
+            elif kind == TABLE:
+                _, widths, headers, rows = node
+                table_rows = [[self._render_inline(cell, data, now) for cell in row] for row in rows]
+                parts.append(self.formatter.create_table(headers, table_rows, widths) + "\n")
@@ -1,31 +1,224 @@
-import wiringpi as wp
 import time
 import subprocess
 import logging
 import queue
 import threading
 import os
+from collections import deque
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Dict, Optional
+from control_socket import send_command, ControlError, DaemonUnreachable, PRINT_NOW, REPRINT_LAST, STATUS
+from gpio_input import ButtonInput, WiringPiBackend, LOW, SHORT_PRESS
+from led_patterns import LedScheduler, BUSY, SUCCESS, ERROR, STALE
+from log_setup import exit_on_sigterm, setup_logging
+
+class DaemonSupervisor:
+    """Keeps the print daemon running: starts it, health-checks it and restarts it.
+    
+    The child's stdout and stderr are drained line by line into the logger
+    so it can never block on a full pipe. Restarts back off exponentially,
+    and when the daemon keeps crashing the supervisor pauses instead of
+    restarting it in a tight loop. A daemon that is already answering
+    (e.g. started by systemd) is only monitored.
+    """
+    
+    def __init__(self, start: Callable[[], Optional[subprocess.Popen]], health_check: Callable[[], bool],
+                 logger: logging.Logger):
+        self.start_process = start  # Returns a Popen with stdout/stderr pipes, or None
+        self.health_check = health_check
+        self.logger = logger
+        
+        self.check_interval = 10.0  # seconds between health checks
+        self.startup_timeout = 30.0  # seconds a new daemon has to become healthy
+        self.max_failed_checks = 3  # consecutive failed checks before a restart
+        self.min_backoff = 1.0  # seconds, doubled for each consecutive failure
+        self.max_backoff = 60.0
+        self.stable_time = 60.0  # a run this long resets the backoff
+        self.crash_window = 300.0  # seconds
+        self.max_crashes = 5  # crashes within crash_window that count as a crash loop
+        
+        self.process: Optional[subprocess.Popen] = None
+        self.healthy = threading.Event()
+        self.stats = {
+            'starts': 0,
+            'restarts': 0,
+            'crashes': 0,
+            'health_failures': 0,
+            'crash_loops': 0,
+            'last_exit_code': None,
+            'last_startup_ms': None
+        }
+        self._launched_at: Optional[float] = None
+        self._healthy_since: Optional[float] = None
+        self._failed_checks = 0
+        self._consecutive_failures = 0
+        self._crash_times = deque()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        """Start supervising in a background thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._supervise, daemon=True)
+            self._thread.start()
+    
+    def stop(self):
+        """Stop supervising and terminate the daemon if we started it."""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self._terminate()
+        self.healthy.clear()
+    
+    def wait_until_healthy(self, timeout: Optional[float] = None) -> bool:
+        """Block until the daemon answers health checks."""
+        return self.healthy.wait(timeout)
+    
+    @property
+    def uptime(self) -> Optional[float]:
+        """Seconds the daemon has been healthy, or None if it is down."""
+        if self._healthy_since is None:
+            return None
+        return time.monotonic() - self._healthy_since
+    
+    def _supervise(self):
+        while not self._stopping.is_set():
+            if self.process is not None and self.process.poll() is not None:
+                self._on_exit()
+            
+            if self.process is None:
+                if self.health_check():
+                    self._mark_healthy()  # Daemon managed elsewhere; just watch it
+                    self._stopping.wait(self.check_interval)
+                    continue
+                self._mark_down()
+                if not self._backoff():
+                    break
+                self._launch()
+                continue
+            
+            if self.health_check():
+                if not self.healthy.is_set() and self._launched_at is not None:
+                    self.stats['last_startup_ms'] = (time.monotonic() - self._launched_at) * 1000
+                    self.logger.info(f"Print daemon healthy after {self.stats['last_startup_ms']:.0f} ms")
+                self._mark_healthy()
+                self._stopping.wait(self.check_interval)
+                continue
+            
+            if self.healthy.is_set():
+                self._failed_checks += 1
+                self.stats['health_failures'] += 1
+                self.logger.warning(f"Print daemon health check failed ({self._failed_checks}/{self.max_failed_checks})")
+                if self._failed_checks >= self.max_failed_checks:
+                    self.logger.error("Print daemon unresponsive, restarting it")
+                    self._terminate()
+                    continue
+                self._stopping.wait(self.check_interval)
+            elif time.monotonic() - self._launched_at > self.startup_timeout:
+                self.logger.error(f"Print daemon not healthy within {self.startup_timeout:.0f} s, restarting it")
+                self._terminate()
+            else:
+                self._stopping.wait(0.2)  # Still starting up
+    
+    def _launch(self):
+        """Start a new daemon process and drain its output."""
+        self.process = self.start_process()
+        self._launched_at = time.monotonic()
+        if self.process is None:
+            self._consecutive_failures += 1
+            return
+        if self.stats['starts']:
+            self.stats['restarts'] += 1
+        self.stats['starts'] += 1
+        for pipe, level in ((self.process.stdout, logging.INFO), (self.process.stderr, logging.WARNING)):
+            if pipe is not None:
+                threading.Thread(target=self._drain, args=(pipe, level), daemon=True).start()
+    
+    def _drain(self, pipe, level: int):
+        """Forward the child's output to the logger until the pipe closes."""
+        with pipe:
+            for line in iter(pipe.readline, b''):
+                self.logger.log(level, f"[print_daemon] {line.decode(errors='replace').rstrip()}")
+    
+    def _on_exit(self):
+        """Record an unexpected exit of the daemon."""
+        code = self.process.returncode
+        ran_for = time.monotonic() - self._launched_at
+        self.process = None
+        self.stats['crashes'] += 1
+        self.stats['last_exit_code'] = code
+        self.logger.error(f"Print daemon exited with code {code} after {ran_for:.0f} s")
+        self._consecutive_failures = 1 if ran_for >= self.stable_time else self._consecutive_failures + 1
+        
+        now = time.monotonic()
+        self._crash_times.append(now)
+        while self._crash_times and now - self._crash_times[0] > self.crash_window:
+            self._crash_times.popleft()
+    
+    def _backoff(self) -> bool:
+        """Wait before (re)starting; False if supervision was stopped meanwhile."""
+        if len(self._crash_times) >= self.max_crashes:
+            self.stats['crash_loops'] += 1
+            self.logger.error(f"Print daemon crashed {len(self._crash_times)} times in "
+                              f"{self.crash_window:.0f} s; pausing restarts for {self.crash_window:.0f} s")
+            self._crash_times.clear()
+            self._consecutive_failures = 0
+            return not self._stopping.wait(self.crash_window)
+        if self._consecutive_failures:
+            delay = min(self.max_backoff, self.min_backoff * 2 ** (self._consecutive_failures - 1))
+            self.logger.info(f"Restarting print daemon in {delay:.1f} s")
+            return not self._stopping.wait(delay)
+        return not self._stopping.is_set()
+    
+    def _mark_healthy(self):
+        self._failed_checks = 0
+        if not self.healthy.is_set():
+            self._healthy_since = time.monotonic()
+            self.healthy.set()
+    
+    def _mark_down(self):
+        self.healthy.clear()
+        self._healthy_since = None
+    
+    def _terminate(self):
+        """Stop the daemon process we started, if any."""
+        process = self.process
+        if process is None or process.poll() is not None:
+            return
+        process.terminate()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        self._mark_down()
+
 
 class ButtonController:
     """Controls button interaction and print daemon management."""
     
-    def __init__(self, button_pin: int = 17, led_pin: int = 27):
+    def __init__(self, button_pin: int = 17, led_pin: int = 27, gpio=None):
         # Pin Configuration
         self.BUTTON_PIN = button_pin
         self.LED_PIN = led_pin
-        self.DEBOUNCE_TIME = 0.2  # 200ms debounce
+        self.DEBOUNCE_TIME = 0.05  # Edges within 50ms of a press or release are contact bounce
+        self.LONG_PRESS_TIME = 1.5  # Holding this long reprints the last report
+        self.gpio = gpio or WiringPiBackend()  # SimulatedGPIO for off-device runs
+        self.button: Optional[ButtonInput] = None
         
         # Queue for print jobs
         self.print_queue = queue.Queue()
         
         # Status tracking
-        self.daemon_running = False
         self.is_processing = False
         
-        # Setup logging
-        self._setup_logging()
+        # Logging is configured by the entry point (see __main__)
+        self.logger = logging.getLogger('ButtonController')
+        
+        # The print daemon stays resident and is driven over its control socket
+        self.daemon_start_timeout = 30.0  # seconds a press waits for the daemon
+        self.supervisor = DaemonSupervisor(self._start_print_daemon, self._daemon_healthy, self.logger)
         
         # Initialize GPIO
         self._setup_gpio()
@@ -34,62 +227,25 @@ class ButtonController:
         self.worker_thread = threading.Thread(target=self._process_queue, daemon=True)
         self.worker_thread.start()
     
-    def _setup_logging(self):
-        """Configure logging with rotation."""
-        log_dir = Path('/var/log/button_controller')
-        log_dir.mkdir(exist_ok=True)
-        
-        self.logger = logging.getLogger('ButtonController')
-        self.logger.setLevel(logging.DEBUG)
-        
-        # File handler with rotation
-        handler = logging.handlers.RotatingFileHandler(
-            log_dir / 'button_controller.log',
-            maxBytes=1024*1024,  # 1MB
-            backupCount=5
-        )
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        self.logger.addHandler(handler)
-        
-        # Console handler
-        console_handler = logging.StreamHandler()
-        console_handler.setFormatter(formatter)
-        self.logger.addHandler(console_handler)
-    
     def _setup_gpio(self):
         """Initialize GPIO pins with error handling."""
         try:
-            wp.wiringPiSetupGpio()
+            self.gpio.setup()
             
-            # Configure button pin
-            wp.pinMode(self.BUTTON_PIN, wp.INPUT)
-            wp.pullUpDnControl(self.BUTTON_PIN, wp.PUD_UP)
+            # Configure button pin; presses arrive as edge interrupts
+            self.button = ButtonInput(self.gpio, self.BUTTON_PIN,
+                                      self.DEBOUNCE_TIME, self.LONG_PRESS_TIME)
             
-            # Configure LED pin
-            wp.pinMode(self.LED_PIN, wp.OUTPUT)
-            wp.digitalWrite(self.LED_PIN, wp.LOW)
+            # Configure LED pin; patterns play from their own thread
+            self.gpio.setup_output(self.LED_PIN)
+            self.gpio.write(self.LED_PIN, LOW)
+            self.led = LedScheduler(lambda level: self.gpio.write(self.LED_PIN, level))
             
             self.logger.info("GPIO setup completed successfully")
         except Exception as e:
             self.logger.error(f"Failed to initialize GPIO: {e}")
             raise
     
-    def _button_pressed(self) -> bool:
-        """Check if button is pressed with debouncing."""
-        if wp.digitalRead(self.BUTTON_PIN) == wp.LOW:
-            time.sleep(self.DEBOUNCE_TIME)  # Debounce wait
-            return wp.digitalRead(self.BUTTON_PIN) == wp.LOW
-        return False
-    
-    def _blink_led(self, times: int = 3, interval: float = 0.2):
-        """Blink LED to indicate status."""
-        for _ in range(times):
-            wp.digitalWrite(self.LED_PIN, wp.HIGH)
-            time.sleep(interval)
-            wp.digitalWrite(self.LED_PIN, wp.LOW)
-            time.sleep(interval)
-    
     def _check_daemon_script(self) -> bool:
         """Verify print daemon script exists and is executable."""
         daemon_path = Path('./print_daemon.py')
@@ -107,63 +263,102 @@ class ButtonController:
             return None
         
         try:
+            # The supervisor drains both pipes into our logger
             process = subprocess.Popen(
                 ["python3", "print_daemon.py"],
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE
             )
-            self.daemon_running = True
-            self.logger.info("Print daemon started successfully")
+            self.logger.info(f"Print daemon started (pid {process.pid})")
             return process
         except subprocess.SubprocessError as e:
             self.logger.error(f"Failed to start print daemon: {e}")
             return None
     
+    def _daemon_status(self) -> Optional[Dict[str, Any]]:
+        """Status reply from the resident daemon, or None if it is not answering."""
+        try:
+            reply = send_command(STATUS, timeout=2.0)
+        except ControlError:
+            return None
+        return reply if reply.get('ok') else None
+    
+    def _daemon_healthy(self) -> bool:
+        """Health check used by the supervisor."""
+        return self._daemon_status() is not None
+    
+    @property
+    def daemon_running(self) -> bool:
+        """Whether the print daemon is up and answering."""
+        return self.supervisor.healthy.is_set()
+    
+    def daemon_stats(self) -> Dict[str, Any]:
+        """Supervisor counters plus the daemon's current uptime."""
+        return {**self.supervisor.stats, 'uptime': self.supervisor.uptime}
+    
+    def _send_command(self, command: str) -> Dict[str, Any]:
+        """Send a command to the daemon, waiting for the supervisor if it is down.
+
+        Only a command that never reached the daemon is resent; a timeout on an
+        open connection is a failure, since resending could print the page twice.
+        """
+        try:
+            return send_command(command)
+        except DaemonUnreachable as e:
+            self.logger.warning(f"{e}; waiting for the supervisor to bring it back")
+            if not self.supervisor.wait_until_healthy(self.daemon_start_timeout):
+                raise
+            return send_command(command)
+    
     def _process_queue(self):
         """Process the print queue in a separate thread."""
         while True:
             try:
                 # Wait for queue item
-                _ = self.print_queue.get()
+                command = self.print_queue.get()
                 self.is_processing = True
-                wp.digitalWrite(self.LED_PIN, wp.HIGH)
+                self.led.play(BUSY)
                 
-                # Start daemon if not running
-                if not self.daemon_running:
-                    daemon_process = self._start_print_daemon()
-                    if daemon_process:
-                        # Wait for daemon to initialize
-                        time.sleep(2)
-                        
-                        # Check if process is still running
-                        if daemon_process.poll() is None:
-                            self._blink_led(2, 0.5)  # Success indication
-                        else:
-                            stdout, stderr = daemon_process.communicate()
-                            self.logger.error(f"Daemon failed to start: {stderr.decode()}")
-                            self._blink_led(5, 0.1)  # Error indication
+                # One round trip to the pre-warmed daemon; no process start per press
+                started = time.monotonic()
+                reply = self._send_command(command)
+                elapsed_ms = (time.monotonic() - started) * 1000
+                if reply.get('ok'):
+                    self.logger.info(f"Daemon acknowledged '{command}' in {elapsed_ms:.0f} ms: {reply}")
+                    # Printed from stale data, or waiting for fresh data
+                    stale = reply.get('waiting_for_data') or reply.get('refreshing')
+                    self.led.play(STALE if stale else SUCCESS)
+                else:
+                    self.logger.error(f"Daemon rejected '{command}': {reply.get('error')}")
+                    self.led.play(ERROR)
                     
                 self.is_processing = False
-                wp.digitalWrite(self.LED_PIN, wp.LOW)
                 self.print_queue.task_done()
                 
             except Exception as e:
                 self.logger.error(f"Error in queue processing: {e}")
                 self.is_processing = False
-                wp.digitalWrite(self.LED_PIN, wp.LOW)
-                self._blink_led(5, 0.1)  # Error indication
+                self.led.play(ERROR)
     
     def run(self):
         """Main loop to monitor button presses."""
         self.logger.info("Button controller started")
+        exit_on_sigterm()
+        
+        # Pre-warm the daemon so the first press does not pay for its startup
+        self.supervisor.start()
+        if not self.supervisor.wait_until_healthy(self.daemon_start_timeout):
+            self.logger.warning("Print daemon not available yet; the supervisor keeps trying")
         
         try:
             while True:
-                if self._button_pressed() and not self.is_processing:
-                    self.logger.info("Button pressed - queueing print job")
-                    self.print_queue.put(1)
-                    
-                time.sleep(0.01)  # Prevent CPU hogging
+                # Sleeps until an edge interrupt or the long-press deadline
+                kind, latency = self.button.wait_for_press()
+                if self.is_processing:
+                    continue
+                command = PRINT_NOW if kind == SHORT_PRESS else REPRINT_LAST
+                self.logger.info(f"Button {kind} press ({latency * 1000:.1f} ms) - queueing '{command}'")
+                self.print_queue.put(command)
                 
         except KeyboardInterrupt:
             self.logger.info("Button controller stopped by user")
@@ -171,10 +366,19 @@ class ButtonController:
             self.logger.error(f"Unexpected error in main loop: {e}")
         finally:
             # Cleanup
-            wp.digitalWrite(self.LED_PIN, wp.LOW)
-            self.daemon_running = False
-            self.logger.info("Button controller shutdown complete")
+            self.led.stop()
+            self.supervisor.stop()
+            self.logger.info(f"Button controller shutdown complete (daemon stats: {self.daemon_stats()})")
 
 if __name__ == "__main__":
+    # Buffered, rotating logging off the button handling path
+    setup_logging(
+        Path('/var/log/button_controller') / 'button_controller.log',
+        logging.DEBUG,
+        name='ButtonController',
+        fmt='%(asctime)s - %(levelname)s - %(message)s',
+        max_bytes=1024*1024,  # 1MB
+        backup_count=5
+    )
     controller = ButtonController()
     controller.run()
\ No newline at end of file
@@ -0,0 +1,125 @@
+import numpy as np
+from typing import List, Optional, Sequence, Tuple
+
+# Only glyphs from the printer's CP437 character table are used
+FULL_BLOCK = '█'
+HALF_BLOCK = '▄'
+BAND = '▒'
+EMPTY = ' '
+
+
+def as_series(series: Sequence) -> Tuple[np.ndarray, np.ndarray]:
+    """Accept a list of values or of (x, y) pairs and return x and y arrays"""
+    values = np.asarray(series, dtype=float)
+    if values.ndim == 2:
+        return values[:, 0], values[:, 1]
+    return np.arange(len(values), dtype=float), values
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Downsample to threshold points with Largest-Triangle-Three-Buckets.
+
+    Keeps the first and last points and, for every bucket in between, the
+    point forming the largest triangle with the previously kept point and
+    the average of the next bucket, which preserves peaks and troughs.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return x, y
+
+    # Bucket edges for the n - 2 interior points
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    # Averages of every bucket, computed in one pass
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    avg_x = np.append(sums_x / counts, x[-1])
+    avg_y = np.append(sums_y / counts, y[-1])
+
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_x, next_y = avg_x[bucket + 1], avg_y[bucket + 1]
+        # Twice the triangle area for every candidate in the bucket
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+
+    return x[selected], y[selected]
+
+
+def scale(values: np.ndarray, levels: int, lo: Optional[float] = None,
+          hi: Optional[float] = None) -> np.ndarray:
+    """Map values onto integer levels 0..levels"""
+    lo = float(np.min(values)) if lo is None else lo
+    hi = float(np.max(values)) if hi is None else hi
+    if hi <= lo:
+        return np.full(len(values), levels // 2, dtype=int)
+    return np.rint((values - lo) / (hi - lo) * levels).astype(int)
+
+
+def render_columns(heights: np.ndarray, height: int) -> List[str]:
+    """Render column heights, measured in half rows, as block characters"""
+    rows = np.arange(height - 1, -1, -1)[:, None]
+    grid = np.where(heights >= 2 * (rows + 1), FULL_BLOCK,
+                    np.where(heights == 2 * rows + 1, HALF_BLOCK, EMPTY))
+    return ["".join(row) for row in grid.tolist()]
+
+
+def bucket_bounds(count: int, width: int) -> np.ndarray:
+    """Start index of each of width equal-sized buckets over count points"""
+    return np.linspace(0, count, min(width, count) + 1).astype(int)[:-1]
+
+
+def sparkline(series: Sequence, width: int = 40, height: int = 2) -> str:
+    """Block chart of a series, downsampled with LTTB to at most width columns"""
+    x, y = as_series(series)
+    if len(y) == 0:
+        return ""
+    if len(y) > width:
+        x, y = lttb(x, y, width)
+    return "\n".join(render_columns(scale(y, 2 * height), height))
+
+
+def histogram(series: Sequence, width: int = 40, height: int = 4) -> str:
+    """Distribution of the series values in width bins"""
+    _, y = as_series(series)
+    if len(y) == 0:
+        return ""
+    counts, _ = np.histogram(y, bins=width)
+    return "\n".join(render_columns(scale(counts, 2 * height, lo=0), height))
+
+
+def minmax_band(series: Sequence, width: int = 40, height: int = 4) -> str:
+    """Range of values per column as a shaded band, with the column mean in solid blocks"""
+    _, y = as_series(series)
+    if len(y) == 0:
+        return ""
+    starts = bucket_bounds(len(y), width)
+    lows = np.minimum.reduceat(y, starts)
+    highs = np.maximum.reduceat(y, starts)
+    means = np.add.reduceat(y, starts) / np.diff(np.append(starts, len(y)))
+
+    lo, hi = float(lows.min()), float(highs.max())
+    low_rows = scale(lows, height - 1, lo, hi)
+    high_rows = scale(highs, height - 1, lo, hi)
+    mean_rows = scale(means, height - 1, lo, hi)
+
+    rows = np.arange(height - 1, -1, -1)[:, None]
+    grid = np.where(rows == mean_rows, FULL_BLOCK,
+                    np.where((rows >= low_rows) & (rows <= high_rows), BAND, EMPTY))
+    return "\n".join("".join(row) for row in grid.tolist())
+
+
+CHARTS = {
+    'spark': sparkline,
+    'hist': histogram,
+    'band': minmax_band,
+}
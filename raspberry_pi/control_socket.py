@@ -0,0 +1,108 @@
+import json
+import logging
+import os
+import socket
+import socketserver
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger('control_socket')
+
+CONTROL_SOCKET = Path("/run/dot_matrix/print_daemon.sock")
+
+# Commands understood by the print daemon
+PRINT_NOW = "print now"
+REPRINT_LAST = "reprint last"
+STATUS = "status"
+
+
+class ControlError(Exception):
+    """Raised when the print daemon cannot be reached or rejects a command"""
+    pass
+
+
+class DaemonUnreachable(ControlError):
+    """Raised when no connection could be made, so the command was never sent"""
+    pass
+
+
+class _CommandHandler(socketserver.StreamRequestHandler):
+    """One connection: a command line in, one JSON acknowledgement line out"""
+
+    def handle(self):
+        command = self.rfile.readline(256).decode('utf-8', 'replace').strip().lower()
+        handler = self.server.handlers.get(command)
+        if handler is None:
+            reply = {'ok': False, 'error': f"unknown command '{command}'"}
+        else:
+            try:
+                reply = {'ok': True, **handler()}
+            except Exception as e:
+                logger.error(f"Control command '{command}' failed: {e}")
+                reply = {'ok': False, 'error': str(e)}
+        self.wfile.write(json.dumps(reply, default=str).encode() + b"\n")
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class ControlServer:
+    """Local control socket for a resident print daemon.
+
+    Each handler takes no arguments and returns a dict that is sent back
+    as the acknowledgement, with 'ok' set. Clients connect per command, so
+    a button press costs one socket round trip instead of a process start.
+    """
+
+    def __init__(self, handlers: Dict[str, Callable[[], Dict[str, Any]]],
+                 path: Path = CONTROL_SOCKET):
+        self.handlers = handlers
+        self.path = Path(path)
+        self._server: Optional[_Server] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Bind the socket and serve commands from a background thread"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists():
+            self.path.unlink()  # Left behind by a previous run
+        self._server = _Server(str(self.path), _CommandHandler)
+        self._server.handlers = self.handlers
+        os.chmod(self.path, 0o660)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Control socket listening on {self.path}")
+
+    def stop(self):
+        """Stop serving and remove the socket file"""
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        if self.path.exists():
+            self.path.unlink()
+
+
+def send_command(command: str, path: Path = CONTROL_SOCKET, timeout: float = 10.0) -> Dict[str, Any]:
+    """Send a command to the print daemon and return its acknowledgement"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        try:
+            sock.connect(str(path))
+        except OSError as e:
+            raise DaemonUnreachable(f"Print daemon not reachable: {e}")
+        try:
+            sock.sendall(command.encode() + b"\n")
+            reply = sock.makefile('rb').readline()
+        except OSError as e:
+            # The daemon may have acted on the command, so it must not be resent
+            raise ControlError(f"No reply from print daemon: {e}")
+    if not reply:
+        raise ControlError("Print daemon closed the connection without replying")
+    try:
+        return json.loads(reply)
+    except ValueError:
+        raise ControlError(f"Invalid reply from print daemon: {reply!r}")
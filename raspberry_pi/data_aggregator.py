@@ -1,12 +1,25 @@
-import datetime
-from typing import Dict, List, Any
+import atexit
+import hashlib
 import json
-import threading
 import time
+from typing import Callable, Dict, List, Any, Iterable, Optional, Tuple
+import ssl
+import threading
 import paho.mqtt.client as mqtt
+from pathlib import Path
+from briefing_template import BriefingTemplate, DEFAULT_TEMPLATE
+from layout import PageLayout, STANDARD
+from snapshot_store import Snapshot, SnapshotStore
+from snapshot_cache import EXPIRED, FRESH, SnapshotCache
+from payload_models import PayloadError, decode_payload, from_dict, to_plain
+from payload_encoding import available_encodings, encoded_topics, split_topic
+
+DATA_TIMEOUT = 30.0  # Seconds to wait for a first payload before giving up
 
 class BriefingFormatter:
-    def __init__(self):
+    def __init__(self, template_path: Path = DEFAULT_TEMPLATE, layout: PageLayout = STANDARD):
+        self.layout = layout
+        self.width = layout.width  # Headers, rules and wrapping all follow the page
         self.box_chars = {
             'horizontal': '─',
             'vertical': '│',
@@ -20,53 +33,77 @@ class BriefingFormatter:
             'bottom_intersection': '┴',
             'cross': '┼'
         }
+        self._border_cache: Dict[Tuple[int, ...], Tuple[str, str, str]] = {}
+        # Diff-only mode: section name -> (content digest, printed at, table rows)
+        self.printed_sections: Dict[str, Tuple[str, float, frozenset]] = {}
+        self._pending_sections: Dict[str, Tuple[str, frozenset]] = {}
+        self.template = BriefingTemplate(self, template_path, width=self.width)
 
-    def create_header(self, text: str, width: int = 50) -> str:
+    def create_header(self, text: str, width: Optional[int] = None) -> str:
+        width = width or self.width
         border = "=" * width
         padding = (width - len(text)) // 2
         return f"{border}\n{' ' * padding}{text}\n{border}"
 
-    def create_section_header(self, text: str, width: int = 50) -> str:
+    def create_section_header(self, text: str, width: Optional[int] = None) -> str:
+        width = width or self.width
         stars = "*" * ((width - len(text) - 2) // 2)
         return f"{stars} {text} {stars}"
 
-    def create_table(self, headers: List[str], data: List[List[Any]], col_widths: List[int]) -> str:
-        result = []
-        
-        # Create top border
-        top_border = self.box_chars['top_left']
-        for i, width in enumerate(col_widths):
-            top_border += self.box_chars['horizontal'] * width
-            top_border += self.box_chars['top_right'] if i == len(col_widths)-1 else self.box_chars['top_intersection']
-        result.append(top_border)
+    def _borders(self, col_widths: Tuple[int, ...]) -> Tuple[str, str, str]:
+        """Top, separator and bottom border lines for a set of column widths"""
+        borders = self._border_cache.get(col_widths)
+        if borders is None:
+            c = self.box_chars
+            segments = [c['horizontal'] * width for width in col_widths]
+            borders = (
+                c['top_left'] + c['top_intersection'].join(segments) + c['top_right'],
+                c['left_intersection'] + c['cross'].join(segments) + c['right_intersection'],
+                c['bottom_left'] + c['bottom_intersection'].join(segments) + c['bottom_right'],
+            )
+            self._border_cache[col_widths] = borders
+        return borders
+
+    @staticmethod
+    def _fit(value: Any, width: int) -> str:
+        """Pad a cell to the column width, truncating with an ellipsis if it is too long"""
+        text = str(value)
+        if len(text) > width:
+            text = text[:width - 3] + "..." if width > 3 else text[:width]
+        return text.ljust(width)
+
+    @staticmethod
+    def fit_column_widths(headers: List[str], data: List[List[Any]],
+                          max_width: Optional[int] = None) -> List[int]:
+        """Size columns to their longest cell, shrinking the widest to fit max_width"""
+        widths = [len(str(header)) for header in headers]
+        for row in data:
+            for i, value in enumerate(row[:len(widths)]):
+                widths[i] = max(widths[i], len(str(value)))
         
-        # Add headers
-        header_row = self.box_chars['vertical']
-        for header, width in zip(headers, col_widths):
-            header_row += f"{header:<{width}}"
-            header_row += self.box_chars['vertical']
-        result.append(header_row)
+        if max_width is not None:
+            # Each column adds one border character, plus the closing border
+            available = max_width - len(widths) - 1
+            while sum(widths) > available:
+                widest = widths.index(max(widths))
+                if widths[widest] <= 1:
+                    break
+                widths[widest] -= 1
+        return widths
+
+    def create_table(self, headers: List[str], data: List[List[Any]],
+                     col_widths: Optional[List[int]] = None, max_width: Optional[int] = None) -> str:
+        """Render a box-drawn table; without col_widths the columns are sized to the data"""
+        if col_widths is None:
+            col_widths = self.fit_column_widths(headers, data, max_width)
+        top_border, separator, bottom_border = self._borders(tuple(col_widths))
+        vertical = self.box_chars['vertical']
+        fit = self._fit
         
-        # Add separator
-        separator = self.box_chars['left_intersection']
-        for i, width in enumerate(col_widths):
-            separator += self.box_chars['horizontal'] * width
-            separator += self.box_chars['right_intersection'] if i == len(col_widths)-1 else self.box_chars['cross']
+        result = [top_border]
+        result.append(vertical + vertical.join(map(fit, headers, col_widths)) + vertical)
         result.append(separator)
-        
-        # Add data rows
-        for row in data:
-            data_row = self.box_chars['vertical']
-            for value, width in zip(row, col_widths):
-                data_row += f"{str(value):<{width}}"
-                data_row += self.box_chars['vertical']
-            result.append(data_row)
-        
-        # Add bottom border
-        bottom_border = self.box_chars['bottom_left']
-        for i, width in enumerate(col_widths):
-            bottom_border += self.box_chars['horizontal'] * width
-            bottom_border += self.box_chars['bottom_right'] if i == len(col_widths)-1 else self.box_chars['bottom_intersection']
+        result.extend(vertical + vertical.join(map(fit, row, col_widths)) + vertical for row in data)
         result.append(bottom_border)
         
         return "\n".join(result)
@@ -75,136 +112,278 @@ class BriefingFormatter:
         filled_blocks = int((value / max_value) * width)
         return "▇" * filled_blocks
 
-    def format_briefing(self, data: Dict[str, Any]) -> str:
-        # Initialize the briefing with the main header
-        briefing = [
-            self.create_header("DAILY SECURITY INTELLIGENCE BRIEFING"),
-            f"Date: {datetime.datetime.now().strftime('%Y-%m-%d')}             Location: {data.get('location', 'N/A')}",
-            f"Classification: {data.get('classification', 'CONFIDENTIAL')}",
-            "=" * 50,
-            ""
-        ]
-
-        # Strategic Overview
-        briefing.extend([
-            self.create_section_header("STRATEGIC OVERVIEW"),
-            f"- Today's sentiment: {data.get('sentiment', 'N/A')}",
-            f"- Weather affecting transportation: {data.get('weather_impact', 'N/A')}",
-            f"- Security alerts: {data.get('security_level', 'N/A')}",
-            "*" * 50,
-            ""
-        ])
-
-        # Market Analysis
-        if 'market_data' in data:
-            briefing.extend([
-                self.create_section_header("MARKET ANALYSIS"),
-                "-- STOCK INDICES --"
-            ])
-            
-            # Create market data table
-            headers = ["Index", "Current", "Change"]
-            market_data = [
-                ["Dow Jones", data['market_data'].get('dow_value', 'N/A'), data['market_data'].get('dow_change', 'N/A')],
-                ["S&P 500", data['market_data'].get('sp_value', 'N/A'), data['market_data'].get('sp_change', 'N/A')],
-                ["NASDAQ", data['market_data'].get('nasdaq_value', 'N/A'), data['market_data'].get('nasdaq_change', 'N/A')]
-            ]
-            briefing.append(self.create_table(headers, market_data, [12, 10, 10]))
-            
-            # Add commodity trends
-            briefing.extend([
-                "-- COMMODITY TREND --",
-                f"Gold: ${data['market_data'].get('gold_price', 'N/A')}/oz {self.create_bar_chart(float(data['market_data'].get('gold_trend', 0)), 100, 7)} {data['market_data'].get('gold_direction', 'N/A')}",
-                f"Crude Oil: ${data['market_data'].get('oil_price', 'N/A')}/bbl {self.create_bar_chart(float(data['market_data'].get('oil_trend', 0)), 100, 5)} {data['market_data'].get('oil_direction', 'N/A')}",
-                "*" * 50,
-                ""
-            ])
-
-        # Add remaining sections with proper formatting
-        sections = [
-            ('SUPPLY CHAIN & LOGISTICS', 'supply_chain'),
-            ('MILITARY DEVELOPMENTS', 'military'),
-            ('GLOBAL HEADLINES', 'headlines'),
-            ('ACTIONABLE RECOMMENDATIONS', 'recommendations')
-        ]
-
-        for section_title, key in sections:
-            if key in data:
-                briefing.extend([
-                    self.create_section_header(section_title),
-                    *[f"- {item}" for item in data[key]],
-                    "*" * 50,
-                    ""
-                ])
-
-        # Add footer
-        briefing.extend([
-            "=" * 50,
-            "End of Briefing - Confidential Information",
-            "For inquiries contact: security@yourdomain.com",
-            "*" * 50
-        ])
-
-        return "\n".join(briefing)
+    def create_series_chart(self, kind: str, series: List[Any], width: int = 40, height: int = 2) -> str:
+        """Render a historical series as a 'spark', 'hist' or 'band' chart"""
+        # NumPy is only needed when a briefing actually contains series data
+        from charts import CHARTS
+        return CHARTS[kind](series, width, height)
+
+    def format_briefing(self, data: Dict[str, Any], diff_only: bool = False,
+                        diff_rows: bool = False) -> str:
+        # The layout lives in shared/templates/briefing_template.txt
+        if diff_only:
+            return self.format_changes(data, diff_rows)
+        return self.template.render(data)
+
+    def format_changes(self, data: Dict[str, Any], diff_rows: bool = False) -> str:
+        """Render only the sections that changed since the last mark_printed()
+
+        Unchanged sections become a one-line marker. With diff_rows, changed
+        sections also leave out table rows that were already printed.
+        """
+        parts = []
+        self._pending_sections = {}
+        for name, text in self.template.render_sections(data):
+            if name is None:
+                parts.append(text)
+                continue
+            digest = hashlib.sha1(text.encode()).hexdigest()
+            self._pending_sections[name] = (digest, self._table_rows(text))
+            previous = self.printed_sections.get(name)
+            if previous is None:
+                parts.append(text)
+            elif previous[0] == digest:
+                parts.append(f"{name}: unchanged since {time.strftime('%H:%M', time.localtime(previous[1]))}\n")
+            elif diff_rows:
+                parts.append(self._changed_rows(text, previous[2]))
+            else:
+                parts.append(text)
+        return "".join(parts)
+
+    def mark_printed(self, printed_at: Optional[float] = None):
+        """Remember the sections of the last format_changes() as printed"""
+        printed_at = time.time() if printed_at is None else printed_at
+        for name, (digest, rows) in self._pending_sections.items():
+            previous = self.printed_sections.get(name)
+            if previous is not None and previous[0] == digest:
+                continue  # Keep the time this content was first printed
+            self.printed_sections[name] = (digest, printed_at, rows)
+        self._pending_sections = {}
+
+    def _table_rows(self, text: str) -> frozenset:
+        """Body rows of every table in a rendered section (header rows excluded)"""
+        rows = set()
+        header_next = False
+        for line in text.split("\n"):
+            if line.startswith(self.box_chars['top_left']):
+                header_next = True
+            elif line.startswith(self.box_chars['vertical']):
+                if header_next:
+                    header_next = False
+                else:
+                    rows.add(line)
+        return frozenset(rows)
+
+    def _changed_rows(self, text: str, printed_rows: frozenset) -> str:
+        """Drop already printed table rows, noting how many were left out"""
+        lines = []
+        skipped = 0
+        for line in text.split("\n"):
+            if line in printed_rows:
+                skipped += 1
+                continue
+            lines.append(line)
+            if skipped and line.startswith(self.box_chars['bottom_left']):
+                lines.append(f"({skipped} unchanged rows)")
+                skipped = 0
+        return "\n".join(lines)
+
+
+class ResumingSSLContext(ssl.SSLContext):
+    """SSL context that offers the previous TLS session when reconnecting.
+
+    paho wraps a new socket on every (re)connect; passing the saved session
+    lets AWS IoT resume it instead of doing a full handshake.
+    """
+    session = None
+
+    def wrap_socket(self, *args, **kwargs):
+        if self.session is not None and 'session' not in kwargs:
+            kwargs['session'] = self.session
+        return super().wrap_socket(*args, **kwargs)
 
 
 class DataAggregator:
-    def __init__(self):
-        self.latest_data = None
+    def __init__(self, topics: Iterable[str] = ("your/iot/topic",),
+                 cache: Optional[SnapshotCache] = None):
+        self.store = SnapshotStore()  # Versioned payloads per topic
+        self.cache = cache  # Durable copy that survives restarts
         self.mqtt_client = None
+        self.topics = set(topics)
+        self.refresh_topic = "intelligence-briefing/refresh"  # Asks the publishers to republish
+        self.stale_topics = set()  # Served from the cache until a refresh arrives
+        self.ssl_context = None
+        self.connected = threading.Event()
+        self._load_cache()
         self.setup_mqtt()
 
+    def _load_cache(self):
+        """Seed the store with the last known payloads so readers need not wait.
+
+        Payloads past their freshness policy are left out; stale ones are
+        served and a refresh is requested for them once connected.
+        """
+        if self.cache is None:
+            return
+        now = time.time()
+        for topic, (payload, updated_at) in self.cache.load_all().items():
+            if topic not in self.topics:
+                continue
+            state, _ = self.cache.freshness(topic, now)
+            if state == EXPIRED:
+                continue
+            if state != FRESH:
+                self.stale_topics.add(topic)
+            self.store.update(topic, from_dict(topic, payload), received_at=updated_at)
+
+    def request_refresh(self, topics: Iterable[str]):
+        """Ask the publishers to republish the given topics"""
+        categories = sorted(topic.rsplit('/', 1)[-1] for topic in topics)
+        payload = json.dumps({'categories': categories, 'accept': available_encodings()})
+        self.mqtt_client.publish(self.refresh_topic, payload, qos=1)
+
     def setup_mqtt(self):
-        """Set up MQTT client to connect to AWS IoT Core."""
+        """Set up a long-lived MQTT session with AWS IoT Core."""
         self.mqtt_client = mqtt.Client()
-        self.mqtt_client.tls_set(
-            ca_certs="AmazonRootCA1.pem",
-            certfile="device.pem.crt",
-            keyfile="private.pem.key"
-        )
+        self.ssl_context = ResumingSSLContext(ssl.PROTOCOL_TLS_CLIENT)
+        self.ssl_context.load_verify_locations(cafile="AmazonRootCA1.pem")
+        self.ssl_context.load_cert_chain(certfile="device.pem.crt", keyfile="private.pem.key")
+        self.mqtt_client.tls_set_context(self.ssl_context)
         self.mqtt_client.on_connect = self.on_connect
+        self.mqtt_client.on_disconnect = self.on_disconnect
         self.mqtt_client.on_message = self.on_message
+        # paho reconnects by itself from its network thread
+        self.mqtt_client.reconnect_delay_set(min_delay=1, max_delay=60)
         # Replace 'your-endpoint' with your AWS IoT endpoint
         self.mqtt_client.connect("your-endpoint.amazonaws.com", 8883)
-        # Start the MQTT client in a separate thread
-        threading.Thread(target=self.mqtt_client.loop_forever, daemon=True).start()
+        # Start the MQTT client's own network thread
+        self.mqtt_client.loop_start()
+
+    def subscribe(self, topic: str):
+        """Add a topic to the shared session; it is restored after reconnects"""
+        if topic in self.topics:
+            return
+        self.topics.add(topic)
+        if self.connected.is_set():
+            self._subscribe(self.mqtt_client, topic)
+
+    @staticmethod
+    def _subscribe(client, topic: str):
+        """Subscribe to a topic and its encoded variants (e.g. "topic/zlib")"""
+        client.subscribe([(topic_filter, 0) for topic_filter in encoded_topics(topic)])
+
+    def close(self):
+        """Disconnect and stop the network thread"""
+        self.mqtt_client.disconnect()
+        self.mqtt_client.loop_stop()
+        self.connected.clear()
 
     def on_connect(self, client, userdata, flags, rc):
         """Callback when the client connects to AWS IoT Core."""
         if rc == 0:
             # Connection successful
-            client.subscribe("your/iot/topic")
+            sock = client.socket()
+            if isinstance(sock, ssl.SSLSocket):
+                if sock.session_reused:
+                    print("Resumed TLS session with AWS IoT Core")
+                self.ssl_context.session = sock.session
+            for topic in self.topics:
+                self._subscribe(client, topic)
+            self.connected.set()
+            if self.stale_topics:
+                self.request_refresh(self.stale_topics)
         else:
             # Connection failed
             print(f"Failed to connect, return code {rc}")
 
+    def on_disconnect(self, client, userdata, rc):
+        """Callback when the connection to AWS IoT Core drops."""
+        self.connected.clear()
+        if rc != 0:
+            print(f"Unexpected disconnection ({rc}), reconnecting")
+
     def on_message(self, client, userdata, msg):
         """Callback when a message is received from the MQTT topic."""
         try:
-            message = json.loads(msg.payload.decode())
-            self.latest_data = message
-        except json.JSONDecodeError:
-            print("Received invalid JSON payload")
+            # Encoded payloads arrive on "topic/<encoding>" and are stored under topic
+            topic, encoding = split_topic(msg.topic)
+            # Weather, market and security topics decode into typed models
+            message = decode_payload(topic, msg.payload, encoding)
+            self.store.update(topic, message)
+            self.stale_topics.discard(topic)
+            if self.cache is not None:
+                self.cache.put(topic, to_plain(message))
+        except PayloadError as e:
+            print(f"Rejected payload on {msg.topic}: {e}")
 
-    def get_latest_data(self) -> Dict[str, Any]:
-        """Retrieve the most recent data from the MQTT topic."""
-        # Wait until data is received
-        while self.latest_data is None:
-            time.sleep(0.1)
-        return self.latest_data
+    @property
+    def latest_data(self) -> Optional[Dict[str, Any]]:
+        """Most recent payload from any subscribed topic."""
+        latest = self.store.latest()
+        return latest.payload if latest else None
 
+    def get_latest_data(self, timeout: Optional[float] = DATA_TIMEOUT) -> Dict[str, Any]:
+        """Retrieve the most recent data from the MQTT topic; None waits forever."""
+        # Wake up as soon as a payload lands instead of polling
+        snapshot = self.store.wait_for_version(0, timeout=timeout)
+        if snapshot is None:
+            raise TimeoutError(f"No MQTT data received within {timeout} seconds")
+        return snapshot.payload
 
-def format_data_for_printing() -> str:
+    def wait_for_update(self, since_version: int, topic: Optional[str] = None,
+                        timeout: Optional[float] = None) -> Optional[Snapshot]:
+        """Wait for a payload newer than since_version, or None on timeout."""
+        return self.store.wait_for_version(since_version, topic, timeout)
+
+
+_aggregator: Optional[DataAggregator] = None
+_aggregator_lock = threading.Lock()
+
+
+def get_aggregator() -> DataAggregator:
+    """Return the process-wide aggregator, connecting it on first use"""
+    global _aggregator
+    with _aggregator_lock:
+        if _aggregator is None:
+            _aggregator = DataAggregator(cache=SnapshotCache())
+            atexit.register(_aggregator.close)
+        return _aggregator
+
+
+_formatter: Optional[BriefingFormatter] = None
+
+
+def format_data_for_printing(diff_only: bool = False,
+                             print_briefing: Optional[Callable[[str], Any]] = None,
+                             timeout: float = DATA_TIMEOUT) -> str:
     """
     Format the intelligence briefing data with data from AWS IoT MQTT topic.
 
+    Args:
+        diff_only: only include sections that changed since the last printed briefing
+        print_briefing: called with the briefing; only once it returns without raising
+            are its sections remembered as printed
+        timeout: seconds to wait for data when nothing has arrived yet
+
     Returns:
-        str: Formatted briefing ready for printing
+        str: Formatted briefing ready for printing, or an empty string (and
+        nothing printed) when no data arrived within the timeout
     """
-    aggregator = DataAggregator()
-    data = aggregator.get_latest_data()
-    formatter = BriefingFormatter()
-    return formatter.format_briefing(data)
+    global _formatter
+    aggregator = get_aggregator()
+    try:
+        data = aggregator.get_latest_data(timeout=timeout)
+    except TimeoutError as e:
+        print(f"No briefing to print: {e}")
+        return ""
+    if _formatter is None:
+        _formatter = BriefingFormatter()  # Kept so diff-only mode remembers the last briefing
+    briefing = _formatter.format_briefing(data, diff_only=diff_only)
+    if print_briefing is not None:
+        print_briefing(briefing)
+        if diff_only:
+            _formatter.mark_printed()
+    return briefing
 
 
 # Example usage
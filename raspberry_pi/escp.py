@@ -0,0 +1,142 @@
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional
+
+from layout import PageLayout, STANDARD, wrap_line
+
+# ESC/P control sequences understood by the Panasonic KX-P1592
+ESC_INIT = b"\x1B@"  # Initialize printer
+ESC_LINE_SPACING_24 = b"\x1B3\x18"  # Set line spacing to 24/216"
+ESC_CHARSET_PC437 = b"\x1Bt\x01"  # Select the IBM PC graphics character table
+ESC_BOLD_ON = b"\x1BE"
+ESC_BOLD_OFF = b"\x1BF"
+ESC_CONDENSED_ON = b"\x0F"  # SI
+ESC_CONDENSED_OFF = b"\x12"  # DC2
+ESC_DOUBLE_WIDTH_ON = b"\x1BW\x01"
+ESC_DOUBLE_WIDTH_OFF = b"\x1BW\x00"
+FORM_FEED = b"\x0C"
+
+PRINTER_INIT = ESC_INIT + ESC_LINE_SPACING_24 + ESC_CHARSET_PC437
+
+# Inline markup: <b>bold</b>, <c>condensed</c>, <w>double width</w>
+MARKUP_CODES = {
+    '<b>': ESC_BOLD_ON,
+    '</b>': ESC_BOLD_OFF,
+    '<c>': ESC_CONDENSED_ON,
+    '</c>': ESC_CONDENSED_OFF,
+    '<w>': ESC_DOUBLE_WIDTH_ON,
+    '</w>': ESC_DOUBLE_WIDTH_OFF,
+}
+_MARKUP_RE = re.compile(r"(</?[bcw]>)")
+
+# Characters outside CP437 that the formatters are known to emit
+FALLBACKS = {
+    '▇': '█',
+    '→': '->',
+    '←': '<-',
+    '‘': "'",
+    '’': "'",
+    '“': '"',
+    '”': '"',
+    '–': '-',
+    '—': '-',
+    '…': '...',
+}
+
+
+class _CodePageTable(dict):
+    """str.translate table from Unicode to CP437 byte values.
+
+    Characters that are not in the table are replaced by '?' and the
+    decision is stored, so every character is only looked up once.
+    """
+
+    def __missing__(self, codepoint: int) -> str:
+        self[codepoint] = '?'
+        return '?'
+
+
+def _build_cp437_table() -> _CodePageTable:
+    """Precompile the translation table for the printer code page"""
+    table = _CodePageTable()
+    for value in range(256):
+        table[ord(bytes([value]).decode('cp437'))] = chr(value)
+    for char, replacement in FALLBACKS.items():
+        table[ord(char)] = replacement.translate(table)
+    return table
+
+
+CP437_TABLE = _build_cp437_table()
+
+
+def encode_cp437(text: str) -> bytes:
+    """Encode text for the printer's PC437 character table"""
+    # Every translated character is below 256, so latin-1 maps them 1:1 to bytes
+    return text.translate(CP437_TABLE).encode('latin-1')
+
+
+def render_markup(text: str) -> bytes:
+    """Encode text, turning inline style markup into ESC/P codes"""
+    parts = _MARKUP_RE.split(text)
+    # Even positions are text, odd positions are tags
+    for i in range(1, len(parts), 2):
+        parts[i] = MARKUP_CODES[parts[i]]
+    for i in range(0, len(parts), 2):
+        parts[i] = encode_cp437(parts[i])
+    return b"".join(parts)
+
+
+def wrap_body(text: str, width: int) -> str:
+    """Wrap body lines to the page width; lines with style markup are left alone"""
+    return "\n".join(
+        line if _MARKUP_RE.search(line) else wrap_line(line, width)
+        for line in text.split("\n")
+    )
+
+
+@lru_cache(maxsize=16)
+def _rule(char: str, width: int) -> bytes:
+    """Encoded full-width rule line"""
+    return encode_cp437(char * width + "\n")
+
+
+@lru_cache(maxsize=4)
+def _footer(width: int) -> bytes:
+    """Encoded document footer, ending with a form feed"""
+    return b"\n" + _rule("=", width) + b"End of Document\n" + FORM_FEED
+
+
+class EscpRenderer:
+    """Renders print jobs straight to ESC/P bytes for the KX-P1592"""
+
+    def __init__(self, layout: PageLayout = STANDARD):
+        self.layout = layout  # Default layout; jobs can override it
+
+    def header(self, printed_at: Optional[datetime] = None, layout: Optional[PageLayout] = None) -> bytes:
+        """Encoded document header with the print timestamp"""
+        layout = layout or self.layout
+        printed_at = printed_at or datetime.now()
+        rule = _rule("=", layout.width)
+        stamp = f"Printed at: {printed_at.strftime('%Y-%m-%d %H:%M:%S')}\n".encode('ascii')
+        return rule + stamp + rule + b"\n"
+
+    def render_document(self, text: str, printed_at: Optional[datetime] = None,
+                        layout: Optional[PageLayout] = None) -> bytes:
+        """Render one document (header, body, footer) without the printer reset"""
+        layout = layout or self.layout
+        parts = [
+            self.header(printed_at, layout),
+            render_markup(wrap_body(text, layout.width)),
+            _footer(layout.width),
+        ]
+        if layout.condensed:
+            # Condensed mode is switched off again so batched documents are unaffected
+            parts.insert(0, ESC_CONDENSED_ON)
+            parts.append(ESC_CONDENSED_OFF)
+        return b"".join(parts)
+
+    def render_job(self, text: str, printed_at: Optional[datetime] = None,
+                   layout: Optional[PageLayout] = None) -> bytes:
+        """Render a complete job as one contiguous buffer"""
+        return b"".join((PRINTER_INIT, self.render_document(text, printed_at, layout)))
@@ -0,0 +1,168 @@
+import sys
+import time
+from typing import Callable, Dict, Any, Optional, Union
+
+from escp import encode_cp437
+from layout import PageLayout, CONDENSED_CPI, PICA_CPI
+
+ESC = 0x1B
+LF = 0x0A
+CR = 0x0D
+FF = 0x0C
+SI = 0x0F  # Condensed on
+DC2 = 0x12  # Condensed off
+
+# Number of parameter bytes following ESC <command> for the codes we skip
+ESC_PARAMETER_LENGTHS = {
+    ord('@'): 0,
+    ord('E'): 0,
+    ord('F'): 0,
+    ord('G'): 0,
+    ord('H'): 0,
+    ord('0'): 0,
+    ord('2'): 0,
+    ord('3'): 1,
+    ord('A'): 1,
+    ord('t'): 1,
+    ord('W'): 1,
+    ord('x'): 1,
+    ord('C'): 1,
+    ord('l'): 1,
+    ord('Q'): 1,
+}
+
+# Approximate timings for the KX-P1592 in draft mode
+DEFAULT_COST_MODEL = {
+    'chars_per_second': 240.0,  # 10 cpi draft
+    'condensed_factor': 0.6,  # condensed characters take less head travel
+    'double_width_factor': 2.0,
+    'bold_factor': 2.0,  # emphasized print is a second pass
+    'line_feed_seconds': 0.05,  # per 1/6" line feed, scaled by line spacing
+    'form_feed_seconds': 1.5,
+    'page_width': 80,  # in 10 cpi columns; condensed characters advance less
+}
+
+
+class EscpEmulator:
+    """Interprets an ESC/P byte stream and estimates how long it takes to print.
+
+    Only the codes the briefing system emits are interpreted; other escape
+    sequences are skipped using their known parameter lengths so the
+    character and line counts stay correct. A layout sets the page width
+    to its carriage.
+    """
+
+    def __init__(self, cost_model: Optional[Dict[str, float]] = None,
+                 layout: Optional[PageLayout] = None):
+        self.cost_model = dict(DEFAULT_COST_MODEL)
+        if layout is not None:
+            self.cost_model['page_width'] = layout.carriage
+        if cost_model:
+            self.cost_model.update(cost_model)
+
+    def run(self, stream: Union[bytes, str]) -> Dict[str, Any]:
+        """Consume a print stream and return counts and the estimated print time"""
+        if isinstance(stream, str):
+            stream = encode_cp437(stream)
+
+        model = self.cost_model
+        char_seconds = 1.0 / model['chars_per_second']
+        condensed_advance = PICA_CPI / CONDENSED_CPI
+        bold = condensed = double_width = False
+        line_spacing = 36  # 1/6" in 1/216" units, the power-on default
+
+        chars = lines = form_feeds = overflow_lines = 0
+        column = 0.0  # Head position in 10 cpi columns
+        seconds = 0.0
+
+        i = 0
+        length = len(stream)
+        while i < length:
+            byte = stream[i]
+            i += 1
+
+            if byte == ESC and i < length:
+                command = stream[i]
+                i += 1
+                if command == ord('@'):
+                    bold = condensed = double_width = False
+                    line_spacing = 36
+                elif command == ord('E'):
+                    bold = True
+                elif command == ord('F'):
+                    bold = False
+                elif command == ord('W') and i < length:
+                    double_width = stream[i] in (1, ord('1'))
+                elif command == ord('3') and i < length:
+                    line_spacing = stream[i]
+                elif command == ord('2'):
+                    line_spacing = 36
+                elif command == ord('0'):
+                    line_spacing = 27
+                i += ESC_PARAMETER_LENGTHS.get(command, 0)
+            elif byte == LF:
+                lines += 1
+                if column > model['page_width']:
+                    overflow_lines += 1
+                column = 0
+                seconds += model['line_feed_seconds'] * line_spacing / 36
+            elif byte == CR:
+                column = 0
+            elif byte == FF:
+                form_feeds += 1
+                column = 0
+                seconds += model['form_feed_seconds']
+            elif byte == SI:
+                condensed = True
+            elif byte == DC2:
+                condensed = False
+            elif byte >= 0x20:
+                chars += 1
+                width = 2 if double_width else 1
+                cost = char_seconds * width
+                if condensed:
+                    width *= condensed_advance
+                    cost *= model['condensed_factor']
+                column += width
+                if bold:
+                    cost *= model['bold_factor']
+                seconds += cost
+
+        if column > model['page_width']:
+            overflow_lines += 1
+
+        return {
+            'bytes': length,
+            'chars': chars,
+            'lines': lines,
+            'form_feeds': form_feeds,
+            'overflow_lines': overflow_lines,
+            'estimated_seconds': seconds,
+        }
+
+
+def benchmark_layout(render: Callable[[], Union[bytes, str]], repeat: int = 20,
+                     cost_model: Optional[Dict[str, float]] = None,
+                     layout: Optional[PageLayout] = None) -> Dict[str, Any]:
+    """Time a layout function and estimate how long its output takes to print"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        output = render()
+    render_ms = (time.perf_counter() - start) * 1000 / repeat
+
+    report = EscpEmulator(cost_model, layout).run(output)
+    report['render_ms'] = render_ms
+    return report
+
+
+if __name__ == "__main__":
+    # Emulate a captured print stream: python3 escp_emulator.py job.prn
+    if len(sys.argv) != 2:
+        print("Usage: escp_emulator.py <print stream file>")
+        sys.exit(1)
+
+    with open(sys.argv[1], 'rb') as stream_file:
+        result = EscpEmulator().run(stream_file.read())
+
+    for key, value in result.items():
+        print(f"{key}: {value:.2f}" if isinstance(value, float) else f"{key}: {value}")
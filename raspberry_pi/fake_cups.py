@@ -0,0 +1,109 @@
+"""In-memory stand-in for pycups, used by the tests.
+
+pycups needs libcups and a running CUPS server. Tests import this module
+before the code under test; it registers itself as `cups` only when
+pycups is not installed, and tests patch FakeConnection in either way.
+"""
+import sys
+import types
+from typing import Any, Dict, List, Optional
+
+HTTP_CONTINUE = 100
+IPP_OK = 0
+CUPS_FORMAT_RAW = "application/vnd.cups-raw"
+
+
+class IPPError(Exception):
+    pass
+
+
+class FakeConnection:
+    """Records jobs and counts IPC calls per method"""
+
+    printer_attributes: Dict[str, Any] = {
+        'printer-state': 3,
+        'printer-state-message': '',
+        'printer-is-accepting-jobs': True,
+        'printer-state-reasons': ['none'],
+    }
+
+    def __init__(self):
+        self.calls: Dict[str, int] = {}
+        self.jobs: List[Dict[str, Any]] = []  # {'title', 'data', 'finished', 'cancelled'}
+        self.events: List[Dict[str, Any]] = []
+        self.fail_writes = False
+
+    def _call(self, name: str):
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def getPrinters(self):
+        self._call('getPrinters')
+        return {'KX-P1592': dict(self.printer_attributes)}
+
+    def getPrinterAttributes(self, name, requested_attributes=None):
+        self._call('getPrinterAttributes')
+        return dict(self.printer_attributes)
+
+    def createSubscription(self, uri, events=None, lease_duration=0):
+        self._call('createSubscription')
+        return 1
+
+    def cancelSubscription(self, subscription_id):
+        self._call('cancelSubscription')
+
+    def getNotifications(self, subscription_ids, sequence_numbers=None):
+        self._call('getNotifications')
+        first = sequence_numbers[0] if sequence_numbers else 1
+        return {'notify-events': [event for event in self.events
+                                  if event['notify-sequence-number'] >= first]}
+
+    def createJob(self, printer, title, options):
+        self._call('createJob')
+        self.jobs.append({'title': title, 'data': b"", 'finished': False, 'cancelled': False})
+        return len(self.jobs)
+
+    def startDocument(self, printer, job_id, title, format, last):
+        self._call('startDocument')
+        return HTTP_CONTINUE
+
+    def writeRequestData(self, data, length):
+        self._call('writeRequestData')
+        if self.fail_writes:
+            return 500
+        self.jobs[-1]['data'] += bytes(data)
+        return HTTP_CONTINUE
+
+    def finishDocument(self, printer):
+        self._call('finishDocument')
+        self.jobs[-1]['finished'] = True
+        return IPP_OK
+
+    def cancelJob(self, job_id):
+        self._call('cancelJob')
+        self.jobs[job_id - 1]['cancelled'] = True
+
+    def printFile(self, printer, filename, title, options):
+        self._call('printFile')
+        with open(filename, 'rb') as f:
+            self.jobs.append({'title': title, 'data': f.read(), 'finished': True, 'cancelled': False})
+        return len(self.jobs)
+
+
+def module(connection: Optional[FakeConnection] = None) -> types.ModuleType:
+    """A `cups` module whose Connection() always returns the given connection"""
+    fake = types.ModuleType('cups')
+    fake.HTTP_CONTINUE = HTTP_CONTINUE
+    fake.IPP_OK = IPP_OK
+    fake.CUPS_FORMAT_RAW = CUPS_FORMAT_RAW
+    fake.IPPError = IPPError
+    if connection is None:
+        fake.Connection = FakeConnection
+    else:
+        fake.Connection = lambda: connection
+    return fake
+
+
+try:
+    import cups  # noqa: F401
+except ImportError:
+    sys.modules['cups'] = module()
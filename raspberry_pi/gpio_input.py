@@ -0,0 +1,244 @@
+import queue
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    import wiringpi as wp
+except ImportError:  # Off-device: only the simulated backend is available
+    wp = None
+
+HIGH = 1
+LOW = 0
+
+# Press events
+SHORT_PRESS = 'short'
+LONG_PRESS = 'long'
+
+# Debounce states
+IDLE = 'idle'
+DOWN = 'down'  # Pressed, long press not reached yet
+HELD = 'held'  # Long press already reported, waiting for release
+
+EdgeCallback = Callable[[int, float], None]  # (level, monotonic timestamp)
+
+
+class WiringPiBackend:
+    """Button input through wiringPi interrupts (both edges), LED output through digitalWrite"""
+
+    def setup(self):
+        wp.wiringPiSetupGpio()
+
+    def setup_output(self, pin: int):
+        wp.pinMode(pin, wp.OUTPUT)
+
+    def write(self, pin: int, level: int):
+        wp.digitalWrite(pin, level)
+
+    def setup_input(self, pin: int, pull_up: bool = True):
+        wp.pinMode(pin, wp.INPUT)
+        wp.pullUpDnControl(pin, wp.PUD_UP if pull_up else wp.PUD_DOWN)
+
+    def read(self, pin: int) -> int:
+        return wp.digitalRead(pin)
+
+    def on_edge(self, pin: int, callback: EdgeCallback):
+        # wiringPi calls the ISR from its own thread without arguments
+        wp.wiringPiISR(pin, wp.INT_EDGE_BOTH, lambda: callback(wp.digitalRead(pin), time.monotonic()))
+
+
+class SimulatedGPIO:
+    """In-process GPIO for tests and off-device benchmarks.
+
+    set_level() behaves like the pin changing: edge callbacks run in the
+    caller's thread, as they would in the interrupt thread on the Pi.
+    """
+
+    def __init__(self):
+        self.levels: Dict[int, int] = defaultdict(lambda: HIGH)
+        self.callbacks: Dict[int, List[EdgeCallback]] = defaultdict(list)
+
+    def setup(self):
+        pass
+
+    def setup_output(self, pin: int):
+        self.levels[pin] = LOW
+
+    def write(self, pin: int, level: int):
+        self.levels[pin] = level
+
+    def setup_input(self, pin: int, pull_up: bool = True):
+        self.levels[pin] = HIGH if pull_up else LOW
+
+    def read(self, pin: int) -> int:
+        return self.levels[pin]
+
+    def on_edge(self, pin: int, callback: EdgeCallback):
+        self.callbacks[pin].append(callback)
+
+    def set_level(self, pin: int, level: int, timestamp: Optional[float] = None):
+        """Change a pin, firing edge callbacks if the level changed"""
+        if self.levels[pin] == level:
+            return
+        self.levels[pin] = level
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        for callback in self.callbacks[pin]:
+            callback(level, timestamp)
+
+    def press(self, pin: int, duration: float, bounces: int = 0, bounce_interval: float = 0.001):
+        """Hold an active-low button for duration seconds, with contact bounce"""
+        for _ in range(bounces):
+            self.set_level(pin, LOW)
+            time.sleep(bounce_interval)
+            self.set_level(pin, HIGH)
+            time.sleep(bounce_interval)
+        self.set_level(pin, LOW)
+        time.sleep(duration)
+        for _ in range(bounces):
+            self.set_level(pin, HIGH)
+            time.sleep(bounce_interval)
+            self.set_level(pin, LOW)
+            time.sleep(bounce_interval)
+        self.set_level(pin, HIGH)
+
+
+class DebounceStateMachine:
+    """Non-blocking debounce and press classification from timestamped edges.
+
+    The first edge of a press is accepted at once, and edges within the
+    debounce window after an accepted edge are treated as contact bounce.
+    Because a tap shorter than the window loses its release edge that way,
+    the pin is read again by settle() once the window has passed whenever
+    edges were dropped. A release before long_press seconds is a short
+    press; holding past it is reported as a long press by poll() without
+    waiting for the release.
+    With long_press=None every press is reported as short on the press edge
+    itself, which is the lowest latency when long presses are not needed.
+    """
+
+    def __init__(self, debounce: float = 0.05, long_press: Optional[float] = 1.5,
+                 active_level: int = LOW):
+        self.debounce = debounce
+        self.long_press = long_press
+        self.active_level = active_level
+        self.state = IDLE
+        self.pressed_at: Optional[float] = None
+        self._last_edge: Optional[float] = None
+        self._unsettled = False  # Edges were dropped; the pin needs reading again
+
+    def edge(self, level: int, timestamp: float) -> Optional[str]:
+        """Feed an edge; returns SHORT_PRESS when a short press is recognised"""
+        if self._last_edge is not None and timestamp - self._last_edge < self.debounce:
+            self._unsettled = True
+            return None  # Contact bounce, or a tap shorter than the window
+        self._unsettled = False
+        pressed = level == self.active_level
+        if pressed and self.state == IDLE:
+            self.pressed_at = timestamp
+            self._last_edge = timestamp
+            if self.long_press is None:
+                self.state = HELD
+                return SHORT_PRESS
+            self.state = DOWN
+        elif not pressed and self.state != IDLE:
+            was_down = self.state == DOWN
+            self.state = IDLE
+            self._last_edge = timestamp
+            if was_down:
+                return SHORT_PRESS
+        return None
+
+    def deadline(self) -> Optional[float]:
+        """Timestamp at which poll() has to run to report a long press"""
+        if self.state == DOWN:
+            return self.pressed_at + self.long_press
+        return None
+
+    def settle_deadline(self) -> Optional[float]:
+        """Timestamp at which settle() has to read the pin, if edges were dropped"""
+        if self._unsettled:
+            return self._last_edge + self.debounce
+        return None
+
+    def settle(self, now: float, level: int) -> Optional[str]:
+        """Apply the pin level once the debounce window after dropped edges has passed
+
+        A level that disagrees with the state is handled like an edge at
+        `now`, so a release lost as bounce still completes a short press.
+        """
+        deadline = self.settle_deadline()
+        if deadline is None or now < deadline:
+            return None
+        self._unsettled = False
+        if (level == self.active_level) == (self.state != IDLE):
+            return None  # The dropped edges cancelled out
+        return self.edge(level, now)
+
+    def poll(self, now: float, level: Optional[int] = None) -> Optional[str]:
+        """Check timers; returns LONG_PRESS once the button has been held long enough
+
+        level is the current pin level, if known. A button that is no longer
+        held had its release edge missed: that is a short press, not a long one.
+        """
+        if self.state != DOWN or now < self.pressed_at + self.long_press:
+            return None
+        if level is not None and level != self.active_level:
+            self.state = IDLE
+            self._unsettled = False
+            return SHORT_PRESS
+        self.state = HELD
+        return LONG_PRESS
+
+
+class ButtonInput:
+    """Edge-triggered button: backend interrupts feed a debounce state machine.
+
+    The interrupt callback only queues (level, timestamp); classification
+    happens in the thread calling wait_for_press(), which sleeps until the
+    next edge or long-press deadline instead of polling the pin.
+    """
+
+    def __init__(self, backend, pin: int, debounce: float = 0.05, long_press: Optional[float] = 1.5):
+        self.backend = backend
+        self.pin = pin
+        self.machine = DebounceStateMachine(debounce, long_press)
+        self._edges: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        backend.setup_input(pin, pull_up=True)
+        backend.on_edge(pin, self._on_edge)
+
+    def _on_edge(self, level: int, timestamp: float):
+        self._edges.put((level, timestamp))
+
+    def wait_for_press(self, timeout: Optional[float] = None) -> Optional[Tuple[str, float]]:
+        """Block until a press is recognised: (SHORT_PRESS or LONG_PRESS, latency in seconds)
+
+        Latency is measured from the edge (or long-press deadline) that
+        completed the press. Returns None if the timeout expires first.
+        """
+        give_up = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            while True:
+                now = time.monotonic()
+                deadlines = (self.machine.deadline(), self.machine.settle_deadline(), give_up)
+                waits = [t - now for t in deadlines if t is not None]
+                try:
+                    level, timestamp = self._edges.get(timeout=max(0.0, min(waits)) if waits else None)
+                except queue.Empty:
+                    now = time.monotonic()
+                    settle_at = self.machine.settle_deadline()
+                    if settle_at is not None and now >= settle_at:
+                        kind = self.machine.settle(now, self.backend.read(self.pin))
+                        if kind is not None:
+                            return kind, now - settle_at
+                    deadline = self.machine.deadline()
+                    if deadline is not None and now >= deadline:
+                        kind = self.machine.poll(now, self.backend.read(self.pin))
+                        if kind is not None:
+                            return kind, now - deadline
+                    if give_up is not None and now >= give_up:
+                        return None
+                    continue
+                if self.machine.edge(level, timestamp) == SHORT_PRESS:
+                    return SHORT_PRESS, time.monotonic() - timestamp
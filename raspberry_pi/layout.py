@@ -0,0 +1,65 @@
+import re
+import textwrap
+from collections import namedtuple
+from functools import lru_cache
+
+PICA_CPI = 10.0
+CONDENSED_CPI = 17.1
+
+# Bullets that get a hanging indent when their line wraps
+_BULLET_RE = re.compile(r"^(\s*)(- |\* |-- |\d+\. )?")
+
+
+class PageLayout(namedtuple('PageLayout', ['carriage', 'condensed'])):
+    """Printable area for one job.
+
+    carriage is the number of 10 cpi columns the paper takes (80 for
+    letter, 136 for the KX-P1592's wide carriage); condensed switches the
+    job to 17.1 cpi, which fits more characters on the same paper.
+    """
+    __slots__ = ()
+
+    @property
+    def width(self) -> int:
+        """Characters per line"""
+        if self.condensed:
+            return int(self.carriage * CONDENSED_CPI / PICA_CPI)
+        return self.carriage
+
+
+STANDARD = PageLayout(carriage=80, condensed=False)
+WIDE = PageLayout(carriage=136, condensed=False)
+CONDENSED = PageLayout(carriage=80, condensed=True)
+WIDE_CONDENSED = PageLayout(carriage=136, condensed=True)
+
+
+@lru_cache(maxsize=2048)
+def wrap_line(line: str, width: int) -> str:
+    """Word-wrap one line to width, indenting continuation lines under the text.
+
+    A leading bullet ("- ", "* ", "1. ") or indentation is kept on the first
+    line and continuation lines hang under the first word. Results are
+    memoized by (line, width) since briefings repeat most of their text.
+    """
+    if len(line) <= width:
+        return line
+    match = _BULLET_RE.match(line)
+    hanging = " " * len(match.group(0))
+    wrapped = textwrap.wrap(
+        line[len(match.group(0)):],
+        width=width,
+        initial_indent=match.group(0),
+        subsequent_indent=hanging,
+        break_on_hyphens=False,
+    )
+    return "\n".join(wrapped) if wrapped else line
+
+
+def wrap_text(text: str, width: int) -> str:
+    """Wrap every line of a block of text to width"""
+    return "\n".join(wrap_line(line, width) for line in text.split("\n"))
+
+
+def wrap_item(item: str, width: int, bullet: str = "- ") -> str:
+    """Format a list item with a bullet and a hanging indent"""
+    return wrap_line(f"{bullet}{item}", width)
@@ -0,0 +1,115 @@
+import logging
+import threading
+import time
+from collections import namedtuple
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger('led_patterns')
+
+ON = 1
+OFF = 0
+
+# steps: (level, seconds) pairs; a repeating pattern loops until replaced and
+# a held one keeps its final level until replaced
+Pattern = namedtuple('Pattern', ['steps', 'repeat', 'hold'], defaults=(False,))
+
+IDLE = 'idle'
+BUSY = 'busy'
+SUCCESS = 'success'
+ERROR = 'error'
+STALE = 'stale'
+
+PATTERNS: Dict[str, Pattern] = {
+    IDLE: Pattern(((OFF, 0.0),), repeat=False),
+    BUSY: Pattern(((ON, 0.0),), repeat=False, hold=True),  # Solid on while a job is handled
+    SUCCESS: Pattern(((ON, 0.5), (OFF, 0.5)) * 2, repeat=False),
+    ERROR: Pattern(((ON, 0.1), (OFF, 0.1)) * 5, repeat=False),
+    # Printed from stale data or waiting for fresh data: slow double blink
+    STALE: Pattern(((ON, 0.1), (OFF, 0.15), (ON, 0.1), (OFF, 1.0)) * 3, repeat=False),
+}
+
+
+class LedScheduler:
+    """Plays named LED patterns from a dedicated thread.
+
+    play() returns immediately and pre-empts whatever pattern is running,
+    so status feedback never holds up job handling. When a one-shot
+    pattern ends, the LED returns to the background pattern, unless the
+    pattern is held.
+    """
+
+    def __init__(self, write: Callable[[int], None], patterns: Optional[Dict[str, Pattern]] = None):
+        self.write = write  # Sets the LED level, e.g. wiringpi.digitalWrite for the LED pin
+        self.patterns = dict(PATTERNS if patterns is None else patterns)
+        self.background = IDLE
+        self.current: Optional[str] = None
+        self._cond = threading.Condition()
+        self._requested: Optional[str] = None
+        self._generation = 0
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def play(self, name: str):
+        """Start a pattern now, replacing the current one"""
+        if name not in self.patterns:
+            raise KeyError(f"Unknown LED pattern '{name}'")
+        with self._cond:
+            self._requested = name
+            self._generation += 1
+            self._cond.notify()
+
+    def set_background(self, name: str):
+        """Pattern shown when nothing else is playing"""
+        if name not in self.patterns:
+            raise KeyError(f"Unknown LED pattern '{name}'")
+        with self._cond:
+            self.background = name
+            if self._requested is None:
+                self._generation += 1
+                self._cond.notify()
+
+    def stop(self):
+        """Stop the scheduler and switch the LED off"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        self._thread.join(timeout=2)
+        self.write(OFF)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._stopping:
+                    return
+                name = self._requested or self.background
+                self._requested = None
+                generation = self._generation
+            self.current = name
+            if self._play_steps(self.patterns[name], generation):
+                continue  # Pre-empted by a newer request
+            with self._cond:
+                if name != self.background and not self.patterns[name].hold:
+                    continue  # One-shot finished: back to the background pattern
+                # Hold the final level until something new is requested
+                self._cond.wait_for(lambda: self._stopping or self._generation != generation)
+
+    def _play_steps(self, pattern: Pattern, generation: int) -> bool:
+        """Play a pattern; True as soon as a newer request pre-empts it"""
+        while True:
+            for level, duration in pattern.steps:
+                try:
+                    self.write(level)
+                except Exception as e:
+                    logger.error(f"Failed to set LED: {e}")
+                deadline = time.monotonic() + duration
+                with self._cond:
+                    while True:
+                        if self._stopping or self._generation != generation:
+                            return True
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+            if not pattern.repeat:
+                return False
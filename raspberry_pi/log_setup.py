@@ -0,0 +1,253 @@
+import atexit
+import logging
+import os
+import queue
+import signal
+import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+DEFAULT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+class BufferedFileHandler(logging.Handler):
+    """Collects formatted log lines in RAM and appends them to a file in batches.
+
+    The buffer is written out every flush_interval seconds, as soon as it
+    holds capacity lines, and immediately for records at flush_level or
+    above, so an error is on the card before anything else can go wrong.
+    The file rotates by size like RotatingFileHandler (name.1 ... name.N).
+    """
+
+    def __init__(self, filename: Union[str, Path], max_bytes: int = 1024 * 1024, backup_count: int = 5,
+                 flush_interval: float = 30.0, capacity: int = 5000, flush_level: int = logging.ERROR):
+        super().__init__()
+        self.filename = Path(filename)
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.flush_interval = flush_interval
+        self.capacity = capacity
+        self.flush_level = flush_level
+        self.buffer: List[str] = []
+        self.stats = {'records': 0, 'flushes': 0, 'bytes_written': 0, 'write_errors': 0}
+        self._closing = threading.Event()
+        self._timer = threading.Thread(target=self._flush_periodically, daemon=True)
+        self._timer.start()
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            line = self.format(record) + "\n"
+        except Exception:
+            self.handleError(record)
+            return
+        with self.lock:
+            self.buffer.append(line)
+            self.stats['records'] += 1
+            full = len(self.buffer) >= self.capacity
+        if full or record.levelno >= self.flush_level:
+            self.flush()
+
+    def flush(self):
+        """Write all buffered lines to the file in one append"""
+        with self.lock:
+            if not self.buffer:
+                return
+            data = "".join(self.buffer).encode('utf-8')
+            try:
+                self.filename.parent.mkdir(parents=True, exist_ok=True)
+                if self.max_bytes and self._size() + len(data) > self.max_bytes:
+                    self._rotate()
+                with open(self.filename, 'ab') as f:
+                    f.write(data)
+            except OSError as e:
+                # Keep the lines; the next flush tries again
+                self.stats['write_errors'] += 1
+                sys.stderr.write(f"Failed to write log file {self.filename}: {e}\n")
+                if len(self.buffer) > self.capacity * 2:
+                    del self.buffer[:len(self.buffer) - self.capacity]
+                return
+            self.buffer.clear()
+            self.stats['flushes'] += 1
+            self.stats['bytes_written'] += len(data)
+
+    def close(self):
+        self._closing.set()
+        self.flush()
+        super().close()
+
+    def _flush_periodically(self):
+        while not self._closing.wait(self.flush_interval):
+            self.flush()
+
+    def _size(self) -> int:
+        try:
+            return self.filename.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def _rotate(self):
+        if self.backup_count <= 0:
+            self.filename.unlink(missing_ok=True)
+            return
+        for i in range(self.backup_count - 1, 0, -1):
+            source = self.filename.with_name(f"{self.filename.name}.{i}")
+            if source.exists():
+                os.replace(source, self.filename.with_name(f"{self.filename.name}.{i + 1}"))
+        if self.filename.exists():
+            os.replace(self.filename, self.filename.with_name(f"{self.filename.name}.1"))
+
+
+class LogSetup:
+    """One configured logger: a queue handler feeding a background listener"""
+
+    def __init__(self, logger: logging.Logger, queue_handler: QueueHandler,
+                 listener: QueueListener, file_handler: BufferedFileHandler):
+        self.logger = logger
+        self.queue_handler = queue_handler
+        self.listener = listener
+        self.file_handler = file_handler
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return self.file_handler.stats
+
+    def flush(self):
+        """Write everything logged so far to the file"""
+        # Restarting the listener drains the queue into the file handler
+        self.listener.stop()
+        self.file_handler.flush()
+        self.listener.start()
+
+    def close(self):
+        """Detach from the logger and write out everything still buffered"""
+        self.logger.removeHandler(self.queue_handler)
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+
+
+# Logger name ('' for the root logger) -> active setup
+_setups: Dict[str, LogSetup] = {}
+_setups_lock = threading.Lock()
+_hooks_installed = False
+
+
+def setup_logging(log_file: Union[str, Path], level: int = logging.INFO, name: Optional[str] = None,
+                  fmt: str = DEFAULT_FORMAT, console: Optional[bool] = None,
+                  max_bytes: int = 1024 * 1024, backup_count: int = 5,
+                  flush_interval: float = 30.0, capacity: int = 5000) -> LogSetup:
+    """Log asynchronously to a RAM buffer that is flushed to log_file in batches.
+
+    Log calls only put the record on a queue; formatting and file writes
+    happen in a listener thread. name selects the logger (the root logger
+    by default). Calling again for the same logger replaces the previous
+    setup, like logging.basicConfig(force=True). console defaults to
+    duplicating output to stderr only when it is a terminal, so daemons
+    whose output is piped or journaled don't log everything twice.
+    """
+    global _hooks_installed
+    logger = logging.getLogger(name)
+    key = name or ''
+    formatter = logging.Formatter(fmt)
+
+    file_handler = BufferedFileHandler(log_file, max_bytes, backup_count, flush_interval, capacity)
+    file_handler.setFormatter(formatter)
+    handlers: List[logging.Handler] = [file_handler]
+    if console is None:
+        console = sys.stderr.isatty()
+    if console:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+        handlers.append(console_handler)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    setup = LogSetup(logger, queue_handler, listener, file_handler)
+
+    with _setups_lock:
+        previous = _setups.pop(key, None)
+        if previous is not None:
+            previous.close()
+        elif name is None:
+            # Drop handlers from an earlier basicConfig()
+            for handler in logger.handlers[:]:
+                logger.removeHandler(handler)
+                handler.close()
+        logger.setLevel(level)
+        logger.addHandler(queue_handler)
+        listener.start()
+        _setups[key] = setup
+        if not _hooks_installed:
+            _install_hooks()
+            _hooks_installed = True
+    return setup
+
+
+def flush_logs():
+    """Write out every buffered log line, e.g. before a risky operation"""
+    with _setups_lock:
+        setups = list(_setups.values())
+    for setup in setups:
+        setup.flush()
+
+
+def shutdown_logging():
+    """Stop all listeners and write out what is buffered; runs at exit"""
+    with _setups_lock:
+        setups = list(_setups.values())
+        _setups.clear()
+    for setup in setups:
+        try:
+            setup.close()
+        except Exception as e:
+            sys.stderr.write(f"Failed to flush logs: {e}\n")
+
+
+def _crash_logger() -> logging.Logger:
+    # Uncaught exceptions go to the most recently configured logger
+    with _setups_lock:
+        setups = list(_setups.values())
+    return setups[-1].logger if setups else logging.getLogger()
+
+
+def _install_hooks():
+    """Emergency flush: at exit and on uncaught exceptions"""
+    atexit.register(shutdown_logging)
+
+    previous_excepthook = sys.excepthook
+
+    def excepthook(exc_type, exc, tb):
+        if not issubclass(exc_type, KeyboardInterrupt):
+            _crash_logger().critical("Uncaught exception", exc_info=(exc_type, exc, tb))
+        shutdown_logging()
+        previous_excepthook(exc_type, exc, tb)
+
+    sys.excepthook = excepthook
+
+    previous_thread_hook = threading.excepthook
+
+    def thread_excepthook(args):
+        if issubclass(args.exc_type, SystemExit):
+            return  # Ignored by the default hook as well
+        # CRITICAL is above the flush level, so this is written at once
+        _crash_logger().critical(f"Uncaught exception in thread {args.thread.name if args.thread else '?'}",
+                                 exc_info=(args.exc_type, args.exc_value, args.exc_traceback))
+        previous_thread_hook(args)
+
+    threading.excepthook = thread_excepthook
+
+
+def exit_on_sigterm():
+    """Turn SIGTERM into SystemExit so finally blocks and the atexit flush run
+
+    systemd stops services with SIGTERM, which skips atexit by default.
+    Daemons call this from their main loop; it must run in the main thread.
+    """
+    signal.signal(signal.SIGTERM, _exit_on_signal)
+
+
+def _exit_on_signal(signum, frame):
+    raise SystemExit(128 + signum)
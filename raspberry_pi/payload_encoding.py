@@ -0,0 +1,82 @@
+import json
+import zlib
+from typing import Any, List, Tuple
+
+try:
+    import msgpack
+except ImportError:  # Optional: MessagePack payloads are rejected without it
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:  # Optional: CBOR payloads are rejected without it
+    cbor2 = None
+
+# Encodings are marked by a topic suffix, e.g. "market/data/zlib".
+# Plain JSON has no suffix, so existing publishers keep working.
+JSON = 'json'
+ZLIB = 'zlib'  # zlib-compressed JSON
+MSGPACK = 'msgpack'
+CBOR = 'cbor'
+
+ENCODINGS = (JSON, ZLIB, MSGPACK, CBOR)
+
+
+class EncodingError(ValueError):
+    """Raised when a payload cannot be decoded with its encoding"""
+    pass
+
+
+def available_encodings() -> List[str]:
+    """Encodings this Pi can decode, preferred first"""
+    encodings = [ZLIB]
+    if msgpack is not None:
+        encodings.insert(0, MSGPACK)
+    if cbor2 is not None:
+        encodings.append(CBOR)
+    return encodings + [JSON]
+
+
+def split_topic(topic: str) -> Tuple[str, str]:
+    """Split an encoding suffix off a topic: "market/data/zlib" -> ("market/data", "zlib")"""
+    base, _, suffix = topic.rpartition('/')
+    if base and suffix in ENCODINGS and suffix != JSON:
+        return base, suffix
+    return topic, JSON
+
+
+def encoded_topics(topic: str) -> List[str]:
+    """Topic filters covering a topic in every encoding"""
+    if topic.endswith('#'):
+        return [topic]  # A multi-level wildcard already matches the suffixes
+    return [topic, f"{topic}/+"]
+
+
+def loads(raw: bytes, encoding: str = JSON) -> Any:
+    """Decode a payload published with the given encoding"""
+    try:
+        if encoding == JSON:
+            return json.loads(raw)
+        if encoding == ZLIB:
+            return json.loads(zlib.decompress(raw))
+        if encoding == MSGPACK and msgpack is not None:
+            return msgpack.unpackb(raw, raw=False)
+        if encoding == CBOR and cbor2 is not None:
+            return cbor2.loads(raw)
+    except Exception as e:
+        raise EncodingError(f"invalid {encoding} payload: {e}")
+    raise EncodingError(f"unsupported payload encoding '{encoding}'")
+
+
+def dumps(data: Any, encoding: str = JSON) -> bytes:
+    """Encode a payload; the counterpart of loads() used by tests and benchmarks"""
+    if encoding == MSGPACK and msgpack is not None:
+        return msgpack.packb(data, use_bin_type=True)
+    if encoding == CBOR and cbor2 is not None:
+        return cbor2.dumps(data)
+    body = json.dumps(data, separators=(',', ':')).encode()
+    if encoding == JSON:
+        return body
+    if encoding == ZLIB:
+        return zlib.compress(body, 9)
+    raise EncodingError(f"unsupported payload encoding '{encoding}'")
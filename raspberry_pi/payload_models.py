@@ -0,0 +1,207 @@
+from collections import namedtuple
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, Mapping, Optional, Tuple, Union
+
+from payload_encoding import EncodingError, JSON, loads
+
+# converter turns the raw JSON value into the field's type. Only mark a
+# field required when every publisher of the category guarantees it:
+# payloads without it are rejected and never reach the report.
+Field = namedtuple('Field', ['name', 'converter', 'required'])
+
+
+# Shared by every model without extra keys or changed values, so those cost no dict
+_NONE: Mapping[str, Any] = MappingProxyType({})
+
+
+class PayloadError(ValueError):
+    """Raised when an MQTT payload cannot be decoded or does not fit its model"""
+    pass
+
+
+def number(value: Any) -> float:
+    """Numeric field; accepts numbers and numeric strings such as "1,800" """
+    if isinstance(value, bool):
+        raise ValueError("expected a number, got a boolean")
+    if isinstance(value, str):
+        value = value.replace(',', '').strip()
+    return float(value)
+
+
+def text(value: Any) -> str:
+    """Text field; scalars are converted, containers are rejected"""
+    if isinstance(value, (dict, list)):
+        raise ValueError(f"expected text, got {type(value).__name__}")
+    return str(value)
+
+
+class PayloadModel:
+    """Typed MQTT payload with one slot per known field.
+
+    Subclasses list their FIELDS; decoding walks the incoming dict once,
+    converting known keys and keeping any others in `extra`, so a payload
+    is validated when it arrives rather than when it is formatted.
+    Attributes hold the converted values (quote.price is a float). Models
+    read like the dicts they replace: get() and items() return values as
+    published, so "28,500" still prints as "28,500", with the set fields
+    in declaration order followed by the extra keys.
+    """
+    __slots__ = ('extra', 'raw')
+    FIELDS: Tuple[Field, ...] = ()
+    _SPEC: Dict[str, Field] = {}
+    _REQUIRED: frozenset = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._SPEC = {field.name: field for field in cls.FIELDS}
+        cls._REQUIRED = frozenset(field.name for field in cls.FIELDS if field.required)
+
+    def __init__(self, **values):
+        for field in self.FIELDS:
+            setattr(self, field.name, values.pop(field.name, None))
+        self.extra: Mapping[str, Any] = values or _NONE
+        self.raw: Mapping[str, Any] = _NONE  # Published values of fields the converter changed
+
+    @classmethod
+    def from_dict(cls, data: Any) -> 'PayloadModel':
+        """Validate and convert a decoded JSON object in a single pass"""
+        if not isinstance(data, dict):
+            raise PayloadError(f"{cls.__name__}: expected a JSON object, got {type(data).__name__}")
+        model = cls.__new__(cls)
+        extra = None
+        raw = None
+        missing = set(cls._REQUIRED)
+        for field in cls.FIELDS:
+            setattr(model, field.name, None)
+        for key, value in data.items():
+            field = cls._SPEC.get(key)
+            if field is None:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+                continue
+            if value is None:
+                continue
+            try:
+                converted = field.converter(value)
+            except (TypeError, ValueError) as e:
+                raise PayloadError(f"{cls.__name__}.{key}: {e}")
+            setattr(model, key, converted)
+            if converted is not value:
+                if raw is None:
+                    raw = {}
+                raw[key] = value
+            missing.discard(key)
+        if missing:
+            raise PayloadError(f"{cls.__name__}: missing {', '.join(sorted(missing))}")
+        model.extra = _NONE if extra is None else extra
+        model.raw = _NONE if raw is None else raw
+        return model
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Field or extra value by name as published, like dict.get"""
+        if key in self._SPEC:
+            value = getattr(self, key)
+            if value is None:
+                return default
+            return self.raw.get(key, value)
+        return self.extra.get(key, default)
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        """(name, published value) for every set field, then the extra keys"""
+        raw = self.raw
+        for field in self.FIELDS:
+            value = getattr(self, field.name)
+            if value is not None:
+                yield field.name, raw.get(field.name, value)
+        yield from self.extra.items()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict as published, for JSON serialisation"""
+        return dict(self.items())
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.items())
+
+    def __eq__(self, other: Any) -> bool:
+        return type(other) is type(self) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f"{key}={value!r}" for key, value in self.items())
+        return f"{type(self).__name__}({fields})"
+
+
+class WeatherReport(PayloadModel):
+    FIELDS = (
+        Field('location', text, False),
+        Field('temperature', number, False),
+        Field('unit', text, False),
+        Field('conditions', text, False),
+        Field('humidity', number, False),
+        Field('wind_speed', number, False),
+        Field('timestamp', text, False),
+    )
+    __slots__ = tuple(field.name for field in FIELDS)
+
+
+class MarketQuote(PayloadModel):
+    FIELDS = (
+        Field('id', text, False),
+        Field('price', number, False),
+        Field('change', number, False),
+        Field('timestamp', text, False),
+    )
+    __slots__ = tuple(field.name for field in FIELDS)
+
+
+class SecurityAlert(PayloadModel):
+    FIELDS = (
+        Field('alert', text, False),
+        Field('severity', text, False),
+        Field('region', text, False),
+        Field('temperature', number, False),
+        Field('unit', text, False),
+        Field('timestamp', text, False),
+    )
+    __slots__ = tuple(field.name for field in FIELDS)
+
+
+# Category (or topic segment) -> model; other payloads stay plain dicts
+MODELS: Dict[str, type] = {
+    'weather': WeatherReport,
+    'market': MarketQuote,
+    'security': SecurityAlert,
+}
+
+Payload = Union[PayloadModel, Dict[str, Any]]
+
+
+def model_for(name: str) -> Optional[type]:
+    """Model for a category ("market") or topic ("market/data"), if there is one"""
+    model = MODELS.get(name)
+    if model is None:
+        for segment in name.split('/'):
+            model = MODELS.get(segment)
+            if model is not None:
+                break
+    return model
+
+
+def from_dict(name: str, data: Any) -> Payload:
+    """Build the model for a category or topic, or return the data unchanged"""
+    model = model_for(name)
+    return model.from_dict(data) if model is not None else data
+
+
+def decode_payload(name: str, raw: Union[bytes, str], encoding: str = JSON) -> Payload:
+    """Decode a raw MQTT payload and validate it against its model"""
+    try:
+        data = loads(raw, encoding)
+    except EncodingError as e:
+        raise PayloadError(str(e))
+    return from_dict(name, data)
+
+
+def to_plain(payload: Payload) -> Any:
+    """JSON-serialisable form of a payload"""
+    return payload.to_dict() if isinstance(payload, PayloadModel) else payload
@@ -1,37 +1,114 @@
-import subprocess
 import json
 import time
+import hashlib
+import threading
 import logging
-from typing import Dict, Any
+import os
+from typing import Dict, Any, Optional, Tuple
 import paho.mqtt.client as mqtt
 from datetime import datetime
-from pathlib import Path
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('/var/log/print_daemon.log'),
-        logging.StreamHandler()
-    ]
-)
+from printer_status import get_status_cache
+from printer_interface import DotMatrixPrinter, PrintStream
+from escp import PRINTER_INIT, ESC_CONDENSED_ON, encode_cp437
+from layout import STANDARD, wrap_line
+from work_queue import BoundedWorkQueue, COALESCE
+from snapshot_cache import SnapshotCache
+from payload_models import Payload, PayloadError, decode_payload, from_dict, to_plain
+from payload_encoding import available_encodings, split_topic
+from control_socket import ControlServer, PRINT_NOW, REPRINT_LAST, STATUS
+from log_setup import exit_on_sigterm, setup_logging
+
 logger = logging.getLogger('print_daemon')
 
+# Report sections in print order: (MQTT category, section title)
+REPORT_SECTIONS = [
+    ("weather", "Weather Information"),
+    ("market", "Market Updates"),
+    ("security", "Security Alerts"),
+]
+
+def process_age() -> Optional[float]:
+    """Seconds since this process was started, including interpreter launch (Linux only)"""
+    try:
+        with open('/proc/self/stat') as stat, open('/proc/uptime') as uptime:
+            # Field 22 is the start time in clock ticks after boot; the command
+            # name in field 2 may contain spaces, so count from its closing paren
+            started = int(stat.read().rpartition(')')[2].split()[19]) / os.sysconf('SC_CLK_TCK')
+            return float(uptime.read().split()[0]) - started
+    except (OSError, ValueError, IndexError):
+        return None
+
 class PrintDaemon:
     def __init__(self):
+        # Startup timings, reported once the daemon is connected and ready
+        init_started = time.monotonic()
+        age = process_age()
+        self.startup: Dict[str, Optional[float]] = {
+            'launch_ms': age * 1000 if age is not None else None,  # Interpreter start and imports
+            'init_ms': None,
+            'connect_ms': None,
+            'ready_ms': None
+        }
+        self._init_started = init_started
+        self._connect_started: Optional[float] = None
+        
         # MQTT Configuration
         self.mqtt_broker = "your-aws-iot-endpoint.iot.region.amazonaws.com"
         self.mqtt_port = 8883  # Standard AWS IoT Core MQTT port
         self.mqtt_topic = "intelligence-briefing/#"
+        self.refresh_topic = "intelligence-briefing/refresh"  # Asks the Lambdas to republish
         
         # Printer Configuration
         self.printer_name = "KX-P1592"  # Your dot matrix printer name in CUPS
-        self.page_width = 80  # Standard dot matrix page width
-        self.temp_file = Path("/tmp/current_briefing.txt")
+        self.layout = STANDARD  # 80 columns; WIDE or CONDENSED fit more per line
+        self.printer: Optional[DotMatrixPrinter] = None  # Opened on first use
         
         # Data Storage
-        self.current_data: Dict[str, Any] = {}
+        self.current_data: Dict[str, Payload] = {}  # Typed models for known categories
+        self.cache = SnapshotCache()  # Last known payload per category, kept across restarts
+        # Categories refreshed after a press that already printed them: category -> requested at
+        self.pending_refresh: Dict[str, float] = {}
+        self.refresh_timeout = 120  # seconds a refresh reply is expected for
+        
+        # Rendered sections keyed by title: (payload digest, rendered text)
+        self.section_cache: Dict[str, Tuple[str, str]] = {}
+        self.render_stats = {'section_hits': 0, 'section_misses': 0}
+        
+        # Diff-only mode prints just the sections (and, with diff_rows, the
+        # values) that changed since the last printout
+        self.diff_only = False
+        self.diff_rows = False
+        # title -> (section digest, printed at, {key: value digest})
+        self.printed_sections: Dict[str, Tuple[str, float, Dict[str, str]]] = {}
+        self._pending_sections: Dict[str, Tuple[str, Dict[str, str]]] = {}
+        
+        # Progressive mode starts printing with the first category and appends
+        # the rest to the same open job until all arrive or the deadline passes
+        self.progressive = False
+        self.progressive_deadline = 120  # seconds
+        self.required_categories = {category for category, _ in REPORT_SECTIONS}
+        self.open_job: Optional[PrintStream] = None
+        self.printed_categories = set()
+        self.cycle_started: Optional[float] = None
+        self.first_ink_ms: Optional[float] = None
+        self._job_lock = threading.Lock()
+        self._deadline_timer: Optional[threading.Timer] = None
+        
+        # Messages are handed from the MQTT network thread to a handler thread
+        # so slow formatting or printing never stalls keepalives. There is one:
+        # updates are applied in order under _handler_lock and the printer takes
+        # one job at a time, so more threads would only wait on each other.
+        self.work_queue = BoundedWorkQueue(maxsize=50, policy=COALESCE)
+        self.handler_stats = {
+            'handled': 0,
+            'last_wait_ms': None,
+            'max_wait_ms': 0.0,
+            'last_handle_ms': None,
+            'max_handle_ms': 0.0
+        }
+        self._handler_lock = threading.Lock()
+        self._stats_lock = threading.Lock()  # handler_stats is read by the control thread
+        self._worker: Optional[threading.Thread] = None
         
         # Initialize MQTT Client
         self.client = mqtt.Client()
@@ -45,19 +122,34 @@ class PrintDaemon:
             certfile="/path/to/certificate.pem.crt",
             keyfile="/path/to/private.pem.key"
         )
+        self.mqtt_connected = False
+        
+        # The daemon stays resident; the button listener talks to it over this socket
+        self.control = ControlServer({
+            PRINT_NOW: self.command_print_now,
+            REPRINT_LAST: self.command_reprint_last,
+            STATUS: self.command_status,
+        })
+        self.last_report: Optional[str] = None
+        self.refreshing = []  # Categories printed stale on the last press
+        self.last_printed_at: Optional[float] = None
+        self._job_text = []  # Text written to the open progressive job
+        
+        self.startup['init_ms'] = (time.monotonic() - init_started) * 1000
+
+    @property
+    def page_width(self) -> int:
+        """Characters per line for the current layout"""
+        return self.layout.width
+
+    def job_prefix(self) -> bytes:
+        """Printer reset, plus condensed mode when the layout asks for it"""
+        return PRINTER_INIT + ESC_CONDENSED_ON if self.layout.condensed else PRINTER_INIT
 
     def check_printer_status(self) -> bool:
         """Check if printer is ready and online"""
-        try:
-            result = subprocess.run(
-                ['lpstat', '-p', self.printer_name],
-                capture_output=True,
-                text=True
-            )
-            return "enabled" in result.stdout and "idle" in result.stdout
-        except subprocess.SubProcessError as e:
-            logger.error(f"Error checking printer status: {e}")
-            return False
+        # Reads the shared, event-fed status cache instead of forking lpstat
+        return get_status_cache(self.printer_name).is_ready()
 
     def format_header(self) -> str:
         """Create ASCII header for the report"""
@@ -68,123 +160,410 @@ class PrintDaemon:
         header += "=" * self.page_width + "\n\n"
         return header
 
-    def format_section(self, title: str, data: Dict[str, Any]) -> str:
+    def format_section(self, title: str, data: Payload) -> str:
         """Format a section of the report"""
-        section = f"\n{title.upper()}\n"
-        section += "-" * len(title) + "\n"
+        lines = [f"\n{title.upper()}", "-" * len(title)]
+        width = self.page_width
         
         for key, value in data.items():
             # Format key-value pairs, handling multi-line values
             if isinstance(value, (dict, list)):
-                section += f"{key}:\n"
+                lines.append(f"{key}:")
                 formatted_value = json.dumps(value, indent=2)
-                # Indent multi-line values
-                section += "\n".join(f"  {line}" for line in formatted_value.split("\n"))
-                section += "\n"
+                # Indent multi-line values; long lines wrap under their own indent
+                lines.extend(wrap_line(f"  {line}", width) for line in formatted_value.split("\n"))
             else:
-                section += f"{key}: {value}\n"
+                lines.append(wrap_line(f"{key}: {value}", width))
+        
+        return "\n".join(lines) + "\n\n"
+
+    @staticmethod
+    def payload_digest(data: Payload) -> str:
+        """Stable hash of a category payload, used as the section cache key"""
+        encoded = json.dumps(to_plain(data), sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha1(encoded.encode()).hexdigest()
+
+    def render_section(self, title: str, data: Payload) -> str:
+        """Format a section, reusing the last rendering if its payload is unchanged"""
+        # The page width is part of the key since it changes the rendering
+        digest = f"{self.payload_digest(data)}:{self.page_width}"
+        cached = self.section_cache.get(title)
+        if cached and cached[0] == digest:
+            self.render_stats['section_hits'] += 1
+            return cached[1]
+        
+        self.render_stats['section_misses'] += 1
+        rendered = self.format_section(title, data)
+        self.section_cache[title] = (digest, rendered)
+        return rendered
+
+    def report_section(self, title: str, data: Payload) -> str:
+        """Section text for the next report, honouring the diff-only mode"""
+        if not self.diff_only:
+            return self.render_section(title, data)
         
-        return section + "\n"
+        digest = self.payload_digest(data)
+        key_digests = {key: self.payload_digest({key: value}) for key, value in data.items()}
+        self._pending_sections[title] = (digest, key_digests)
+        previous = self.printed_sections.get(title)
+        if previous is None:
+            return self.render_section(title, data)
+        if previous[0] == digest:
+            since = time.strftime('%H:%M', time.localtime(previous[1]))
+            return f"\n{title.upper()}: unchanged since {since}\n"
+        if not self.diff_rows:
+            return self.render_section(title, data)
+        
+        printed_keys = previous[2]
+        changed = {key: value for key, value in data.items()
+                   if printed_keys.get(key) != key_digests[key]}
+        section = self.format_section(title, changed)
+        unchanged = len(data) - len(changed)
+        if unchanged:
+            section = section.rstrip("\n") + f"\n({unchanged} unchanged)\n\n"
+        return section
+
+    def mark_printed(self):
+        """Remember the sections of the report just printed for diff-only mode"""
+        now = time.time()
+        for title, (digest, key_digests) in self._pending_sections.items():
+            previous = self.printed_sections.get(title)
+            if previous is not None and previous[0] == digest:
+                continue  # Keep the time this content was first printed
+            self.printed_sections[title] = (digest, now, key_digests)
+        self._pending_sections = {}
 
     def format_report(self) -> str:
         """Format the complete report with all sections"""
-        report = self.format_header()
+        parts = [self.format_header()]
+        self._pending_sections = {}
         
         # Add sections based on available data
-        sections = {
-            "Weather Information": self.current_data.get("weather", {}),
-            "Market Updates": self.current_data.get("market", {}),
-            "Security Alerts": self.current_data.get("security", {}),
-        }
-        
-        for title, data in sections.items():
+        for category, title in REPORT_SECTIONS:
+            data = self.current_data.get(category, {})
             if data:  # Only add section if data exists
-                report += self.format_section(title, data)
+                parts.append(self.report_section(title, data))
         
-        report += "\n" + "=" * self.page_width + "\n"
-        report += "End of Report\n"
-        return report
+        parts.append("\n" + "=" * self.page_width + "\nEnd of Report\n")
+        return "".join(parts)
+
+    def get_printer(self) -> DotMatrixPrinter:
+        """Return the long-lived CUPS printer connection, opening it on first use"""
+        if self.printer is None:
+            self.printer = DotMatrixPrinter(self.printer_name)
+        return self.printer
 
     def send_to_printer(self, report: str) -> bool:
         """Send the formatted report to the dot matrix printer"""
         try:
-            # Save report to temporary file
-            self.temp_file.write_text(report)
-            
-            # Configure print options for dot matrix printer
-            print_options = [
-                'lp',
-                '-d', self.printer_name,
-                '-o', 'raw',  # Send raw text to printer
-                '-o', 'cpi=10',  # Characters per inch
-                '-o', 'lpi=6',  # Lines per inch
-                str(self.temp_file)
-            ]
-            
-            # Send to printer
-            result = subprocess.run(print_options, capture_output=True, text=True)
+            # Raw job with the same cpi/lpi options as DotMatrixPrinter, sent
+            # over its persistent CUPS connection instead of forking lp
+            data = self.job_prefix() + encode_cp437(report)
+            job_id = self.get_printer().print_now(data, "Intelligence Briefing")
+            logger.info(f"Report successfully sent to printer (job {job_id})")
+            self.last_report = report
+            self.last_printed_at = time.time()
+            return True
             
-            if result.returncode == 0:
-                logger.info("Report successfully sent to printer")
-                return True
-            else:
-                logger.error(f"Printer error: {result.stderr}")
-                return False
-                
         except Exception as e:
             logger.error(f"Error sending to printer: {e}")
             return False
-        finally:
-            # Cleanup temporary file
-            if self.temp_file.exists():
-                self.temp_file.unlink()
 
     def on_connect(self, client, userdata, flags, rc):
         """Callback when connected to MQTT broker"""
         if rc == 0:
             logger.info("Connected to MQTT broker")
             client.subscribe(self.mqtt_topic)
+            self.mqtt_connected = True
+            if self.startup['connect_ms'] is None and self._connect_started is not None:
+                self._record_startup()
         else:
             logger.error(f"Failed to connect to MQTT broker with code: {rc}")
 
     def on_message(self, client, userdata, msg):
         """Handle incoming MQTT messages"""
+        # Runs in paho's network thread: only enqueue, decoding happens in a worker
+        if msg.topic == self.refresh_topic:
+            return  # Our own refresh requests come back through the wildcard subscription
+        self.work_queue.put(msg.topic, bytes(msg.payload))
+
+    def process_message(self, topic: str, raw_payload: bytes):
+        """Decode a queued MQTT message and apply it"""
         try:
-            topic = msg.topic
-            payload = json.loads(msg.payload.decode())
-            
+            # Compressed payloads carry their encoding as a topic suffix
+            topic, encoding = split_topic(topic)
             # Extract category from topic (e.g., "intelligence-briefing/weather" -> "weather")
             category = topic.split('/')[-1]
+            # Validated into a typed model here, so formatting never sees bad data
+            payload = decode_payload(category, raw_payload, encoding)
+            with self._handler_lock:
+                self.handle_update(category, payload)
+                    
+        except PayloadError as e:
+            logger.error(f"Rejected {topic} payload: {e}")
+        except Exception as e:
+            logger.error(f"Error processing message: {e}")
+
+    def _handler_loop(self):
+        """Handler thread: take messages off the work queue and handle them"""
+        while True:
+            entry = self.work_queue.get()
+            if entry is None:
+                continue
+            topic, raw_payload, enqueued_at = entry
+            started = time.monotonic()
             
-            # Update current data for this category
-            self.current_data[category] = payload
-            logger.info(f"Received {category} data")
+            self.process_message(topic, raw_payload)
             
-            # Check if we have all required data categories
-            required_categories = {"weather", "market", "security"}
-            if required_categories.issubset(self.current_data.keys()):
-                if self.check_printer_status():
-                    report = self.format_report()
-                    if self.send_to_printer(report):
-                        # Clear current data after successful print
-                        self.current_data.clear()
-                else:
+            finished = time.monotonic()
+            wait_ms = (started - enqueued_at) * 1000
+            handle_ms = (finished - started) * 1000
+            with self._stats_lock:
+                stats = self.handler_stats
+                stats['handled'] += 1
+                stats['last_wait_ms'] = wait_ms
+                stats['max_wait_ms'] = max(stats['max_wait_ms'], wait_ms)
+                stats['last_handle_ms'] = handle_ms
+                stats['max_handle_ms'] = max(stats['max_handle_ms'], handle_ms)
+
+    def start_worker(self):
+        """Start the message handler thread"""
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._handler_loop, daemon=True)
+            self._worker.start()
+
+    def get_queue_stats(self) -> Dict[str, Any]:
+        """Current work queue depth plus queueing and handling statistics"""
+        with self._stats_lock:
+            handler_stats = dict(self.handler_stats)
+        return {
+            'depth': len(self.work_queue),
+            **self.work_queue.stats,
+            **handler_stats
+        }
+
+    def handle_update(self, category: str, payload: Payload):
+        """Store a category payload and print once the report can go out"""
+        # Update current data for this category
+        self.current_data[category] = payload
+        self.cache.put(category, to_plain(payload))
+        logger.info(f"Received {category} data")
+        
+        if self._is_refresh_reply(category):
+            # The press that asked for it has printed already
+            logger.info(f"Refreshed {category} data in the cache")
+            return
+        if self.cycle_started is None:
+            self.cycle_started = time.monotonic()
+        
+        if self.progressive:
+            self.print_progressive(category)
+            return
+        
+        # Check if we have all required data categories
+        if self.required_categories.issubset(self.current_data.keys()):
+            if self.check_printer_status():
+                report = self.format_report()
+                if self.send_to_printer(report):
+                    self.mark_printed()
+                    self._record_first_ink()
+                    # Clear current data after successful print
+                    self.current_data.clear()
+                    self.cycle_started = None
+            else:
+                logger.error("Printer not ready")
+
+    def print_from_cache(self) -> bool:
+        """Button press: print straight from the local cache when it is fresh enough
+
+        Fresh categories print as they are. Stale ones still print, but a
+        refresh is requested in the background. If a category is missing or
+        too old, the report waits for the refresh and prints when it arrives.
+        Returns True if the report was printed immediately.
+        """
+        with self._handler_lock:
+            printable, refresh, missing = self.cache.plan(self.required_categories)
+            self.refreshing = sorted(refresh - missing)
+            for category in refresh:
+                self.pending_refresh.pop(category, None)
+            if refresh:
+                self.request_refresh(refresh)
+            
+            self.current_data.update(
+                (category, from_dict(category, payload)) for category, payload in printable.items()
+            )
+            if missing:
+                logger.info(f"Waiting for fresh data: {', '.join(sorted(missing))}")
+                return False
+            
+            if not self.check_printer_status():
+                logger.error("Printer not ready")
+                return False
+            if self.send_to_printer(self.format_report()):
+                self.mark_printed()
+                logger.info("Printed report from cache")
+                self.current_data.clear()
+                # Replies to the refresh only update the cache; this press is done
+                now = time.monotonic()
+                self.pending_refresh.update((category, now) for category in refresh)
+                return True
+            return False
+
+    def _is_refresh_reply(self, category: str) -> bool:
+        """Whether a payload answers a refresh for data a press already printed"""
+        requested_at = self.pending_refresh.pop(category, None)
+        return requested_at is not None and time.monotonic() - requested_at < self.refresh_timeout
+
+    def request_refresh(self, categories):
+        """Ask the publishers for new data; paho sends it from its network thread"""
+        # Publishers pick the first encoding they support from 'accept'
+        payload = json.dumps({'categories': sorted(categories), 'accept': available_encodings()})
+        self.client.publish(self.refresh_topic, payload, qos=1)
+        logger.info(f"Requested refresh of {', '.join(sorted(categories))}")
+
+    def _record_first_ink(self):
+        """Log how long it took from the first message to the first printed line"""
+        if self.cycle_started is not None:
+            self.first_ink_ms = (time.monotonic() - self.cycle_started) * 1000
+            logger.info(f"Time to first ink: {self.first_ink_ms:.0f} ms")
+
+    def print_progressive(self, category: str):
+        """Append a category to the open job, opening it on the first one"""
+        titles = dict(REPORT_SECTIONS)
+        with self._job_lock:
+            if category not in titles or category in self.printed_categories:
+                return
+            
+            if self.open_job is None:
+                if not self.check_printer_status():
                     logger.error("Printer not ready")
-                    
-        except json.JSONDecodeError as e:
-            logger.error(f"Error decoding message: {e}")
+                    return
+                try:
+                    self.open_job = self.get_printer().open_stream("Intelligence Briefing")
+                    header = self.format_header()
+                    self.open_job.write(self.job_prefix() + encode_cp437(header))
+                    self._job_text = [header]
+                except Exception as e:
+                    logger.error(f"Error starting progressive print: {e}")
+                    self.open_job = None
+                    return
+                self._record_first_ink()
+                self._deadline_timer = threading.Timer(self.progressive_deadline, self.close_progressive_job,
+                                                       args=(self.open_job,))
+                self._deadline_timer.daemon = True
+                self._deadline_timer.start()
+            
+            # Also catches up on categories that arrived while the printer was not ready
+            for pending, title in REPORT_SECTIONS:
+                if pending not in self.current_data or pending in self.printed_categories:
+                    continue
+                try:
+                    section = self.report_section(title, self.current_data[pending])
+                    self.open_job.write(encode_cp437(section))
+                    self._job_text.append(section)
+                    self.printed_categories.add(pending)
+                except Exception as e:
+                    logger.error(f"Error appending {pending} to print job: {e}")
+                    self._reset_progressive_job()
+                    return
+            
+            if self.required_categories.issubset(self.printed_categories):
+                self._finish_progressive_job()
+
+    def close_progressive_job(self, job: Optional[PrintStream] = None):
+        """Deadline handler: close the open job with whatever has arrived
+
+        job is the stream the deadline was set for; a deadline that fires
+        after its job finished must not close the next one. The handler lock
+        keeps the reset from racing an update that is being handled.
+        """
+        with self._handler_lock, self._job_lock:
+            if self.open_job is None or (job is not None and job is not self.open_job):
+                return
+            missing = self.required_categories - self.printed_categories
+            logger.warning(f"Progressive print deadline reached, missing: {', '.join(sorted(missing))}")
+            self._finish_progressive_job(missing)
+
+    def _finish_progressive_job(self, missing=()):
+        """Write the footer and close the open job; caller holds the job lock"""
+        footer = ""
+        if missing:
+            footer += f"\n(No data received for: {', '.join(sorted(missing))})\n"
+        footer += "\n" + "=" * self.page_width + "\nEnd of Report\n"
+        try:
+            self.open_job.write(encode_cp437(footer))
+            self.open_job.close()
+            self.mark_printed()
+            self._job_text.append(footer)
+            self.last_report = "".join(self._job_text)
+            self.last_printed_at = time.time()
+            logger.info("Report successfully sent to printer")
         except Exception as e:
-            logger.error(f"Error processing message: {e}")
+            logger.error(f"Error closing progressive print job: {e}")
+        self._reset_progressive_job()
+
+    def _reset_progressive_job(self):
+        """Forget the open job and start a new collection cycle"""
+        if self._deadline_timer:
+            self._deadline_timer.cancel()
+            self._deadline_timer = None
+        if self.open_job and not self.open_job.closed:
+            self.open_job.abort()
+        self.open_job = None
+        self.printed_categories.clear()
+        self._pending_sections = {}
+        self.current_data.clear()
+        self.cycle_started = None
 
     def on_disconnect(self, client, userdata, rc):
         """Handle MQTT disconnection"""
         logger.warning("Disconnected from MQTT broker")
+        self.mqtt_connected = False
         if rc != 0:
             logger.error(f"Unexpected disconnection. Reconnecting...")
             self.connect()
 
+    def _record_startup(self):
+        """Log how long the daemon took from launch to being ready for presses"""
+        now = time.monotonic()
+        self.startup['connect_ms'] = (now - self._connect_started) * 1000
+        self.startup['ready_ms'] = (self.startup['launch_ms'] or 0) + (now - self._init_started) * 1000
+        logger.info("Print daemon ready in {:.0f} ms (launch {}, init {:.0f} ms, MQTT connect {:.0f} ms)".format(
+            self.startup['ready_ms'],
+            "n/a" if self.startup['launch_ms'] is None else f"{self.startup['launch_ms']:.0f} ms",
+            self.startup['init_ms'],
+            self.startup['connect_ms']
+        ))
+
+    def command_print_now(self) -> Dict[str, Any]:
+        """Control command: print from the cache, or as soon as fresh data arrives"""
+        printed = self.print_from_cache()
+        return {'printed': printed, 'waiting_for_data': not printed, 'refreshing': self.refreshing}
+
+    def command_reprint_last(self) -> Dict[str, Any]:
+        """Control command: send the last printed report again"""
+        if self.last_report is None:
+            raise ValueError("nothing has been printed yet")
+        if not self.check_printer_status():
+            raise RuntimeError("printer not ready")
+        if not self.send_to_printer(self.last_report):
+            raise RuntimeError("printing failed")
+        return {'printed': True}
+
+    def command_status(self) -> Dict[str, Any]:
+        """Control command: daemon, printer and queue status"""
+        return {
+            'printer_ready': self.check_printer_status(),
+            'mqtt_connected': self.mqtt_connected,
+            'last_printed_at': self.last_printed_at,
+            'startup': self.startup,
+            'queue': self.get_queue_stats()
+        }
+
     def connect(self):
         """Connect to MQTT broker"""
+        if self._connect_started is None:
+            self._connect_started = time.monotonic()
         try:
             self.client.connect(self.mqtt_broker, self.mqtt_port, 60)
         except Exception as e:
@@ -195,6 +574,9 @@ class PrintDaemon:
     def run(self):
         """Main loop for the print daemon"""
         logger.info("Starting print daemon...")
+        exit_on_sigterm()
+        self.start_worker()
+        self.control.start()
         self.connect()
         try:
             self.client.loop_forever()
@@ -203,8 +585,10 @@ class PrintDaemon:
         except Exception as e:
             logger.error(f"Unexpected error: {e}")
         finally:
+            self.control.stop()
             self.client.disconnect()
 
 if __name__ == "__main__":
+    setup_logging('/var/log/print_daemon.log', logging.INFO)
     daemon = PrintDaemon()
     daemon.run()
\ No newline at end of file
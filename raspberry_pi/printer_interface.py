@@ -3,25 +3,70 @@ import logging
 import time
 import queue
 import threading
+from collections import deque
 from pathlib import Path
-from typing import Optional, Dict, Any
-from datetime import datetime
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('/var/log/printer_interface.log'),
-        logging.StreamHandler()
-    ]
-)
+from typing import Optional, Dict, Any, List, Tuple
+from printer_status import get_status_cache, PRINTER_STOPPED
+from retry_scheduler import RetryScheduler
+from escp import EscpRenderer, PRINTER_INIT
+from layout import PageLayout, STANDARD
+from log_setup import setup_logging
+
 logger = logging.getLogger('printer_interface')
 
 class PrinterError(Exception):
     """Custom exception for printer-related errors"""
     pass
 
+class PrintStream:
+    """A raw CUPS job that stays open so content can be appended as it arrives.
+
+    Uses its own CUPS connection, because the HTTP request stays in progress
+    until the stream is closed.
+    """
+    
+    def __init__(self, printer_name: str, title: str, options: Dict[str, str]):
+        self.printer_name = printer_name
+        self.title = title
+        self.bytes_written = 0
+        self.closed = False
+        
+        self.conn = cups.Connection()
+        self.job_id = self.conn.createJob(printer_name, title, options)
+        status = self.conn.startDocument(printer_name, self.job_id, title, cups.CUPS_FORMAT_RAW, 1)
+        if status != cups.HTTP_CONTINUE:
+            self.abort()
+            raise PrinterError(f"startDocument failed with HTTP status {status}")
+
+    def write(self, data: bytes):
+        """Append data to the open job"""
+        if self.closed:
+            raise PrinterError(f"Print stream {self.title} is closed")
+        status = self.conn.writeRequestData(data, len(data))
+        if status != cups.HTTP_CONTINUE:
+            self.abort()
+            raise PrinterError(f"writeRequestData failed with HTTP status {status}")
+        self.bytes_written += len(data)
+
+    def close(self) -> int:
+        """Finish the document so CUPS completes the job"""
+        if self.closed:
+            return self.job_id
+        self.closed = True
+        status = self.conn.finishDocument(self.printer_name)
+        if status != cups.IPP_OK:
+            raise PrinterError(f"finishDocument failed with IPP status {status}")
+        logger.info(f"Print stream {self.title} (ID: {self.job_id}) closed after {self.bytes_written} bytes")
+        return self.job_id
+
+    def abort(self):
+        """Cancel the job, discarding anything already written"""
+        self.closed = True
+        try:
+            self.conn.cancelJob(self.job_id)
+        except Exception as e:
+            logger.warning(f"Failed to cancel print stream {self.title}: {e}")
+
 class DotMatrixPrinter:
     """Handles communication with dot matrix printer via CUPS"""
     
@@ -29,14 +74,47 @@ class DotMatrixPrinter:
         self.printer_name = printer_name
         self.print_queue = queue.Queue()
         self.retry_count = 3
-        self.retry_delay = 5  # seconds
-        self.temp_dir = Path("/tmp/print_jobs")
+        self.retry_delay = 5  # seconds, doubled after every failed attempt
+        self.max_retry_delay = 60  # seconds
+        self.temp_dir = Path("/tmp/print_jobs")  # Only used by the spool fallback
         self.temp_dir.mkdir(exist_ok=True)
         
-        # Connect to CUPS
+        # Renders jobs to ESC/P bytes in the printer's CP437 code page
+        self.renderer = EscpRenderer(STANDARD)
+        
+        # Stream jobs straight into CUPS instead of spooling them to the SD card
+        self.stream_jobs = True
+        self.print_options = {
+            "raw": "true",  # Send raw text
+            "job-priority": "50",
+            "cpi": "10",  # Characters per inch
+            "lpi": "6"    # Lines per inch
+        }
+        
+        # Jobs already queued behind the one being printed are merged into a
+        # single CUPS job; a lone job is sent at once
+        self.max_batch_jobs = 10  # 1 disables batching
+        
+        self.stats = {
+            'jobs_streamed': 0,
+            'jobs_spooled': 0,
+            'last_submit_ms': None,
+            'jobs_printed': 0,
+            'jobs_failed': 0,
+            'batches_sent': 0
+        }
+        self.job_log = deque(maxlen=100)  # Per-job accounting for recent jobs
+        
+        # Failed jobs wait here instead of blocking the worker thread
+        self.retry_scheduler = RetryScheduler(self.retry_delay, self.max_retry_delay)
+        self.dead_letters = deque(maxlen=50)  # Jobs that ran out of attempts
+        
+        # Connect to CUPS; the connection is reopened if a submission fails
+        self._conn_lock = threading.RLock()
         try:
             self.conn = cups.Connection()
             self._verify_printer()
+            self.status_cache = get_status_cache(self.printer_name)
         except Exception as e:
             logger.error(f"Failed to initialize CUPS connection: {e}")
             raise PrinterError("CUPS initialization failed")
@@ -52,67 +130,57 @@ class DotMatrixPrinter:
             raise PrinterError(f"Printer {self.printer_name} not found")
         
         printer_info = printers[self.printer_name]
-        if printer_info['printer-state'] == 5:  # 5 = stopped
+        if printer_info['printer-state'] == PRINTER_STOPPED:
             raise PrinterError(f"Printer {self.printer_name} is stopped")
 
     def get_printer_status(self) -> Dict[str, Any]:
         """Get current printer status and attributes"""
         try:
-            printers = self.conn.getPrinters()
-            if self.printer_name not in printers:
-                raise PrinterError(f"Printer {self.printer_name} not found")
-            
-            printer = printers[self.printer_name]
-            status = {
-                'state': printer['printer-state'],
-                'state_message': printer['printer-state-message'],
-                'is_accepting': printer['printer-is-accepting-jobs'],
-                'state_reasons': printer.get('printer-state-reasons', [])
-            }
-            return status
+            # Served from the event-fed cache; CUPS is only queried when it is stale
+            return self.status_cache.get()
         except Exception as e:
             logger.error(f"Failed to get printer status: {e}")
             raise PrinterError("Could not retrieve printer status")
 
     def format_text_for_printer(self, text: str) -> str:
         """Format text for dot matrix printer"""
-        # Add printer control codes and formatting
-        formatted = "\x1B@"  # Initialize printer
-        formatted += "\x1B3\x18"  # Set line spacing to 24/216"
-        
-        # Add headers and footers
-        header = "=" * 80 + "\n"
-        header += f"Printed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
-        header += "=" * 80 + "\n\n"
-        
-        footer = "\n" + "=" * 80 + "\n"
-        footer += "End of Document\n"
-        footer += "\f"  # Form feed
-        
-        return formatted + header + text + footer
+        # The printer stream is rendered as bytes; decode it for callers wanting text
+        return self.encode_print_job(text).decode('cp437')
+
+    def encode_print_job(self, content: str, layout: Optional[PageLayout] = None) -> bytes:
+        """Format content for the dot matrix printer and encode it for CUPS"""
+        return self.renderer.render_job(content, layout=layout)
+
+    def encode_document(self, content: str, layout: Optional[PageLayout] = None) -> bytes:
+        """Encode a single document without the printer reset prefix"""
+        return self.renderer.render_document(content, layout=layout)
 
     def prepare_print_job(self, content: str, job_name: Optional[str] = None) -> Path:
         """Prepare content for printing and save to temporary file"""
         if not job_name:
             job_name = f"print_job_{int(time.time())}"
         
-        # Format content for dot matrix printer
-        formatted_content = self.format_text_for_printer(content)
-        
         # Save to temporary file
         temp_file = self.temp_dir / f"{job_name}.txt"
-        temp_file.write_text(formatted_content)
+        temp_file.write_bytes(self.encode_print_job(content))
         
         return temp_file
 
-    def submit_print_job(self, content: str, job_name: Optional[str] = None) -> int:
-        """Submit a new print job to the queue"""
+    def submit_print_job(self, content: str, job_name: Optional[str] = None,
+                         layout: Optional[PageLayout] = None) -> int:
+        """Submit a new print job to the queue
+
+        layout picks the page width for this job (e.g. WIDE or CONDENSED);
+        the renderer's default layout is used when it is omitted.
+        """
         try:
-            # Prepare print job
-            temp_file = self.prepare_print_job(content, job_name)
+            if not job_name:
+                job_name = f"print_job_{int(time.time())}"
             
-            # Add to print queue
-            self.print_queue.put((temp_file, job_name))
+            # Jobs are kept in memory until they are handed to CUPS. The printer
+            # reset is added per CUPS job so batched documents share a single one.
+            data = self.encode_document(content, layout)
+            self.print_queue.put((data, job_name, time.time()))
             
             logger.info(f"Print job {job_name} queued successfully")
             return self.print_queue.qsize()
@@ -121,63 +189,231 @@ class DotMatrixPrinter:
             logger.error(f"Failed to submit print job: {e}")
             raise PrinterError("Failed to submit print job")
 
+    def _connection(self) -> cups.Connection:
+        """Return the CUPS connection, reconnecting if the last one failed"""
+        if self.conn is None:
+            self.conn = cups.Connection()
+            logger.info("Reconnected to CUPS")
+        return self.conn
+
+    def _stream_job(self, data: bytes, title: str) -> int:
+        """Send an in-memory job to CUPS without touching the filesystem"""
+        conn = self._connection()
+        job_id = conn.createJob(self.printer_name, title, self.print_options)
+        try:
+            status = conn.startDocument(
+                self.printer_name, job_id, title, cups.CUPS_FORMAT_RAW, 1
+            )
+            if status != cups.HTTP_CONTINUE:
+                raise PrinterError(f"startDocument failed with HTTP status {status}")
+            
+            status = conn.writeRequestData(data, len(data))
+            if status != cups.HTTP_CONTINUE:
+                raise PrinterError(f"writeRequestData failed with HTTP status {status}")
+            
+            status = conn.finishDocument(self.printer_name)
+            if status != cups.IPP_OK:
+                raise PrinterError(f"finishDocument failed with IPP status {status}")
+        except Exception:
+            # Do not leave a half-written job holding the printer
+            try:
+                conn.cancelJob(job_id)
+            except Exception:
+                pass
+            raise
+        
+        return job_id
+
+    def _spool_job(self, data: bytes, title: str) -> int:
+        """Fallback: write the job to a temporary file and hand it to CUPS"""
+        temp_file = self.temp_dir / f"{title}.txt"
+        try:
+            temp_file.write_bytes(data)
+            return self._connection().printFile(
+                self.printer_name,
+                str(temp_file),
+                title,
+                self.print_options
+            )
+        finally:
+            if temp_file.exists():
+                temp_file.unlink()
+
+    def _send_job(self, data: bytes, title: str) -> int:
+        """Submit job data to CUPS, streaming when possible, and time the submission"""
+        start = time.perf_counter()
+        job_id = None
+        
+        with self._conn_lock:
+            if self.stream_jobs:
+                try:
+                    job_id = self._stream_job(data, title)
+                    self.stats['jobs_streamed'] += 1
+                except Exception as e:
+                    logger.warning(f"Streaming submission failed, falling back to spool file: {e}")
+            
+            if job_id is None:
+                try:
+                    job_id = self._spool_job(data, title)
+                    self.stats['jobs_spooled'] += 1
+                except Exception:
+                    # Drop the connection so the next attempt starts with a fresh one
+                    self.conn = None
+                    raise
+        
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.stats['last_submit_ms'] = elapsed_ms
+        logger.info(f"Job {title} ({len(data)} bytes) submitted in {elapsed_ms:.1f} ms")
+        return job_id
+
+    def open_stream(self, job_name: str = "Intelligence Brief") -> PrintStream:
+        """Open a job that content can be appended to as it becomes available"""
+        try:
+            return PrintStream(self.printer_name, job_name, self.print_options)
+        except Exception as e:
+            logger.error(f"Failed to open print stream {job_name}: {e}")
+            raise PrinterError(f"Failed to open print stream {job_name}")
+
+    def print_now(self, data: bytes, job_name: str = "Intelligence Brief") -> int:
+        """Send an already rendered job to CUPS immediately, bypassing the queue"""
+        try:
+            return self._send_job(data, job_name)
+        except Exception as e:
+            logger.error(f"Failed to print job {job_name}: {e}")
+            raise PrinterError(f"Failed to print job {job_name}")
+
+    def _collect_batch(self, first: Tuple[bytes, str, float]) -> List[Tuple[bytes, str, float]]:
+        """Gather the jobs already waiting behind the first one, without waiting for more"""
+        batch = [first]
+        while len(batch) < self.max_batch_jobs:
+            try:
+                batch.append(self.print_queue.get_nowait())
+            except queue.Empty:
+                break
+        
+        return batch
+
+    def _record_batch(self, job: Dict[str, Any], job_id: Optional[int]):
+        """Keep per-job accounting for every document in a CUPS job"""
+        finished_at = time.time()
+        for _, job_name, queued_at in job['documents']:
+            self.job_log.append({
+                'job_name': job_name,
+                'cups_job_id': job_id,
+                'batch_size': len(job['documents']),
+                'queued_at': queued_at,
+                'finished_at': finished_at,
+                'attempts': list(job['attempts']),
+                'status': 'printed' if job_id is not None else 'failed'
+            })
+        
+        key = 'jobs_printed' if job_id is not None else 'jobs_failed'
+        self.stats[key] += len(job['documents'])
+
+    def _create_job(self, batch: List[Tuple[bytes, str, float]]) -> Dict[str, Any]:
+        """Build a CUPS job record from a batch of queued documents"""
+        names = [job_name for _, job_name, _ in batch]
+        if len(batch) == 1:
+            title = names[0] or "Intelligence Brief"
+        else:
+            title = f"{names[0]}+{len(batch) - 1}"
+        
+        return {
+            'title': title,
+            'names': names,
+            'documents': batch,
+            # Documents already end with a form feed, so they can be concatenated
+            'data': b"".join([PRINTER_INIT] + [doc for doc, _, _ in batch]),
+            'attempts': []
+        }
+
+    def _finish_job(self, job: Dict[str, Any], job_id: Optional[int]):
+        """Record the outcome of a job and release its queue entries"""
+        self._record_batch(job, job_id)
+        for _ in job['documents']:
+            self.print_queue.task_done()
+
+    def _attempt_job(self, job: Dict[str, Any]):
+        """Try to print a job once, parking it for a later retry on failure"""
+        attempt = len(job['attempts']) + 1
+        try:
+            # Verify printer status
+            status = self.get_printer_status()
+            if status['state'] == PRINTER_STOPPED:
+                raise PrinterError("Printer is stopped")
+            
+            # Submit job to CUPS
+            job_id = self._send_job(job['data'], job['title'])
+        except Exception as e:
+            job['attempts'].append({'attempt': attempt, 'time': time.time(), 'error': str(e)})
+            
+            if attempt >= self.retry_count:
+                logger.error(f"Failed to print job {job['title']} after {attempt} attempts")
+                self.dead_letters.append(job)
+                self._finish_job(job, None)
+            else:
+                delay = self.retry_scheduler.schedule(job, attempt)
+                logger.warning(f"Print attempt {attempt} for {job['title']} failed: {e}; "
+                               f"retrying in {delay:.1f}s")
+            return
+        
+        job['attempts'].append({'attempt': attempt, 'time': time.time(), 'error': None})
+        self.stats['batches_sent'] += 1
+        logger.info(f"Print job {job['title']} (ID: {job_id}) submitted to printer "
+                    f"with {len(job['documents'])} document(s): {', '.join(job['names'])}")
+        self._finish_job(job, job_id)
+
     def _process_print_queue(self):
         """Process print queue in background thread"""
         while True:
             try:
-                # Get next job from queue
-                temp_file, job_name = self.print_queue.get()
+                # Retry parked jobs whose backoff has expired
+                for job in self.retry_scheduler.pop_due():
+                    self._attempt_job(job)
                 
-                # Process job with retries
-                success = False
-                for attempt in range(self.retry_count):
-                    try:
-                        # Verify printer status
-                        status = self.get_printer_status()
-                        if status['state'] == 5:  # printer stopped
-                            raise PrinterError("Printer is stopped")
-                        
-                        # Submit job to CUPS
-                        job_id = self.conn.printFile(
-                            self.printer_name,
-                            str(temp_file),
-                            job_name or "Intelligence Brief",
-                            {
-                                "raw": "true",  # Send raw text
-                                "job-priority": "50",
-                                "cpi": "10",  # Characters per inch
-                                "lpi": "6"    # Lines per inch
-                            }
-                        )
-                        
-                        logger.info(f"Print job {job_name} (ID: {job_id}) submitted to printer")
-                        success = True
-                        break
-                        
-                    except Exception as e:
-                        logger.warning(f"Print attempt {attempt + 1} failed: {e}")
-                        if attempt < self.retry_count - 1:
-                            time.sleep(self.retry_delay)
-                
-                if not success:
-                    logger.error(f"Failed to print job {job_name} after {self.retry_count} attempts")
+                # Wait for new work, but wake up in time for the next retry
+                try:
+                    first = self.print_queue.get(timeout=self.retry_scheduler.next_due_in())
+                except queue.Empty:
+                    continue
                 
-                # Cleanup
-                if temp_file.exists():
-                    temp_file.unlink()
-                
-                self.print_queue.task_done()
+                # Get next job from queue, plus any that arrive right behind it
+                self._attempt_job(self._create_job(self._collect_batch(first)))
                 
             except Exception as e:
                 logger.error(f"Error in print queue processing: {e}")
                 continue
 
+    def get_dead_letters(self) -> List[Dict[str, Any]]:
+        """Summaries of jobs that failed every attempt, oldest first"""
+        return [
+            {
+                'title': job['title'],
+                'job_names': job['names'],
+                'attempts': list(job['attempts'])
+            }
+            for job in self.dead_letters
+        ]
+
+    def requeue_dead_letters(self) -> int:
+        """Put every dead-lettered document back on the print queue"""
+        requeued = 0
+        while self.dead_letters:
+            job = self.dead_letters.popleft()
+            for data, job_name, _ in job['documents']:
+                self.print_queue.put((data, job_name, time.time()))
+                requeued += 1
+        
+        logger.info(f"Requeued {requeued} dead-lettered document(s)")
+        return requeued
+
     def cancel_all_jobs(self):
         """Cancel all pending print jobs"""
         try:
-            jobs = self.conn.getJobs(which_jobs='not-completed')
+            conn = self._connection()
+            jobs = conn.getJobs(which_jobs='not-completed')
             for job_id in jobs:
-                self.conn.cancelJob(job_id)
+                conn.cancelJob(job_id)
             logger.info("All print jobs cancelled")
         except Exception as e:
             logger.error(f"Failed to cancel jobs: {e}")
@@ -186,14 +422,15 @@ class DotMatrixPrinter:
     def retry_failed_jobs(self):
         """Retry all failed print jobs"""
         try:
-            jobs = self.conn.getJobs()
+            conn = self._connection()
+            jobs = conn.getJobs()
             retried = 0
             
             for job_id, job in jobs.items():
                 if job['job-state'] == 8:  # aborted
                     try:
-                        self.conn.cancelJob(job_id)
-                        new_id = self.conn.printFile(
+                        conn.cancelJob(job_id)
+                        new_id = conn.printFile(
                             self.printer_name,
                             job['job-originating-user-name'],
                             job['job-name'],
@@ -210,6 +447,8 @@ class DotMatrixPrinter:
             raise PrinterError("Failed to retry print jobs")
 
 if __name__ == "__main__":
+    setup_logging('/var/log/printer_interface.log', logging.INFO)
+    
     # Example usage
     try:
         printer = DotMatrixPrinter()
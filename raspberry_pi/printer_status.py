@@ -0,0 +1,194 @@
+import cups
+import logging
+import threading
+import time
+from typing import Optional, Dict, Any
+
+logger = logging.getLogger('printer_status')
+
+# IPP printer-state values
+PRINTER_IDLE = 3
+PRINTER_PROCESSING = 4
+PRINTER_STOPPED = 5
+
+STATUS_ATTRIBUTES = [
+    'printer-state',
+    'printer-state-message',
+    'printer-is-accepting-jobs',
+    'printer-state-reasons'
+]
+
+SUBSCRIBED_EVENTS = ['printer-state-changed', 'printer-stopped', 'printer-config-changed']
+
+
+class PrinterStatusCache:
+    """Keeps the latest CUPS printer state in memory.
+
+    A background thread follows CUPS printer events through a pull
+    subscription and falls back to polling the printer attributes when
+    subscriptions are not available. Readers get the cached state without
+    talking to CUPS unless it is older than the TTL.
+    """
+
+    def __init__(self, printer_name: str, ttl: float = 30.0, poll_interval: float = 5.0,
+                 lease_duration: int = 3600):
+        self.printer_name = printer_name
+        self.ttl = ttl  # seconds before a cached state is refreshed on read
+        self.poll_interval = poll_interval  # seconds between event/poll checks
+        self.lease_duration = lease_duration  # seconds a CUPS subscription lives
+
+        self.conn: Optional[cups.Connection] = None
+        self._conn_lock = threading.Lock()
+        self._status: Optional[Dict[str, Any]] = None
+        self._updated = 0.0
+        self._subscription_id: Optional[int] = None
+        self._sequence = 0
+        self._use_events = True
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start following printer state in the background"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._watch, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the watcher thread and drop the CUPS subscription"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=self.poll_interval + 1)
+        with self._conn_lock:
+            if self.conn and self._subscription_id is not None:
+                try:
+                    self.conn.cancelSubscription(self._subscription_id)
+                except Exception as e:
+                    logger.debug(f"Failed to cancel subscription: {e}")
+            self._subscription_id = None
+
+    def get(self) -> Dict[str, Any]:
+        """Return the cached printer status, refreshing it if it is stale"""
+        status = self._status
+        if status is None or time.monotonic() - self._updated > self.ttl:
+            status = self.refresh()
+        return status
+
+    def is_ready(self) -> bool:
+        """True when the printer is idle and accepting jobs"""
+        try:
+            status = self.get()
+        except Exception as e:
+            logger.error(f"Error checking printer status: {e}")
+            return False
+        return status['state'] == PRINTER_IDLE and bool(status['is_accepting'])
+
+    def age(self) -> Optional[float]:
+        """Seconds since the cached state was last updated"""
+        if self._status is None:
+            return None
+        return time.monotonic() - self._updated
+
+    def refresh(self) -> Dict[str, Any]:
+        """Poll CUPS for the printer attributes and update the cache"""
+        with self._conn_lock:
+            conn = self._connection()
+            attributes = conn.getPrinterAttributes(
+                self.printer_name, requested_attributes=STATUS_ATTRIBUTES
+            )
+        return self._update(attributes)
+
+    def _connection(self) -> cups.Connection:
+        """Return the watcher's own CUPS connection, opening it if needed"""
+        if self.conn is None:
+            self.conn = cups.Connection()
+        return self.conn
+
+    def _update(self, attributes: Dict[str, Any]) -> Dict[str, Any]:
+        """Merge printer attributes from a poll or an event into the cache"""
+        current = self._status or {
+            'state': None,
+            'state_message': '',
+            'is_accepting': False,
+            'state_reasons': []
+        }
+        status = {
+            'state': attributes.get('printer-state', current['state']),
+            'state_message': attributes.get('printer-state-message', current['state_message']),
+            'is_accepting': attributes.get('printer-is-accepting-jobs', current['is_accepting']),
+            'state_reasons': attributes.get('printer-state-reasons', current['state_reasons'])
+        }
+        # Publish a new dict so readers never see a partially updated one
+        self._status = status
+        self._updated = time.monotonic()
+        return status
+
+    def _subscribe(self):
+        """Create a pull subscription for this printer's state events"""
+        uri = f"ipp://localhost/printers/{self.printer_name}"
+        with self._conn_lock:
+            self._subscription_id = self._connection().createSubscription(
+                uri, events=SUBSCRIBED_EVENTS, lease_duration=self.lease_duration
+            )
+        self._sequence = 0
+        logger.info(f"Subscribed to CUPS events for {self.printer_name}")
+
+    def _poll_events(self):
+        """Apply any pending printer events to the cache"""
+        with self._conn_lock:
+            notifications = self._connection().getNotifications(
+                [self._subscription_id], [self._sequence + 1]
+            )
+        for event in notifications.get('notify-events', []):
+            self._sequence = max(self._sequence, event.get('notify-sequence-number', 0))
+            if event.get('printer-name', self.printer_name) == self.printer_name:
+                self._update(event)
+        # No events means no change: the cached state is current as of now
+        if self._status is not None:
+            self._updated = time.monotonic()
+
+    def _watch(self):
+        """Background loop following printer events, or polling as a fallback"""
+        while not self._stop_event.is_set():
+            try:
+                if self._use_events and self._subscription_id is None:
+                    try:
+                        self._subscribe()
+                    except Exception as e:
+                        logger.warning(f"CUPS subscriptions unavailable, polling instead: {e}")
+                        self._use_events = False
+                    else:
+                        # Seed the cache; events only report changes
+                        self.refresh()
+
+                if self._subscription_id is not None:
+                    self._poll_events()
+                else:
+                    self.refresh()
+            except cups.IPPError as e:
+                # Most likely an expired lease; subscribe again on the next pass
+                logger.warning(f"Printer event subscription lost: {e}")
+                self._subscription_id = None
+            except Exception as e:
+                logger.error(f"Error updating printer status: {e}")
+                with self._conn_lock:
+                    self.conn = None
+                    self._subscription_id = None
+
+            self._stop_event.wait(self.poll_interval)
+
+
+_caches: Dict[str, PrinterStatusCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_status_cache(printer_name: str) -> PrinterStatusCache:
+    """Return the process-wide status cache for a printer, starting it if needed"""
+    with _caches_lock:
+        cache = _caches.get(printer_name)
+        if cache is None:
+            cache = PrinterStatusCache(printer_name)
+            _caches[printer_name] = cache
+            cache.start()
+        return cache
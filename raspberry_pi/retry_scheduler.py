@@ -0,0 +1,51 @@
+import heapq
+import itertools
+import random
+import time
+from typing import Any, List, Optional
+
+
+class RetryScheduler:
+    """Parks failed work items until their backoff delay has passed.
+
+    Items are kept in a heap ordered by due time so the owning worker can
+    keep handling new work and only pick retries up once they are due.
+    Delays grow exponentially with the attempt number, are capped at
+    max_delay and are randomised by the jitter fraction so that several
+    failed jobs do not all hit the printer again at the same moment.
+    """
+
+    def __init__(self, base_delay: float = 5.0, max_delay: float = 60.0, jitter: float = 0.25):
+        self.base_delay = base_delay  # seconds before the first retry
+        self.max_delay = max_delay  # upper bound for any single delay
+        self.jitter = jitter  # fraction of the delay that is randomised
+        self._heap = []
+        self._counter = itertools.count()  # Tie-breaker so items are never compared
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def backoff(self, attempt: int) -> float:
+        """Delay in seconds before retrying after the given failed attempt"""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return delay * random.uniform(1 - self.jitter, 1)
+
+    def schedule(self, item: Any, attempt: int) -> float:
+        """Park an item after a failed attempt and return the chosen delay"""
+        delay = self.backoff(attempt)
+        heapq.heappush(self._heap, (time.monotonic() + delay, next(self._counter), item))
+        return delay
+
+    def pop_due(self) -> List[Any]:
+        """Remove and return every item whose retry time has come"""
+        now = time.monotonic()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due.append(heapq.heappop(self._heap)[2])
+        return due
+
+    def next_due_in(self) -> Optional[float]:
+        """Seconds until the next retry is due, or None if nothing is parked"""
+        if not self._heap:
+            return None
+        return max(0.0, self._heap[0][0] - time.monotonic())
@@ -0,0 +1,121 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger('snapshot_cache')
+
+DEFAULT_CACHE_PATH = Path("/var/cache/dot_matrix/snapshots.sqlite3")
+
+# max_age: served as-is; max_stale: still served, but a refresh is requested
+FreshnessPolicy = namedtuple('FreshnessPolicy', ['max_age', 'max_stale'])
+
+DEFAULT_POLICIES = {
+    'weather': FreshnessPolicy(max_age=30 * 60, max_stale=6 * 3600),
+    'market': FreshnessPolicy(max_age=5 * 60, max_stale=60 * 60),
+    'security': FreshnessPolicy(max_age=10 * 60, max_stale=2 * 3600),
+}
+DEFAULT_POLICY = FreshnessPolicy(max_age=15 * 60, max_stale=3600)
+
+FRESH = 'fresh'
+STALE = 'stale'  # Usable while a refresh is in flight
+EXPIRED = 'expired'  # Too old to print, or missing
+
+
+class SnapshotCache:
+    """Durable last-known payload per category, kept in SQLite on the Pi.
+
+    Survives daemon restarts, so a button press can print straight from the
+    cache. Each category has a freshness policy that decides whether its
+    payload can be printed as-is, printed while a refresh is requested
+    (stale-while-revalidate), or has to wait for new data.
+    """
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH,
+                 policies: Optional[Dict[str, FreshnessPolicy]] = None):
+        self.path = Path(path)
+        self.policies = dict(DEFAULT_POLICIES if policies is None else policies)
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        # WAL with relaxed syncing keeps SD card writes small
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS snapshots ("
+            "category TEXT PRIMARY KEY, payload TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    def put(self, category: str, payload: Any, updated_at: Optional[float] = None):
+        """Store the latest payload for a category"""
+        updated_at = time.time() if updated_at is None else updated_at
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO snapshots (category, payload, updated_at) VALUES (?, ?, ?)",
+                (category, json.dumps(payload), updated_at)
+            )
+            self._db.commit()
+
+    def get(self, category: str) -> Optional[Tuple[Any, float]]:
+        """Return (payload, updated_at) for a category, or None"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT payload, updated_at FROM snapshots WHERE category = ?", (category,)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def load_all(self) -> Dict[str, Tuple[Any, float]]:
+        """Every cached category as {category: (payload, updated_at)}"""
+        with self._lock:
+            rows = self._db.execute("SELECT category, payload, updated_at FROM snapshots").fetchall()
+        return {category: (json.loads(payload), updated_at) for category, payload, updated_at in rows}
+
+    def freshness(self, category: str, now: Optional[float] = None) -> Tuple[str, Optional[Any]]:
+        """Classify a category as fresh, stale or expired, returning its payload"""
+        cached = self.get(category)
+        if cached is None:
+            return EXPIRED, None
+        payload, updated_at = cached
+        age = (time.time() if now is None else now) - updated_at
+        policy = self.policy_for(category)
+        if age <= policy.max_age:
+            return FRESH, payload
+        if age <= policy.max_stale:
+            return STALE, payload
+        return EXPIRED, payload
+
+    def policy_for(self, category: str) -> FreshnessPolicy:
+        """Policy for a category, or for a topic by its last level ("briefing/weather")"""
+        policy = self.policies.get(category)
+        if policy is None:
+            policy = self.policies.get(category.rsplit('/', 1)[-1], DEFAULT_POLICY)
+        return policy
+
+    def plan(self, categories: Iterable[str]) -> Tuple[Dict[str, Any], set, set]:
+        """Split categories for a press: (printable payloads, needing refresh, must wait)"""
+        printable: Dict[str, Any] = {}
+        refresh = set()
+        missing = set()
+        now = time.time()
+        for category in categories:
+            state, payload = self.freshness(category, now)
+            if state != EXPIRED:
+                printable[category] = payload
+            if state != FRESH:
+                refresh.add(category)
+            if state == EXPIRED:
+                missing.add(category)
+        return printable, refresh, missing
+
+    def close(self):
+        """Close the database"""
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,81 @@
+import threading
+import time
+from collections import namedtuple
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# One payload as received: version is the store version at the time it landed
+Snapshot = namedtuple('Snapshot', ['topic', 'version', 'payload', 'received_at'])
+
+
+class SnapshotStore:
+    """Versioned, per-topic store of the latest MQTT payloads.
+
+    Every update bumps a store-wide version number. Waiters block on a
+    condition variable and are woken as soon as a new payload lands, so
+    nobody has to poll.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._snapshots: Dict[str, Snapshot] = {}
+        self._latest: Optional[Snapshot] = None
+        self.version = 0
+
+    def update(self, topic: str, payload: Any, received_at: Optional[float] = None) -> int:
+        """Store a new payload for a topic and wake any waiters"""
+        with self._cond:
+            self.version += 1
+            received_at = time.time() if received_at is None else received_at
+            snapshot = Snapshot(topic, self.version, payload, received_at)
+            self._snapshots[topic] = snapshot
+            self._latest = snapshot
+            self._cond.notify_all()
+            return self.version
+
+    def get(self, topic: str) -> Optional[Snapshot]:
+        """Latest snapshot for a topic, or None if nothing has arrived"""
+        return self._snapshots.get(topic)
+
+    def latest(self) -> Optional[Snapshot]:
+        """Most recent snapshot across all topics"""
+        return self._latest
+
+    def snapshot(self, topics: Optional[Iterable[str]] = None) -> Tuple[int, Dict[str, Snapshot]]:
+        """Consistent view of several topics: (store version, topic -> snapshot)"""
+        with self._cond:
+            if topics is None:
+                return self.version, dict(self._snapshots)
+            return self.version, {topic: self._snapshots[topic]
+                                  for topic in topics if topic in self._snapshots}
+
+    def wait_for_version(self, min_version: int, topic: Optional[str] = None,
+                         timeout: Optional[float] = None) -> Optional[Snapshot]:
+        """Wait until a snapshot newer than min_version exists (for one topic or any)
+
+        Returns that snapshot, or None if the timeout expires first.
+        """
+        def newer() -> Optional[Snapshot]:
+            current = self._snapshots.get(topic) if topic is not None else self._latest
+            return current if current is not None and current.version > min_version else None
+
+        with self._cond:
+            if self._cond.wait_for(newer, timeout):
+                return newer()
+            return None
+
+    def wait_for_topics(self, topics: Iterable[str], min_version: int = 0,
+                        timeout: Optional[float] = None) -> Optional[Tuple[int, Dict[str, Snapshot]]]:
+        """Wait until every topic has a snapshot newer than min_version
+
+        Returns a consistent snapshot of those topics, or None on timeout.
+        """
+        topics = list(topics)
+
+        def complete() -> bool:
+            return all(topic in self._snapshots and self._snapshots[topic].version > min_version
+                       for topic in topics)
+
+        with self._cond:
+            if not self._cond.wait_for(complete, timeout):
+                return None
+            return self.version, {topic: self._snapshots[topic] for topic in topics}
@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from briefing_template import BriefingTemplate, TemplateError
+
+class FakeFormatter:
+    def create_header(self, text, width):
+        return f"[{text}]"
+
+    def create_section_header(self, text, width):
+        return f"** {text} **"
+
+    def create_table(self, headers, data, col_widths):
+        return "\n".join(",".join(str(cell) for cell in row) for row in [headers] + data)
+
+    def create_bar_chart(self, value, max_value, width):
+        return "#" * int((value / max_value) * width)
+
+class TestBriefingTemplate(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name) / 'template.txt'
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def make_template(self, source, width=40):
+        self.path.write_text(source)
+        return BriefingTemplate(FakeFormatter(), self.path, width=width, check_interval=0)
+
+    def test_fields_defaults_and_static_directives(self):
+        template = self.make_template(
+            "%# comment\n% header TITLE\nLoc: {{location}} / {{class|SECRET}} / {{missing}}\n% rule *\n"
+        )
+        self.assertEqual(template.render({'location': 'Plano'}),
+                         "[TITLE]\nLoc: Plano / SECRET / N/A\n" + "*" * 40)
+
+    def test_if_list_bar_and_table_blocks(self):
+        template = self.make_template(
+            "% if market\n"
+            "Gold {{bar market.trend 100 4}}\n"
+            "% table 5,5\n"
+            "Name | Value\n"
+            "Dow | {{market.dow}}\n"
+            "% end\n"
+            "% end\n"
+            "% list headlines\n"
+        )
+        data = {'market': {'trend': 50, 'dow': 100}, 'headlines': ['a', 'b']}
+        self.assertEqual(template.render(data), "Gold ##\nName,Value\nDow,100\n- a\n- b")
+        self.assertEqual(template.render({}), "")
+
+    def test_long_lines_and_list_items_wrap_to_width(self):
+        template = self.make_template("Static text that is too long\nNote: {{note}}\n% list items\n", width=12)
+        data = {'note': 'fields wrap too', 'items': ['a long list item']}
+        self.assertEqual(template.render(data),
+                         "Static text\nthat is too\nlong\nNote: fields\nwrap too\n- a long\n  list item")
+
+    def test_render_sections_splits_at_sections_and_rules(self):
+        template = self.make_template("Top\n% section A\nbo\n% rule -\n\n% if b\n% section B\n% rule -\n% end\nEnd\n", width=3)
+        sections = template.render_sections({'b': 1})
+        self.assertEqual(sections, [(None, "Top\n"), ('A', "** A **\nbo\n---\n"), (None, "\n"),
+                                    ('B', "** B **\n---\n"), (None, "End")])
+        self.assertEqual("".join(text for _, text in sections), template.render({'b': 1}))
+
+    def test_recompiles_only_when_file_changes(self):
+        template = self.make_template("one\n")
+        template.render({})
+        template.render({})
+        self.assertEqual(template.compile_count, 1)
+
+        self.path.write_text("two\n")
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        self.assertEqual(template.render({}), "two")
+        self.assertEqual(template.compile_count, 2)
+
+    def test_compile_errors_report_line_numbers(self):
+        with self.assertRaisesRegex(TemplateError, "line 2"):
+            self.make_template("ok\n% bogus\n").render({})
+        with self.assertRaises(TemplateError):
+            self.make_template("% if x\nno end\n").render({})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,183 @@
+import logging
+import time
+import unittest
+from unittest.mock import Mock, patch
+import button_listener
+from button_listener import ButtonController, DaemonSupervisor
+from control_socket import ControlError, DaemonUnreachable, PRINT_NOW
+from gpio_input import SimulatedGPIO, HIGH, LOW, SHORT_PRESS
+from led_patterns import BUSY
+
+
+class TestButtonControllerOffDevice(unittest.TestCase):
+
+    def setUp(self):
+        self.gpio = SimulatedGPIO()
+        self.controller = ButtonController(button_pin=17, led_pin=27, gpio=self.gpio)
+        self.addCleanup(self.controller.led.stop)
+
+    def test_button_and_led_use_the_given_gpio(self):
+        self.assertEqual(self.gpio.levels[27], LOW)
+        self.controller.led.set_background(BUSY)
+        deadline = time.monotonic() + 1
+        while self.gpio.levels[27] != HIGH and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.gpio.levels[27], HIGH)
+
+    def test_press_is_read_from_the_simulated_pin(self):
+        self.gpio.set_level(17, LOW)
+        self.gpio.set_level(17, HIGH, timestamp=time.monotonic() + 0.1)
+        kind, _ = self.controller.button.wait_for_press(timeout=1)
+        self.assertEqual(kind, SHORT_PRESS)
+
+    def test_unreachable_daemon_gets_the_command_once_it_is_back(self):
+        self.controller.supervisor.wait_until_healthy = Mock(return_value=True)
+        send = Mock(side_effect=[DaemonUnreachable("refused"), {'ok': True}])
+        with patch.object(button_listener, 'send_command', send):
+            self.assertEqual(self.controller._send_command(PRINT_NOW), {'ok': True})
+        self.assertEqual(send.call_count, 2)
+
+    def test_timed_out_command_is_not_resent(self):
+        self.controller.supervisor.wait_until_healthy = Mock(return_value=True)
+        send = Mock(side_effect=ControlError("No reply from print daemon: timed out"))
+        with patch.object(button_listener, 'send_command', send):
+            with self.assertRaises(ControlError):
+                self.controller._send_command(PRINT_NOW)
+        send.assert_called_once_with(PRINT_NOW)
+
+
+
+class FakeProcess:
+    """Popen stand-in; returncode None while running"""
+
+    def __init__(self, returncode=None):
+        self.returncode = returncode
+        self.stdout = self.stderr = None
+        self.terminated = False
+
+    def poll(self):
+        return self.returncode
+
+    def terminate(self):
+        self.terminated = True
+        self.returncode = -15
+
+    def wait(self, timeout=None):
+        return self.returncode
+
+    kill = terminate
+
+
+class ScriptedStop:
+    """Replaces the supervisor's stop event: records every wait and runs one script step
+    per wait, so the supervision loop runs synchronously without sleeping. Once the
+    steps run out the next wait stops supervision."""
+
+    def __init__(self, steps=0):
+        self.waits = []
+        self.steps = steps
+        self._set = False
+
+    def wait(self, timeout=None):
+        self.waits.append(timeout)
+        if self.steps:
+            self.steps -= 1
+        else:
+            self._set = True
+        return self._set
+
+    def is_set(self):
+        return self._set
+
+    def set(self):
+        self._set = True
+
+
+class TestDaemonSupervisor(unittest.TestCase):
+
+    def make_supervisor(self, start, health_check, steps):
+        supervisor = DaemonSupervisor(start, health_check, logging.getLogger('test_supervisor'))
+        supervisor._stopping = ScriptedStop(steps)
+        return supervisor
+
+    def crashing_start(self):
+        return FakeProcess(returncode=1)
+
+    def test_backoff_doubles_up_to_the_maximum(self):
+        supervisor = self.make_supervisor(self.crashing_start, lambda: False, steps=7)
+        supervisor.max_crashes = 100
+        supervisor._supervise()
+        self.assertEqual(supervisor._stopping.waits, [1.0, 2.0, 4.0, 8.0, 16.0, 32.0, 60.0, 60.0])
+        self.assertEqual(supervisor.stats['starts'], 8)
+        self.assertEqual(supervisor.stats['restarts'], 7)
+        self.assertEqual(supervisor.stats['last_exit_code'], 1)
+        self.assertFalse(supervisor.healthy.is_set())
+
+    def test_crash_loop_pauses_restarts(self):
+        supervisor = self.make_supervisor(self.crashing_start, lambda: False, steps=5)
+        supervisor._supervise()
+        # Five crashes inside the window: pause, then start over with a short delay
+        self.assertEqual(supervisor._stopping.waits, [1.0, 2.0, 4.0, 8.0, 300.0, 1.0])
+        self.assertEqual(supervisor.stats['crash_loops'], 1)
+        self.assertEqual(supervisor.stats['crashes'], 6)
+
+    def test_stable_run_resets_the_backoff(self):
+        supervisor = self.make_supervisor(self.crashing_start, lambda: False, steps=3)
+        supervisor.stable_time = 0.0  # Every run counts as stable
+        supervisor._supervise()
+        self.assertEqual(supervisor._stopping.waits, [1.0, 1.0, 1.0, 1.0])
+
+    def test_restart_after_exit(self):
+        processes = []
+
+        def start():
+            processes.append(FakeProcess())
+            return processes[-1]
+
+        def health_check():
+            return bool(processes) and processes[-1].returncode is None
+
+        supervisor = self.make_supervisor(start, health_check, steps=2)
+        original_wait = supervisor._stopping.wait
+
+        def wait(timeout=None):
+            if len(processes) == 1 and processes[0].returncode is None:
+                processes[0].returncode = 1  # Crashes while healthy
+            return original_wait(timeout)
+
+        supervisor._stopping.wait = wait
+        supervisor._supervise()
+        self.assertEqual(len(processes), 2)
+        self.assertEqual(supervisor._stopping.waits, [10.0, 1.0, 10.0])
+        self.assertEqual(supervisor.stats['crashes'], 1)
+        self.assertEqual(supervisor.stats['restarts'], 1)
+        self.assertTrue(supervisor.healthy.is_set())
+
+    def test_unresponsive_daemon_is_restarted(self):
+        processes = []
+
+        def start():
+            processes.append(FakeProcess())
+            return processes[-1]
+
+        checks = iter([False, True, False, False, False, False, True])
+        supervisor = self.make_supervisor(start, lambda: next(checks), steps=4)
+        supervisor._supervise()
+        self.assertEqual(supervisor._stopping.waits, [10.0, 10.0, 10.0, 1.0, 10.0])
+        self.assertTrue(processes[0].terminated)
+        self.assertEqual(supervisor.stats['health_failures'], 3)
+        self.assertEqual(supervisor.stats['restarts'], 1)
+        self.assertTrue(supervisor.healthy.is_set())
+
+    def test_daemon_managed_elsewhere_is_only_watched(self):
+        start = Mock()
+        supervisor = self.make_supervisor(start, lambda: True, steps=2)
+        supervisor._supervise()
+        start.assert_not_called()
+        self.assertEqual(supervisor._stopping.waits, [10.0, 10.0, 10.0])
+        self.assertTrue(supervisor.healthy.is_set())
+        self.assertIsNotNone(supervisor.uptime)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+import numpy as np
+from charts import lttb, sparkline, histogram, minmax_band, render_columns
+
+class TestCharts(unittest.TestCase):
+
+    def test_lttb_keeps_endpoints_and_extremes(self):
+        x = np.arange(1000, dtype=float)
+        y = np.zeros(1000)
+        y[500] = 50.0
+        y[700] = -30.0
+        sampled_x, sampled_y = lttb(x, y, 20)
+
+        self.assertEqual(len(sampled_x), 20)
+        self.assertEqual((sampled_x[0], sampled_x[-1]), (0.0, 999.0))
+        self.assertIn(50.0, sampled_y)
+        self.assertIn(-30.0, sampled_y)
+
+    def test_lttb_returns_short_series_unchanged(self):
+        x, y = np.arange(5.0), np.arange(5.0)
+        self.assertIs(lttb(x, y, 10)[1], y)
+
+    def test_render_columns_uses_half_blocks(self):
+        self.assertEqual(render_columns(np.array([0, 1, 2, 3, 4]), 2), ["   ▄█", " ▄███"])
+
+    def test_sparkline_fits_width_and_height(self):
+        chart = sparkline(np.sin(np.linspace(0, 10, 5000)), width=40, height=3)
+        rows = chart.split("\n")
+        self.assertEqual(len(rows), 3)
+        self.assertTrue(all(len(row) == 40 for row in rows))
+
+    def test_sparkline_accepts_time_value_pairs(self):
+        self.assertEqual(sparkline([(0, 1.0), (60, 3.0)], height=1), " █")
+
+    def test_histogram_and_band_dimensions(self):
+        values = np.random.default_rng(1).normal(size=2000)
+        for chart in (histogram(values, 30, 4), minmax_band(values, 30, 4)):
+            rows = chart.split("\n")
+            self.assertEqual(len(rows), 4)
+            self.assertTrue(all(len(row) == 30 for row in rows))
+
+    def test_charts_only_use_cp437_glyphs(self):
+        chart = sparkline(range(100)) + histogram(range(100)) + minmax_band(range(100))
+        chart.replace("\n", "").encode('cp437')
+
+if __name__ == '__main__':
+    unittest.main()
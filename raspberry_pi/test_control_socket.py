@@ -0,0 +1,53 @@
+import socket
+import tempfile
+import unittest
+from pathlib import Path
+from control_socket import ControlServer, ControlError, DaemonUnreachable, send_command, PRINT_NOW, STATUS
+
+class TestControlSocket(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name) / 'daemon.sock'
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def start_server(self, handlers):
+        server = ControlServer(handlers, self.path)
+        server.start()
+        self.addCleanup(server.stop)
+        return server
+
+    def test_commands_are_acknowledged(self):
+        self.start_server({STATUS: lambda: {'printer_ready': True}})
+        self.assertEqual(send_command('STATUS', self.path), {'ok': True, 'printer_ready': True})
+
+    def test_failures_and_unknown_commands_are_reported(self):
+        def fail():
+            raise RuntimeError("printer not ready")
+        self.start_server({PRINT_NOW: fail})
+        self.assertEqual(send_command(PRINT_NOW, self.path), {'ok': False, 'error': 'printer not ready'})
+        self.assertFalse(send_command('eject', self.path)['ok'])
+
+    def test_missing_daemon_raises(self):
+        with self.assertRaises(DaemonUnreachable):
+            send_command(STATUS, self.path, timeout=1)
+
+    def test_timeout_after_connecting_is_not_unreachable(self):
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.addCleanup(listener.close)
+        listener.bind(str(self.path))
+        listener.listen(1)  # Accepts the connection but never replies
+        with self.assertRaises(ControlError) as raised:
+            send_command(PRINT_NOW, self.path, timeout=0.1)
+        self.assertNotIsInstance(raised.exception, DaemonUnreachable)
+
+    def test_stop_removes_socket(self):
+        server = self.start_server({})
+        self.assertTrue(self.path.exists())
+        server.stop()
+        self.assertFalse(self.path.exists())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,176 @@
+import json
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import Mock, patch
+import data_aggregator
+from data_aggregator import BriefingFormatter, DataAggregator
+from snapshot_cache import SnapshotCache
+
+class TestBriefingFormatterTable(unittest.TestCase):
+
+    def setUp(self):
+        self.formatter = BriefingFormatter()
+
+    def test_fixed_width_table_layout(self):
+        table = self.formatter.create_table(["Index", "Change"], [["Dow", "+0.5%"]], [5, 6])
+        self.assertEqual(table.split("\n"), [
+            "┌─────┬──────┐",
+            "│Index│Change│",
+            "├─────┼──────┤",
+            "│Dow  │+0.5% │",
+            "└─────┴──────┘",
+        ])
+
+    def test_long_values_are_truncated_with_ellipsis(self):
+        table = self.formatter.create_table(["Alert"], [["Phishing campaign"]], [10])
+        self.assertIn("│Phishin...│", table)
+
+    def test_auto_fit_sizes_columns_to_data(self):
+        self.assertEqual(
+            self.formatter.fit_column_widths(["Index", "Value"], [["NASDAQ", 10500]]),
+            [6, 5]
+        )
+
+    def test_auto_fit_respects_max_width(self):
+        table = self.formatter.create_table(["Alert"], [["x" * 100]], max_width=20)
+        self.assertTrue(all(len(line) == 20 for line in table.split("\n")))
+
+    def test_borders_are_cached_per_width_tuple(self):
+        self.formatter.create_table(["A"], [], [3])
+        self.formatter.create_table(["B"], [], [3])
+        self.assertEqual(list(self.formatter._border_cache), [(3,)])
+
+class TestBriefingDiff(unittest.TestCase):
+
+    TEMPLATE = (
+        "Briefing\n"
+        "% section MARKETS\n"
+        "% table 5,5\n"
+        "Index | Value\n"
+        "Dow | {{dow}}\n"
+        "Gold | {{gold}}\n"
+        "% end\n"
+        "% rule *\n"
+        "% section NEWS\n"
+        "% list news\n"
+        "% rule *\n"
+        "End\n"
+    )
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        path = Path(self.directory.name) / 'template.txt'
+        path.write_text(self.TEMPLATE)
+        self.formatter = BriefingFormatter(path)
+        self.data = {'dow': 100, 'gold': 5, 'news': ['a']}
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_first_briefing_is_complete(self):
+        self.assertEqual(self.formatter.format_briefing(self.data, diff_only=True),
+                         self.formatter.format_briefing(self.data))
+
+    def test_unchanged_sections_become_markers(self):
+        self.formatter.format_briefing(self.data, diff_only=True)
+        self.formatter.mark_printed(printed_at=0)
+        self.data['news'] = ['b']
+        briefing = self.formatter.format_briefing(self.data, diff_only=True)
+        self.assertIn("MARKETS: unchanged since", briefing)
+        self.assertIn("- b", briefing)
+        self.assertTrue(briefing.startswith("Briefing\n") and briefing.endswith("End"))
+
+    def test_unprinted_briefings_are_not_remembered(self):
+        self.formatter.format_briefing(self.data, diff_only=True)
+        self.assertNotIn("unchanged", self.formatter.format_briefing(self.data, diff_only=True))
+
+    def test_diff_rows_leaves_out_printed_rows(self):
+        self.formatter.format_briefing(self.data, diff_only=True)
+        self.formatter.mark_printed()
+        self.data['dow'] = 101
+        briefing = self.formatter.format_briefing(self.data, diff_only=True, diff_rows=True)
+        self.assertIn("│Dow  │101  │", briefing)
+        self.assertNotIn("│Gold │", briefing)
+        self.assertIn("(1 unchanged rows)", briefing)
+
+class TestFormatDataForPrinting(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = Path(directory.name) / 'template.txt'
+        path.write_text(TestBriefingDiff.TEMPLATE)
+        self.formatter = BriefingFormatter(path)
+        self.data = {'dow': 100, 'gold': 5, 'news': ['a']}
+        aggregator = Mock()
+        aggregator.get_latest_data.return_value = self.data
+        for target in (patch.object(data_aggregator, 'get_aggregator', return_value=aggregator),
+                       patch.object(data_aggregator, '_formatter', self.formatter)):
+            target.start()
+            self.addCleanup(target.stop)
+
+    def test_formatting_alone_does_not_mark_printed(self):
+        data_aggregator.format_data_for_printing(diff_only=True)
+        briefing = data_aggregator.format_data_for_printing(diff_only=True)
+        self.assertNotIn("unchanged", briefing)
+
+    def test_printed_briefing_is_remembered(self):
+        printed = []
+        data_aggregator.format_data_for_printing(diff_only=True, print_briefing=printed.append)
+        briefing = data_aggregator.format_data_for_printing(diff_only=True)
+        self.assertEqual(len(printed), 1)
+        self.assertIn("MARKETS: unchanged since", briefing)
+
+    def test_failed_print_is_not_remembered(self):
+        with self.assertRaises(IOError):
+            data_aggregator.format_data_for_printing(diff_only=True,
+                                                     print_briefing=Mock(side_effect=IOError("offline")))
+        briefing = data_aggregator.format_data_for_printing(diff_only=True)
+        self.assertNotIn("unchanged", briefing)
+    def test_no_data_within_timeout_prints_nothing(self):
+        data_aggregator.get_aggregator().get_latest_data.side_effect = TimeoutError("no data")
+        print_briefing = Mock()
+        with patch('builtins.print'):
+            self.assertEqual(data_aggregator.format_data_for_printing(print_briefing=print_briefing,
+                                                                      timeout=0.1), "")
+        data_aggregator.get_aggregator().get_latest_data.assert_called_once_with(timeout=0.1)
+        print_briefing.assert_not_called()
+
+    def test_wait_for_data_is_bounded_by_default(self):
+        data_aggregator.format_data_for_printing()
+        data_aggregator.get_aggregator().get_latest_data.assert_called_once_with(
+            timeout=data_aggregator.DATA_TIMEOUT)
+
+
+class TestCachedStartup(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache = SnapshotCache(Path(directory.name) / 'snapshots.sqlite3')
+        self.addCleanup(self.cache.close)
+        now = time.time()
+        self.cache.put('briefing/weather', {'temperature': 18}, updated_at=now)
+        self.cache.put('briefing/market', {'price': 1}, updated_at=now - 30 * 60)
+        self.cache.put('briefing/security', {'alert': 'old'}, updated_at=now - 3 * 86400)
+        with patch.object(DataAggregator, 'setup_mqtt'):
+            self.aggregator = DataAggregator(
+                ('briefing/weather', 'briefing/market', 'briefing/security'), cache=self.cache)
+        self.aggregator.mqtt_client = Mock()
+
+    def test_expired_payloads_are_not_served(self):
+        self.assertIsNotNone(self.aggregator.store.get('briefing/weather'))
+        self.assertIsNotNone(self.aggregator.store.get('briefing/market'))
+        self.assertIsNone(self.aggregator.store.get('briefing/security'))
+
+    def test_stale_payloads_are_refreshed_on_connect(self):
+        self.assertEqual(self.aggregator.stale_topics, {'briefing/market'})
+        self.aggregator.on_connect(self.aggregator.mqtt_client, None, {}, 0)
+        topic, payload = self.aggregator.mqtt_client.publish.call_args[0]
+        self.assertEqual(topic, self.aggregator.refresh_topic)
+        self.assertEqual(json.loads(payload)['categories'], ['market'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import gc
+import unittest
+import weakref
+from datetime import datetime
+from escp import EscpRenderer, encode_cp437, render_markup, PRINTER_INIT, FORM_FEED
+from layout import PageLayout
+
+class TestEscp(unittest.TestCase):
+
+    def test_box_drawing_is_translated_to_cp437(self):
+        self.assertEqual(encode_cp437('┌─┐│└┘'), b'\xda\xc4\xbf\xb3\xc0\xd9')
+        self.assertEqual(encode_cp437('▇'), b'\xdb')
+
+    def test_control_codes_pass_through(self):
+        self.assertEqual(encode_cp437('a\nb\f'), b'a\nb\x0c')
+
+    def test_unknown_characters_are_replaced(self):
+        self.assertEqual(encode_cp437('🤝 → ok'), b'? -> ok')
+
+    def test_markup_becomes_escape_codes(self):
+        self.assertEqual(render_markup('<b>A</b><c>B</c><w>C</w>'),
+                         b'\x1bEA\x1bF\x0fB\x12\x1bW\x01C\x1bW\x00')
+
+    def test_render_job_is_one_buffer(self):
+        renderer = EscpRenderer(PageLayout(carriage=10, condensed=False))
+        job = renderer.render_job('Body', printed_at=datetime(2024, 10, 8, 9, 30))
+        self.assertTrue(job.startswith(PRINTER_INIT + b'=' * 10 + b'\n'))
+        self.assertIn(b'Printed at: 2024-10-08 09:30:00\n', job)
+        self.assertIn(b'Body', job)
+        self.assertTrue(job.endswith(b'End of Document\n' + FORM_FEED))
+
+    def test_long_lines_are_wrapped_to_the_page(self):
+        renderer = EscpRenderer(PageLayout(carriage=20, condensed=False))
+        document = renderer.render_document('- ' + 'word ' * 8)
+        self.assertIn(b'- word word word\n  word word word', document)
+
+    def test_cached_rules_do_not_keep_renderers_alive(self):
+        renderer = EscpRenderer(PageLayout(carriage=12, condensed=False))
+        renderer.render_job('hello')
+        ref = weakref.ref(renderer)
+        del renderer
+        gc.collect()
+        self.assertIsNone(ref())
+
+    def test_condensed_layout_switches_mode_around_document(self):
+        renderer = EscpRenderer(PageLayout(carriage=10, condensed=True))
+        document = renderer.render_document('Body')
+        self.assertTrue(document.startswith(b'\x0f' + b'=' * 17 + b'\n'))
+        self.assertTrue(document.endswith(FORM_FEED + b'\x12'))
+
+if __name__ == '__main__':
+    unittest.main()
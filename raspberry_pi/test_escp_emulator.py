@@ -0,0 +1,57 @@
+import unittest
+from escp import EscpRenderer, PRINTER_INIT
+from escp_emulator import EscpEmulator, benchmark_layout
+from layout import CONDENSED, PageLayout, WIDE_CONDENSED
+
+class TestEscpEmulator(unittest.TestCase):
+
+    def setUp(self):
+        self.emulator = EscpEmulator({
+            'chars_per_second': 100.0,
+            'line_feed_seconds': 0.1,
+            'form_feed_seconds': 1.0,
+            'page_width': 10,
+        })
+
+    def test_counts_characters_lines_and_form_feeds(self):
+        result = self.emulator.run(PRINTER_INIT + b'abc\nde\n\x0c')
+        self.assertEqual(result['chars'], 5)
+        self.assertEqual(result['lines'], 2)
+        self.assertEqual(result['form_feeds'], 1)
+
+    def test_escape_parameters_are_not_counted_as_text(self):
+        result = self.emulator.run(b'\x1bW\x01A\x1bW\x00\x1b3\x18B')
+        self.assertEqual(result['chars'], 2)
+
+    def test_estimated_time_follows_cost_model(self):
+        # 10 chars + one 1/6" line feed + one form feed
+        result = self.emulator.run(b'\x1b@' + b'x' * 10 + b'\n\x0c')
+        self.assertAlmostEqual(result['estimated_seconds'], 0.1 + 0.1 + 1.0)
+
+    def test_bold_and_double_width_cost_more(self):
+        plain = self.emulator.run(b'abcd')['estimated_seconds']
+        bold = self.emulator.run(b'\x1bEabcd')['estimated_seconds']
+        wide = self.emulator.run(b'\x1bW\x01abcd')['estimated_seconds']
+        self.assertAlmostEqual(bold, plain * 2)
+        self.assertAlmostEqual(wide, plain * 2)
+
+    def test_overflow_lines_are_reported(self):
+        result = self.emulator.run('x' * 11 + '\nshort\n')
+        self.assertEqual(result['overflow_lines'], 1)
+
+    def test_condensed_lines_fit_the_carriage(self):
+        for layout in (CONDENSED, WIDE_CONDENSED):
+            emulator = EscpEmulator(layout=layout)
+            result = emulator.run(EscpRenderer(layout).render_job('x' * layout.width))
+            self.assertEqual(result['overflow_lines'], 0, layout)
+            overflowing = b'\x0f' + b'x' * (layout.width + 1) + b'\n'
+            self.assertEqual(emulator.run(overflowing)['overflow_lines'], 1, layout)
+
+    def test_benchmark_layout_reports_render_time(self):
+        renderer = EscpRenderer(PageLayout(carriage=10, condensed=False))
+        report = benchmark_layout(lambda: renderer.render_job('hello'), repeat=2)
+        self.assertIn('render_ms', report)
+        self.assertEqual(report['form_feeds'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
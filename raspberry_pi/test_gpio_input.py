@@ -0,0 +1,90 @@
+import threading
+import time
+import unittest
+from gpio_input import (ButtonInput, DebounceStateMachine, SimulatedGPIO,
+                        HIGH, LOW, SHORT_PRESS, LONG_PRESS)
+
+class TestDebounceStateMachine(unittest.TestCase):
+
+    def setUp(self):
+        self.machine = DebounceStateMachine(debounce=0.05, long_press=1.0)
+
+    def test_bouncy_short_press(self):
+        edges = [(LOW, 0.0), (HIGH, 0.001), (LOW, 0.002), (HIGH, 0.3), (LOW, 0.301), (HIGH, 0.302)]
+        events = [self.machine.edge(level, t) for level, t in edges]
+        self.assertEqual([event for event in events if event], [SHORT_PRESS])
+
+    def test_long_press_is_reported_at_the_deadline_once(self):
+        self.machine.edge(LOW, 0.0)
+        self.assertEqual(self.machine.deadline(), 1.0)
+        self.assertIsNone(self.machine.poll(0.5, LOW))
+        self.assertEqual(self.machine.poll(1.0, LOW), LONG_PRESS)
+        self.assertIsNone(self.machine.poll(2.0, LOW))
+        self.assertIsNone(self.machine.edge(HIGH, 2.5))
+        self.assertIsNone(self.machine.deadline())
+
+    def test_missed_release_is_a_short_press(self):
+        self.machine.edge(LOW, 0.0)
+        self.assertEqual(self.machine.poll(1.0, HIGH), SHORT_PRESS)
+        self.assertIsNone(self.machine.deadline())
+
+    def test_tap_shorter_than_debounce_settles_into_a_short_press(self):
+        self.assertIsNone(self.machine.edge(LOW, 0.0))
+        self.assertIsNone(self.machine.edge(HIGH, 0.03))  # Dropped as bounce
+        self.assertEqual(self.machine.settle_deadline(), 0.05)
+        self.assertIsNone(self.machine.settle(0.04, HIGH))
+        self.assertEqual(self.machine.settle(0.05, HIGH), SHORT_PRESS)
+        self.assertIsNone(self.machine.settle_deadline())
+        self.assertIsNone(self.machine.deadline())
+
+    def test_bounces_that_cancel_out_settle_quietly(self):
+        self.machine.edge(LOW, 0.0)
+        self.machine.edge(HIGH, 0.001)
+        self.machine.edge(LOW, 0.002)
+        self.assertIsNone(self.machine.settle(0.05, LOW))
+        self.assertEqual(self.machine.poll(1.0, LOW), LONG_PRESS)
+
+    def test_press_edge_mode_without_long_press(self):
+        machine = DebounceStateMachine(debounce=0.05, long_press=None)
+        self.assertEqual(machine.edge(LOW, 0.0), SHORT_PRESS)
+        self.assertIsNone(machine.edge(HIGH, 0.01))
+        self.assertIsNone(machine.edge(HIGH, 5.0))
+        self.assertIsNone(machine.deadline())
+
+    def test_press_edge_mode_recovers_a_lost_release(self):
+        machine = DebounceStateMachine(debounce=0.05, long_press=None)
+        self.assertEqual(machine.edge(LOW, 0.0), SHORT_PRESS)
+        self.assertIsNone(machine.edge(HIGH, 0.01))
+        self.assertIsNone(machine.settle(0.05, HIGH))
+        self.assertEqual(machine.edge(LOW, 1.0), SHORT_PRESS)
+
+class TestButtonInput(unittest.TestCase):
+
+    def setUp(self):
+        self.gpio = SimulatedGPIO()
+        self.button = ButtonInput(self.gpio, 17, debounce=0.01, long_press=0.2)
+
+    def test_short_press_from_edges(self):
+        self.gpio.set_level(17, LOW)
+        self.gpio.set_level(17, HIGH, timestamp=time.monotonic() + 0.05)
+        self.assertEqual(self.button.wait_for_press(timeout=1)[0], SHORT_PRESS)
+
+    def test_tap_shorter_than_debounce(self):
+        button = ButtonInput(self.gpio, 22, debounce=0.05, long_press=1.0)
+        self.gpio.set_level(22, LOW)
+        self.gpio.set_level(22, HIGH)
+        kind, latency = button.wait_for_press(timeout=0.5)
+        self.assertEqual(kind, SHORT_PRESS)
+        self.assertLess(latency, 0.05)
+
+    def test_long_press_while_held(self):
+        threading.Thread(target=self.gpio.press, args=(17, 0.4), daemon=True).start()
+        kind, latency = self.button.wait_for_press(timeout=2)
+        self.assertEqual(kind, LONG_PRESS)
+        self.assertLess(latency, 0.1)
+
+    def test_timeout_without_edges(self):
+        self.assertIsNone(self.button.wait_for_press(timeout=0.01))
+
+if __name__ == '__main__':
+    unittest.main()
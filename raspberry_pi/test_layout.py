@@ -0,0 +1,34 @@
+import unittest
+from layout import PageLayout, STANDARD, WIDE, CONDENSED, WIDE_CONDENSED, wrap_line, wrap_text, wrap_item
+
+class TestLayout(unittest.TestCase):
+
+    def test_page_widths(self):
+        self.assertEqual(STANDARD.width, 80)
+        self.assertEqual(WIDE.width, 136)
+        self.assertEqual(CONDENSED.width, 136)
+        self.assertEqual(WIDE_CONDENSED.width, 232)
+        self.assertEqual(PageLayout(carriage=10, condensed=True).width, 17)
+
+    def test_short_lines_are_unchanged(self):
+        self.assertEqual(wrap_line("  short", 10), "  short")
+
+    def test_bullets_get_a_hanging_indent(self):
+        self.assertEqual(wrap_item("one two three four", 10), "- one two\n  three\n  four")
+        self.assertEqual(wrap_line("12. alpha beta gamma", 12), "12. alpha\n    beta\n    gamma")
+        self.assertEqual(wrap_line("  indented text here", 10), "  indented\n  text\n  here")
+
+    def test_long_words_are_split_at_the_width(self):
+        self.assertEqual(wrap_line("abcdefghijkl", 5), "abcde\nfghij\nkl")
+
+    def test_wrap_text_keeps_blank_lines(self):
+        self.assertEqual(wrap_text("aaa bbb\n\nccc", 4), "aaa\nbbb\n\nccc")
+
+    def test_wrapped_lines_are_memoized(self):
+        wrap_line.cache_clear()
+        wrap_line("memo test line", 5)
+        wrap_line("memo test line", 5)
+        self.assertEqual(wrap_line.cache_info().hits, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import threading
+import time
+import unittest
+from led_patterns import LedScheduler, Pattern, PATTERNS, ON, OFF, IDLE, BUSY, ERROR
+
+
+class RecordingLed:
+    """LED stand-in that records every level written"""
+
+    def __init__(self):
+        self.levels = []
+        self.changed = threading.Event()
+
+    def __call__(self, level):
+        self.levels.append(level)
+        self.changed.set()
+
+    def wait_for(self, level, timeout=1.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.levels and self.levels[-1] == level:
+                return True
+            self.changed.clear()
+            self.changed.wait(0.01)
+        return False
+
+
+class TestLedScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.led = RecordingLed()
+        patterns = {
+            IDLE: Pattern(((OFF, 0.0),), repeat=False),
+            BUSY: PATTERNS[BUSY],
+            ERROR: Pattern(((ON, 0.02), (OFF, 0.02)) * 2, repeat=False),
+            'slow': Pattern(((ON, 5.0), (OFF, 5.0)), repeat=True),
+        }
+        self.scheduler = LedScheduler(self.led, patterns)
+
+    def tearDown(self):
+        self.scheduler.stop()
+
+    def test_play_does_not_block(self):
+        start = time.monotonic()
+        self.scheduler.play('slow')
+        self.assertLess(time.monotonic() - start, 0.1)
+        self.assertTrue(self.led.wait_for(ON))
+
+    def test_new_pattern_preempts_running_one(self):
+        self.scheduler.play('slow')
+        self.assertTrue(self.led.wait_for(ON))
+        self.scheduler.play(IDLE)
+        self.assertTrue(self.led.wait_for(OFF, timeout=0.5))
+
+    def test_one_shot_returns_to_background(self):
+        self.scheduler.set_background(BUSY)
+        self.assertTrue(self.led.wait_for(ON))
+        self.scheduler.play(ERROR)
+        time.sleep(0.2)
+        self.assertEqual(self.scheduler.current, BUSY)
+        self.assertEqual(self.led.levels[-1], ON)
+        self.assertGreaterEqual(self.led.levels.count(OFF), 2)
+
+    def test_busy_stays_on_until_replaced(self):
+        self.scheduler.play(BUSY)
+        self.assertTrue(self.led.wait_for(ON))
+        time.sleep(0.1)
+        self.assertEqual(self.scheduler.current, BUSY)
+        self.assertEqual(self.led.levels[self.led.levels.index(ON):], [ON])
+        self.scheduler.play(ERROR)
+        time.sleep(0.2)
+        self.assertEqual(self.scheduler.current, IDLE)
+        self.assertEqual(self.led.levels[-1], OFF)
+
+    def test_stop_switches_led_off(self):
+        self.scheduler.set_background(BUSY)
+        self.assertTrue(self.led.wait_for(ON))
+        self.scheduler.stop()
+        self.assertEqual(self.led.levels[-1], OFF)
+
+    def test_unknown_pattern(self):
+        with self.assertRaises(KeyError):
+            self.scheduler.play('disco')
+
+
+if __name__ == '__main__':
+    unittest.main()
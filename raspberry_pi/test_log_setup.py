@@ -0,0 +1,108 @@
+import logging
+import os
+import signal
+import tempfile
+import unittest
+from pathlib import Path
+from log_setup import BufferedFileHandler, exit_on_sigterm, setup_logging, shutdown_logging
+
+
+class TestBufferedFileHandler(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / 'logs' / 'test.log'
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_handler(self, **kwargs):
+        handler = BufferedFileHandler(self.path, flush_interval=60, **kwargs)
+        handler.setFormatter(logging.Formatter('%(levelname)s %(message)s'))
+        self.addCleanup(handler.close)
+        return handler
+
+    def record(self, message, level=logging.INFO):
+        return logging.LogRecord('test', level, __file__, 1, message, None, None)
+
+    def test_lines_stay_in_ram_until_flushed(self):
+        handler = self.make_handler()
+        handler.handle(self.record("one"))
+        handler.handle(self.record("two"))
+        self.assertFalse(self.path.exists())
+        handler.flush()
+        self.assertEqual(self.path.read_text(), "INFO one\nINFO two\n")
+        self.assertEqual(handler.stats['flushes'], 1)
+
+    def test_errors_are_written_immediately(self):
+        handler = self.make_handler()
+        handler.handle(self.record("context"))
+        handler.handle(self.record("boom", logging.ERROR))
+        self.assertEqual(self.path.read_text(), "INFO context\nERROR boom\n")
+
+    def test_full_buffer_is_flushed(self):
+        handler = self.make_handler(capacity=3)
+        for i in range(7):
+            handler.handle(self.record(str(i)))
+        self.assertEqual(handler.stats['flushes'], 2)
+        self.assertEqual(len(handler.buffer), 1)
+
+    def test_rotation(self):
+        handler = self.make_handler(max_bytes=20, backup_count=2)
+        for i in range(4):
+            handler.handle(self.record(f"message {i}"))
+            handler.flush()
+        self.assertEqual(self.path.read_text(), "INFO message 3\n")
+        self.assertEqual(Path(f"{self.path}.1").read_text(), "INFO message 2\n")
+        self.assertEqual(Path(f"{self.path}.2").read_text(), "INFO message 1\n")
+        self.assertFalse(Path(f"{self.path}.3").exists())
+
+
+class TestSetupLogging(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.addCleanup(shutdown_logging)
+
+    def test_records_reach_the_file_after_flush(self):
+        path = Path(self.tmp.name) / 'app.log'
+        setup = setup_logging(path, logging.DEBUG, name='test_log_setup', fmt='%(message)s', console=False)
+        logger = logging.getLogger('test_log_setup')
+        logger.debug("queued")
+        setup.flush()
+        self.assertEqual(path.read_text(), "queued\n")
+        logger.info("after flush")
+        shutdown_logging()
+        self.assertEqual(path.read_text(), "queued\nafter flush\n")
+        self.assertEqual(logger.handlers, [])
+
+    def test_setup_again_replaces_previous(self):
+        first = Path(self.tmp.name) / 'first.log'
+        second = Path(self.tmp.name) / 'second.log'
+        logger = logging.getLogger('test_log_setup')
+        setup_logging(first, name='test_log_setup', fmt='%(message)s', console=False)
+        logger.info("a")
+        setup_logging(second, name='test_log_setup', fmt='%(message)s', console=False)
+        logger.info("b")
+        shutdown_logging()
+        self.assertEqual(first.read_text(), "a\n")
+        self.assertEqual(second.read_text(), "b\n")
+        self.assertEqual(len(logger.handlers), 0)
+
+    def test_setup_leaves_signal_handlers_alone(self):
+        before = signal.getsignal(signal.SIGTERM)
+        setup_logging(Path(self.tmp.name) / 'app.log', name='test_log_setup', console=False)
+        self.assertIs(signal.getsignal(signal.SIGTERM), before)
+
+    def test_exit_on_sigterm(self):
+        previous = signal.getsignal(signal.SIGTERM)
+        self.addCleanup(signal.signal, signal.SIGTERM, previous)
+        exit_on_sigterm()
+        with self.assertRaises(SystemExit) as raised:
+            os.kill(os.getpid(), signal.SIGTERM)
+        self.assertEqual(raised.exception.code, 128 + signal.SIGTERM)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+from payload_encoding import (EncodingError, JSON, ZLIB, available_encodings, dumps,
+                              encoded_topics, loads, split_topic)
+from payload_models import MarketQuote, PayloadError, decode_payload
+
+class TestPayloadEncoding(unittest.TestCase):
+
+    def test_topic_suffix_marks_the_encoding(self):
+        self.assertEqual(split_topic('market/data/zlib'), ('market/data', ZLIB))
+        self.assertEqual(split_topic('market/data'), ('market/data', JSON))
+        self.assertEqual(split_topic('zlib'), ('zlib', JSON))
+
+    def test_subscriptions_cover_encoded_variants(self):
+        self.assertEqual(encoded_topics('market/data'), ['market/data', 'market/data/+'])
+        self.assertEqual(encoded_topics('intelligence-briefing/#'), ['intelligence-briefing/#'])
+
+    def test_round_trip_for_available_encodings(self):
+        data = {'id': 'DJI', 'price': 28500.5, 'history': list(range(50))}
+        for encoding in available_encodings():
+            self.assertEqual(loads(dumps(data, encoding), encoding), data)
+        self.assertLess(len(dumps(data, ZLIB)), len(dumps(data, JSON)))
+
+    def test_decode_payload_handles_encodings(self):
+        quote = decode_payload('market', dumps({'id': 'DJI', 'price': 1}, ZLIB), ZLIB)
+        self.assertIsInstance(quote, MarketQuote)
+
+    def test_corrupt_and_unknown_payloads_are_rejected(self):
+        with self.assertRaises(EncodingError):
+            loads(b'not compressed', ZLIB)
+        with self.assertRaises(EncodingError):
+            loads(b'{}', 'brotli')
+        with self.assertRaises(PayloadError):
+            decode_payload('market', b'\x00\x01', ZLIB)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+from payload_models import (MarketQuote, PayloadError, SecurityAlert, WeatherReport,
+                            decode_payload, from_dict, model_for, to_plain)
+
+class TestPayloadModels(unittest.TestCase):
+
+    def test_known_fields_are_converted_and_extras_kept(self):
+        quote = decode_payload('market', b'{"id": "DJI", "price": "28,500", "note": "close"}')
+        self.assertIsInstance(quote, MarketQuote)
+        self.assertEqual(quote.price, 28500.0)
+        self.assertIsNone(quote.change)
+        self.assertEqual(quote.extra, {'note': 'close'})
+        # Values read back as published, so reports print what was sent
+        self.assertEqual(list(quote.items()), [('id', 'DJI'), ('price', '28,500'), ('note', 'close')])
+        self.assertEqual(quote.get('price'), '28,500')
+
+    def test_models_have_no_instance_dict(self):
+        alert = SecurityAlert.from_dict({'alert': 'Intrusion detected'})
+        self.assertFalse(hasattr(alert, '__dict__'))
+
+    def test_models_without_extras_or_changed_values_share_empty_mappings(self):
+        first = SecurityAlert.from_dict({'alert': 'Intrusion detected'})
+        second = WeatherReport(location='Plano, TX')
+        self.assertEqual(dict(first.extra), {})
+        self.assertIs(first.extra, second.extra)
+        self.assertIs(first.raw, second.raw)
+
+    def test_invalid_payloads_are_rejected_at_the_edge(self):
+        with self.assertRaises(PayloadError):
+            decode_payload('weather', b'{"temperature": "warm"}')
+        with self.assertRaises(PayloadError):
+            decode_payload('security', b'{"alert": {"code": 7}}')
+        with self.assertRaises(PayloadError):
+            decode_payload('market', b'not json')
+        with self.assertRaises(PayloadError):
+            decode_payload('market', b'[1, 2]')
+
+    def test_fields_are_optional(self):
+        # No publisher guarantees any particular field
+        self.assertEqual(decode_payload('weather', b'{"conditions": "Clear"}').to_dict(),
+                         {'conditions': 'Clear'})
+        self.assertIsNone(decode_payload('market', b'{"change": 1.5}').price)
+
+    def test_models_are_chosen_by_category_or_topic(self):
+        self.assertIs(model_for('security/alerts'), SecurityAlert)
+        self.assertIs(model_for('intelligence-briefing/weather'), WeatherReport)
+        self.assertEqual(from_dict('briefing', {'a': 1}), {'a': 1})
+
+    def test_round_trip_through_plain_dicts(self):
+        report = from_dict('weather', {'temperature': 70, 'unit': 'F'})
+        self.assertEqual(report.temperature, 70.0)
+        self.assertEqual(to_plain(report), {'temperature': 70, 'unit': 'F'})
+        self.assertEqual(from_dict('weather', to_plain(report)), report)
+        self.assertEqual(report.get('humidity', 'N/A'), 'N/A')
+
+if __name__ == '__main__':
+    unittest.main()
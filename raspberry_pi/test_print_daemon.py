@@ -0,0 +1,248 @@
+import json
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+import fake_cups  # noqa: F401  (before print_daemon imports cups)
+from layout import WIDE
+from print_daemon import PrintDaemon
+from snapshot_cache import SnapshotCache
+
+WEATHER = {'location': 'London', 'temperature': 18, 'conditions': 'Cloudy'}
+MARKET = {'id': 'DJI', 'price': 28500.5}
+SECURITY = {'alert': 'All clear', 'severity': 'low'}
+PAYLOADS = {'weather': WEATHER, 'market': MARKET, 'security': SECURITY}
+
+
+class FakeStream:
+    def __init__(self):
+        self.data = b""
+        self.closed = False
+        self.aborted = False
+
+    def write(self, data: bytes):
+        self.data += data
+
+    def close(self):
+        self.closed = True
+
+    def abort(self):
+        self.closed = True
+        self.aborted = True
+
+
+class FakePrinter:
+    """Stands in for DotMatrixPrinter: records immediate jobs and open streams"""
+
+    def __init__(self):
+        self.jobs = []
+        self.streams = []
+
+    def print_now(self, data: bytes, job_name: str = "") -> int:
+        self.jobs.append(data)
+        return len(self.jobs)
+
+    def open_stream(self, job_name: str = "") -> FakeStream:
+        stream = FakeStream()
+        self.streams.append(stream)
+        return stream
+
+
+class PrintDaemonTestCase(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        cache = SnapshotCache(Path(tmp.name) / 'snapshots.sqlite3')
+        self.addCleanup(cache.close)
+        with patch('print_daemon.mqtt.Client'), patch('print_daemon.SnapshotCache', return_value=cache):
+            self.daemon = PrintDaemon()
+        self.printer = FakePrinter()
+        self.daemon.printer = self.printer
+        self.daemon.check_printer_status = lambda: True
+
+    def publish(self, category: str, payload=None):
+        topic = f"intelligence-briefing/{category}"
+        self.daemon.process_message(topic, json.dumps(payload or PAYLOADS[category]).encode())
+
+
+class TestReportFormatting(PrintDaemonTestCase):
+
+    def test_values_print_as_published(self):
+        self.publish('weather', {'temperature': 70, 'unit': 'F'})
+        self.publish('market', {'id': 'DJI', 'price': '28,500'})
+        self.publish('security', {'severity': 'low'})
+        report = self.printer.jobs[0].decode('cp437')
+        self.assertIn("temperature: 70\n", report)
+        self.assertIn("price: 28,500\n", report)
+        self.assertIn("severity: low\n", report)
+
+
+class TestSectionCache(PrintDaemonTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.daemon.format_header = lambda: "HEADER\n"
+        self.daemon.current_data = dict(PAYLOADS)
+
+    def uncached_report(self):
+        self.daemon.section_cache.clear()
+        return self.daemon.format_report()
+
+    def test_unchanged_payloads_are_hits(self):
+        first = self.daemon.format_report()
+        second = self.daemon.format_report()
+        self.assertEqual(self.daemon.render_stats, {'section_hits': 3, 'section_misses': 3})
+        self.assertEqual(second, first)
+        self.assertEqual(second, self.uncached_report())
+
+    def test_changed_payload_is_a_miss(self):
+        self.daemon.format_report()
+        self.daemon.current_data['market'] = {'id': 'DJI', 'price': 28600}
+        report = self.daemon.format_report()
+        self.assertEqual(self.daemon.render_stats, {'section_hits': 2, 'section_misses': 4})
+        self.assertIn("price: 28600\n", report)
+        self.assertEqual(report, self.uncached_report())
+
+    def test_changed_page_width_is_a_miss(self):
+        self.daemon.format_report()
+        self.daemon.layout = WIDE
+        report = self.daemon.format_report()
+        self.assertEqual(self.daemon.render_stats, {'section_hits': 0, 'section_misses': 6})
+        self.assertEqual(report, self.uncached_report())
+
+
+class TestPrintFromCache(PrintDaemonTestCase):
+
+    def test_stale_press_prints_once(self):
+        forty_minutes_ago = time.time() - 40 * 60
+        for category, payload in PAYLOADS.items():
+            self.daemon.cache.put(category, payload, updated_at=forty_minutes_ago)
+
+        reply = self.daemon.command_print_now()
+        self.assertTrue(reply['printed'])
+        self.assertEqual(reply['refreshing'], ['market', 'security', 'weather'])
+        self.daemon.client.publish.assert_called_once()
+
+        for category in PAYLOADS:
+            self.publish(category)
+        self.assertEqual(len(self.printer.jobs), 1)
+        self.assertEqual(self.daemon.pending_refresh, {})
+
+    def test_press_waiting_for_missing_data_prints_when_it_arrives(self):
+        for category in ('weather', 'market'):
+            self.daemon.cache.put(category, PAYLOADS[category])
+
+        reply = self.daemon.command_print_now()
+        self.assertFalse(reply['printed'])
+        self.assertEqual(self.printer.jobs, [])
+
+        self.publish('security')
+        self.assertEqual(len(self.printer.jobs), 1)
+        self.assertIn(b"All clear", self.printer.jobs[0])
+
+    def test_scheduled_updates_still_print(self):
+        for category in PAYLOADS:
+            self.publish(category)
+        self.assertEqual(len(self.printer.jobs), 1)
+        self.assertEqual(self.daemon.current_data, {})
+
+
+class TestProgressivePrinting(PrintDaemonTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.daemon.progressive = True
+
+    def test_sections_are_appended_to_one_job(self):
+        for category in PAYLOADS:
+            self.publish(category)
+        self.assertEqual(len(self.printer.streams), 1)
+        stream = self.printer.streams[0]
+        self.assertTrue(stream.closed)
+        self.assertFalse(stream.aborted)
+        for title in (b"WEATHER INFORMATION", b"MARKET UPDATES", b"SECURITY ALERTS", b"End of Report"):
+            self.assertIn(title, stream.data)
+        self.assertIsNone(self.daemon.open_job)
+        self.assertIsNotNone(self.daemon.first_ink_ms)
+
+    def test_sections_that_arrived_while_printer_was_down_are_written(self):
+        self.daemon.check_printer_status = lambda: False
+        self.publish('weather')
+        self.assertEqual(self.printer.streams, [])
+
+        self.daemon.check_printer_status = lambda: True
+        self.publish('security')
+        self.publish('market')
+        stream = self.printer.streams[0]
+        self.assertTrue(stream.closed)
+        self.assertNotIn(b"No data received", stream.data)
+        # Weather is caught up in report order when the job opens for security
+        self.assertLess(stream.data.index(b"WEATHER INFORMATION"), stream.data.index(b"SECURITY ALERTS"))
+        self.assertLess(stream.data.index(b"SECURITY ALERTS"), stream.data.index(b"MARKET UPDATES"))
+
+    def test_deadline_closes_job_with_what_has_arrived(self):
+        self.publish('weather')
+        self.daemon.close_progressive_job()
+        stream = self.printer.streams[0]
+        self.assertTrue(stream.closed)
+        self.assertIn(b"No data received for: market, security", stream.data)
+        self.assertIn("No data received for: market, security", self.daemon.last_report)
+
+    def test_deadline_waits_for_the_update_being_handled(self):
+        self.publish('weather')
+        print_progressive = self.daemon.print_progressive
+        deadline_threads = []
+
+        def deadline_fires_mid_update(category):
+            # The data is stored, the section not yet written
+            thread = threading.Thread(target=self.daemon.close_progressive_job)
+            thread.start()
+            thread.join(0.1)
+            deadline_threads.append(thread)
+            print_progressive(category)
+
+        self.daemon.print_progressive = deadline_fires_mid_update
+        self.publish('market')
+        deadline_threads[0].join(1)
+
+        stream = self.printer.streams[0]
+        self.assertFalse(stream.aborted)
+        self.assertTrue(stream.closed)
+        self.assertIn(b"MARKET UPDATES", stream.data)
+        self.assertIn(b"No data received for: security", stream.data)
+
+    def test_stale_deadline_does_not_close_the_next_job(self):
+        self.publish('weather')
+        first_job = self.daemon.open_job
+        self.daemon.close_progressive_job(first_job)
+        self.publish('weather')
+        self.daemon.close_progressive_job(first_job)
+        self.assertFalse(self.printer.streams[1].closed)
+        self.daemon.close_progressive_job()
+
+
+
+class TestHandlerThread(PrintDaemonTestCase):
+
+    def test_queued_messages_are_handled_in_order(self):
+        self.daemon.start_worker()
+        worker = self.daemon._worker
+        self.daemon.start_worker()
+        self.assertIs(self.daemon._worker, worker)
+        for category, payload in PAYLOADS.items():
+            self.daemon.work_queue.put(f"intelligence-briefing/{category}", json.dumps(payload).encode())
+
+        deadline = time.monotonic() + 5
+        while self.daemon.get_queue_stats()['handled'] < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        stats = self.daemon.get_queue_stats()
+        self.assertEqual(stats['handled'], 3)
+        self.assertEqual(stats['depth'], 0)
+        self.assertEqual(len(self.printer.jobs), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+import fake_cups
+import printer_interface
+from escp import PRINTER_INIT
+from printer_interface import DotMatrixPrinter, PrinterError
+from printer_status import PRINTER_IDLE
+
+
+class IdleStatus:
+    def get(self):
+        return {'state': PRINTER_IDLE, 'state_message': '', 'is_accepting': True, 'state_reasons': []}
+
+
+class PrinterTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = fake_cups.FakeConnection()
+        for target in (patch.object(printer_interface, 'cups', fake_cups.module(self.conn)),
+                       patch.object(printer_interface, 'get_status_cache', return_value=IdleStatus()),
+                       # Jobs are taken off the queue by the tests, not the worker thread
+                       patch.object(DotMatrixPrinter, '_process_print_queue', lambda self: None)):
+            target.start()
+            self.addCleanup(target.stop)
+        self.printer = DotMatrixPrinter()
+
+
+class TestBatching(PrinterTestCase):
+
+    def submit(self, *names):
+        for name in names:
+            self.printer.submit_print_job(f"Report {name}", name)
+
+    def test_lone_job_is_not_held_back(self):
+        self.submit('a')
+        started = time.monotonic()
+        batch = self.printer._collect_batch(self.printer.print_queue.get())
+        self.assertLess(time.monotonic() - started, 0.05)
+        self.assertEqual([name for _, name, _ in batch], ['a'])
+
+    def test_waiting_jobs_are_merged_up_to_the_limit(self):
+        self.printer.max_batch_jobs = 2
+        self.submit('a', 'b', 'c')
+        batch = self.printer._collect_batch(self.printer.print_queue.get())
+        self.assertEqual([name for _, name, _ in batch], ['a', 'b'])
+        self.assertEqual(self.printer.print_queue.qsize(), 1)
+
+    def test_batch_is_one_cups_job_with_per_document_accounting(self):
+        self.submit('a', 'b')
+        batch = self.printer._collect_batch(self.printer.print_queue.get())
+        self.printer._attempt_job(self.printer._create_job(batch))
+
+        self.assertEqual(len(self.conn.jobs), 1)
+        job = self.conn.jobs[0]
+        self.assertEqual(job['title'], 'a+1')
+        self.assertTrue(job['data'].startswith(PRINTER_INIT))
+        self.assertEqual(job['data'].count(PRINTER_INIT), 1)
+        self.assertIn(b"Report a", job['data'])
+        self.assertIn(b"Report b", job['data'])
+
+        log = list(self.printer.job_log)
+        self.assertEqual([entry['job_name'] for entry in log], ['a', 'b'])
+        self.assertTrue(all(entry['cups_job_id'] == 1 and entry['batch_size'] == 2
+                            and entry['status'] == 'printed' for entry in log))
+        self.assertEqual(self.printer.stats['jobs_printed'], 2)
+        self.assertEqual(self.printer.stats['batches_sent'], 1)
+        self.assertEqual(self.printer.print_queue.unfinished_tasks, 0)
+
+    def test_failed_batch_is_accounted_per_document(self):
+        self.printer.retry_count = 1
+        self.submit('a', 'b')
+        batch = self.printer._collect_batch(self.printer.print_queue.get())
+        with patch.object(self.printer, '_send_job', side_effect=PrinterError("offline")):
+            self.printer._attempt_job(self.printer._create_job(batch))
+
+        self.assertEqual([entry['status'] for entry in self.printer.job_log], ['failed', 'failed'])
+        self.assertEqual(self.printer.stats['jobs_failed'], 2)
+        self.assertEqual(len(self.printer.get_dead_letters()), 1)
+        self.assertEqual(self.printer.print_queue.unfinished_tasks, 0)
+
+
+
+class TestSubmission(PrinterTestCase):
+    """Streaming a job over the CUPS connection, and the spool file fallback"""
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.printer.temp_dir = Path(directory.name)
+
+    def test_job_is_streamed(self):
+        job_id = self.printer._send_job(b"report", "brief")
+        self.assertEqual(job_id, 1)
+        self.assertEqual(self.conn.jobs, [{'title': 'brief', 'data': b"report",
+                                           'finished': True, 'cancelled': False}])
+        self.assertEqual(self.printer.stats['jobs_streamed'], 1)
+        self.assertEqual(self.printer.stats['jobs_spooled'], 0)
+        self.assertIsNotNone(self.printer.stats['last_submit_ms'])
+        self.assertNotIn('printFile', self.conn.calls)
+
+    def test_failed_write_cancels_the_job_and_spools(self):
+        self.conn.fail_writes = True
+        job_id = self.printer._send_job(b"report", "brief")
+        self.assertEqual(job_id, 2)
+        streamed, spooled = self.conn.jobs
+        self.assertTrue(streamed['cancelled'])
+        self.assertFalse(streamed['finished'])
+        self.assertEqual(spooled['data'], b"report")
+        self.assertEqual(self.printer.stats['jobs_streamed'], 0)
+        self.assertEqual(self.printer.stats['jobs_spooled'], 1)
+        self.assertIsNotNone(self.printer.stats['last_submit_ms'])
+        self.assertEqual(list(self.printer.temp_dir.iterdir()), [])
+
+if __name__ == '__main__':
+    unittest.main()
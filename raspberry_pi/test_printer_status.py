@@ -0,0 +1,63 @@
+import time
+import unittest
+from unittest.mock import patch
+import fake_cups
+import printer_status
+from printer_status import PrinterStatusCache, PRINTER_IDLE, PRINTER_STOPPED
+
+
+class TestPrinterStatusCache(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = fake_cups.FakeConnection()
+        patcher = patch.object(printer_status, 'cups', fake_cups.module(self.conn))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = PrinterStatusCache('KX-P1592', ttl=30.0)
+
+    def start_watching(self):
+        # What one pass of the watcher thread does in event mode
+        self.cache._subscribe()
+        self.cache.refresh()
+        self.cache._poll_events()
+
+    def test_first_read_polls_cups(self):
+        self.assertTrue(self.cache.is_ready())
+        self.assertEqual(self.conn.calls['getPrinterAttributes'], 1)
+        self.assertTrue(self.cache.is_ready())
+        self.assertEqual(self.conn.calls['getPrinterAttributes'], 1)
+
+    def test_events_update_cached_state(self):
+        self.start_watching()
+        self.conn.events.append({'notify-sequence-number': 1, 'printer-name': 'KX-P1592',
+                                 'printer-state': PRINTER_STOPPED})
+        self.cache._poll_events()
+        self.assertEqual(self.cache.get()['state'], PRINTER_STOPPED)
+        self.assertFalse(self.cache.is_ready())
+        self.assertEqual(self.cache._sequence, 1)
+
+    def test_events_for_other_printers_are_ignored(self):
+        self.start_watching()
+        self.conn.events.append({'notify-sequence-number': 1, 'printer-name': 'Other',
+                                 'printer-state': PRINTER_STOPPED})
+        self.cache._poll_events()
+        self.assertEqual(self.cache.get()['state'], PRINTER_IDLE)
+
+    def test_quiet_event_polls_keep_cache_fresh(self):
+        self.start_watching()
+        polls = self.conn.calls['getPrinterAttributes']
+        # Long past the TTL, but the subscription was checked a moment ago
+        with patch('printer_status.time.monotonic', return_value=time.monotonic() + 60):
+            self.cache._poll_events()
+            self.assertTrue(self.cache.is_ready())
+        self.assertEqual(self.conn.calls['getPrinterAttributes'], polls)
+
+    def test_stale_cache_is_refreshed_on_read(self):
+        self.assertTrue(self.cache.is_ready())
+        with patch('printer_status.time.monotonic', return_value=time.monotonic() + 60):
+            self.cache.get()
+        self.assertEqual(self.conn.calls['getPrinterAttributes'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+from unittest.mock import patch
+from retry_scheduler import RetryScheduler
+
+class TestRetryScheduler(unittest.TestCase):
+
+    def test_backoff_grows_exponentially_and_is_capped(self):
+        scheduler = RetryScheduler(base_delay=1.0, max_delay=10.0, jitter=0)
+        self.assertEqual(scheduler.backoff(1), 1.0)
+        self.assertEqual(scheduler.backoff(2), 2.0)
+        self.assertEqual(scheduler.backoff(3), 4.0)
+        self.assertEqual(scheduler.backoff(10), 10.0)
+
+    def test_backoff_jitter_stays_within_bounds(self):
+        scheduler = RetryScheduler(base_delay=4.0, jitter=0.5)
+        for _ in range(100):
+            self.assertTrue(2.0 <= scheduler.backoff(1) <= 4.0)
+
+    @patch('retry_scheduler.time.monotonic')
+    def test_items_become_due_in_order(self, mock_monotonic):
+        scheduler = RetryScheduler(base_delay=1.0, jitter=0)
+        mock_monotonic.return_value = 100.0
+        scheduler.schedule('second', attempt=2)
+        scheduler.schedule('first', attempt=1)
+
+        self.assertEqual(scheduler.pop_due(), [])
+        self.assertEqual(scheduler.next_due_in(), 1.0)
+
+        mock_monotonic.return_value = 101.0
+        self.assertEqual(scheduler.pop_due(), ['first'])
+
+        mock_monotonic.return_value = 105.0
+        self.assertEqual(scheduler.pop_due(), ['second'])
+        self.assertIsNone(scheduler.next_due_in())
+        self.assertEqual(len(scheduler), 0)
+
+if __name__ == '__main__':
+    unittest.main()
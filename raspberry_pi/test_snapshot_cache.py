@@ -0,0 +1,43 @@
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from snapshot_cache import SnapshotCache, FreshnessPolicy, FRESH, STALE, EXPIRED
+
+class TestSnapshotCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name) / 'cache' / 'snapshots.sqlite3'
+        self.policies = {'weather': FreshnessPolicy(max_age=60, max_stale=600)}
+        self.cache = SnapshotCache(self.path, self.policies)
+
+    def tearDown(self):
+        self.cache.close()
+        self.directory.cleanup()
+
+    def test_payloads_survive_reopening(self):
+        self.cache.put('weather', {'temp': 21})
+        self.cache.close()
+
+        self.cache = SnapshotCache(self.path, self.policies)
+        payload, _ = self.cache.get('weather')
+        self.assertEqual(payload, {'temp': 21})
+
+    def test_freshness_follows_policy(self):
+        now = time.time()
+        self.cache.put('weather', {'temp': 21}, updated_at=now - 30)
+        self.assertEqual(self.cache.freshness('weather', now)[0], FRESH)
+        self.assertEqual(self.cache.freshness('weather', now + 100)[0], STALE)
+        self.assertEqual(self.cache.freshness('weather', now + 1000)[0], EXPIRED)
+        self.assertEqual(self.cache.freshness('market', now), (EXPIRED, None))
+
+    def test_plan_splits_printable_refresh_and_missing(self):
+        self.cache.put('weather', {'temp': 21}, updated_at=time.time() - 120)
+        printable, refresh, missing = self.cache.plan(['weather', 'market'])
+        self.assertEqual(printable, {'weather': {'temp': 21}})
+        self.assertEqual(refresh, {'weather', 'market'})
+        self.assertEqual(missing, {'market'})
+
+if __name__ == '__main__':
+    unittest.main()
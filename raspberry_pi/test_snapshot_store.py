@@ -0,0 +1,50 @@
+import threading
+import unittest
+from snapshot_store import SnapshotStore
+
+class TestSnapshotStore(unittest.TestCase):
+
+    def setUp(self):
+        self.store = SnapshotStore()
+
+    def test_updates_are_versioned_per_topic(self):
+        self.store.update('weather', {'t': 1})
+        self.store.update('market', {'p': 2})
+        self.store.update('weather', {'t': 3})
+
+        self.assertEqual(self.store.version, 3)
+        self.assertEqual(self.store.get('weather').version, 3)
+        self.assertEqual(self.store.get('market').payload, {'p': 2})
+        self.assertEqual(self.store.latest().topic, 'weather')
+
+    def test_wait_for_version_times_out(self):
+        self.assertIsNone(self.store.wait_for_version(0, timeout=0.01))
+
+    def test_wait_for_version_wakes_on_update(self):
+        self.store.update('weather', {'t': 1})
+        threading.Timer(0.05, self.store.update, args=('weather', {'t': 2})).start()
+
+        snapshot = self.store.wait_for_version(1, topic='weather', timeout=2)
+        self.assertEqual(snapshot.payload, {'t': 2})
+
+    def test_wait_for_version_ignores_other_topics(self):
+        self.store.update('market', {'p': 1})
+        self.assertIsNone(self.store.wait_for_version(0, topic='weather', timeout=0.01))
+
+    def test_wait_for_topics_returns_consistent_snapshot(self):
+        self.store.update('weather', {'t': 1})
+        threading.Timer(0.05, self.store.update, args=('market', {'p': 1})).start()
+
+        result = self.store.wait_for_topics(['weather', 'market'], timeout=2)
+        version, snapshots = result
+        self.assertEqual(version, 2)
+        self.assertEqual(set(snapshots), {'weather', 'market'})
+
+    def test_snapshot_copies_current_state(self):
+        self.store.update('weather', {'t': 1})
+        version, snapshots = self.store.snapshot()
+        self.store.update('market', {'p': 1})
+        self.assertEqual((version, list(snapshots)), (1, ['weather']))
+
+if __name__ == '__main__':
+    unittest.main()
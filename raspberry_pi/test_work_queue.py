@@ -0,0 +1,46 @@
+import threading
+import unittest
+from work_queue import BoundedWorkQueue, COALESCE, DROP_OLDEST
+
+class TestBoundedWorkQueue(unittest.TestCase):
+
+    def test_coalesce_keeps_latest_item_in_original_position(self):
+        work_queue = BoundedWorkQueue(maxsize=10, policy=COALESCE)
+        work_queue.put('market', 1)
+        work_queue.put('weather', 2)
+        work_queue.put('market', 3)
+
+        self.assertEqual(len(work_queue), 2)
+        self.assertEqual(work_queue.get(timeout=0)[:2], ('market', 3))
+        self.assertEqual(work_queue.get(timeout=0)[:2], ('weather', 2))
+        self.assertEqual(work_queue.stats['coalesced'], 1)
+
+    def test_drop_oldest_when_full(self):
+        work_queue = BoundedWorkQueue(maxsize=2, policy=DROP_OLDEST)
+        for value in range(3):
+            work_queue.put('market', value)
+
+        self.assertEqual(work_queue.get(timeout=0)[1], 1)
+        self.assertEqual(work_queue.get(timeout=0)[1], 2)
+        self.assertEqual(work_queue.stats['dropped'], 1)
+
+    def test_coalesce_after_drop_creates_new_entry(self):
+        work_queue = BoundedWorkQueue(maxsize=1, policy=COALESCE)
+        work_queue.put('market', 1)
+        work_queue.put('weather', 2)
+        work_queue.put('market', 3)
+
+        self.assertEqual(work_queue.get(timeout=0)[:2], ('market', 3))
+        self.assertIsNone(work_queue.get(timeout=0))
+
+    def test_get_wakes_up_when_item_arrives(self):
+        work_queue = BoundedWorkQueue()
+        threading.Timer(0.05, work_queue.put, args=('weather', 1)).start()
+        self.assertEqual(work_queue.get(timeout=2)[:2], ('weather', 1))
+
+    def test_unknown_policy_is_rejected(self):
+        with self.assertRaises(ValueError):
+            BoundedWorkQueue(policy='block')
+
+if __name__ == '__main__':
+    unittest.main()
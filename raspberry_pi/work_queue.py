@@ -0,0 +1,67 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+DROP_OLDEST = 'drop_oldest'
+COALESCE = 'coalesce'
+
+
+class BoundedWorkQueue:
+    """Bounded hand-off queue between a network callback and worker threads.
+
+    put() never blocks, so it is safe to call from the MQTT network thread.
+    With the 'coalesce' policy a new item replaces a still-pending item with
+    the same key (only the newest payload per topic matters) and keeps its
+    place in line. When the queue is full the oldest pending item is dropped.
+    """
+
+    def __init__(self, maxsize: int = 100, policy: str = COALESCE):
+        if policy not in (DROP_OLDEST, COALESCE):
+            raise ValueError(f"Unknown backpressure policy: {policy}")
+        self.maxsize = maxsize
+        self.policy = policy
+        self._entries = deque()  # [key, item, enqueued_at] in arrival order
+        self._pending: Dict[Hashable, list] = {}  # key -> entry, for coalescing
+        self._not_empty = threading.Condition()
+        self.stats = {
+            'enqueued': 0,
+            'coalesced': 0,
+            'dropped': 0,
+            'max_depth': 0
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def put(self, key: Hashable, item: Any):
+        """Add an item without blocking, applying the backpressure policy"""
+        with self._not_empty:
+            self.stats['enqueued'] += 1
+            if self.policy == COALESCE and key in self._pending:
+                self._pending[key][1] = item
+                self.stats['coalesced'] += 1
+                return
+
+            if len(self._entries) >= self.maxsize:
+                dropped = self._entries.popleft()
+                if self._pending.get(dropped[0]) is dropped:
+                    del self._pending[dropped[0]]
+                self.stats['dropped'] += 1
+
+            entry = [key, item, time.monotonic()]
+            self._entries.append(entry)
+            if self.policy == COALESCE:
+                self._pending[key] = entry
+            self.stats['max_depth'] = max(self.stats['max_depth'], len(self._entries))
+            self._not_empty.notify()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Tuple[Hashable, Any, float]]:
+        """Wait for the next item and return (key, item, enqueued_at), or None on timeout"""
+        with self._not_empty:
+            if not self._not_empty.wait_for(lambda: self._entries, timeout):
+                return None
+            entry = self._entries.popleft()
+            if self._pending.get(entry[0]) is entry:
+                del self._pending[entry[0]]
+            return entry[0], entry[1], entry[2]